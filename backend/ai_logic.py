@@ -1,7 +1,5 @@
-import openai
 import json
 import os
-import requests
 import re
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
@@ -24,16 +22,22 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
 
 # --- OpenAI 클라이언트 초기화 ---
+# openai 패키지는 import 에만 수백 ms 가 걸리므로 첫 호출 때 불러옵니다 (서버 시작 시간 단축).
 if not OPENAI_API_KEY:
     print("[경고] OPENAI_API_KEY가 설정되지 않았습니다. AI 기능이 제한될 수 있습니다.")
-    openai_client = None
-else:
-    try:
-        openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        print("[알림] OpenAI 클라이언트가 성공적으로 초기화되었습니다.")
-    except Exception as e:
-        print(f"[오류] OpenAI 클라이언트 생성 중 오류가 발생했습니다: {e}")
-        openai_client = None
+_openai_client = None
+
+def get_openai_client():
+    """첫 호출 때 OpenAI 클라이언트를 만들고 이후에는 재사용합니다 (키가 없거나 실패하면 None)."""
+    global _openai_client
+    if _openai_client is None and OPENAI_API_KEY:
+        try:
+            import openai
+            _openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+            print("[알림] OpenAI 클라이언트가 성공적으로 초기화되었습니다.")
+        except Exception as e:
+            print(f"[오류] OpenAI 클라이언트 생성 중 오류가 발생했습니다: {e}")
+    return _openai_client
 
 router = APIRouter(
     prefix="/chat",
@@ -55,6 +59,7 @@ class RouterDecision(BaseModel):
 # --- 공통 함수 ---
 def invoke_llm(system_prompt: str, user_prompt: str) -> Optional[str]:
     """OpenAI LLM 호출 함수"""
+    openai_client = get_openai_client()
     if not openai_client:
         print("[오류] OpenAI 클라이언트가 초기화되지 않았습니다.")
         return "죄송합니다, AI 서비스가 현재 연결되어 있지 않습니다. 잠시 후 다시 시도해주세요."
@@ -79,6 +84,7 @@ def perform_web_search(query: str) -> str:
         return "웹 검색 기능이 설정되지 않았습니다."
     
     try:
+        import requests
         search_url = "https://www.googleapis.com/customsearch/v1"
         search_params = {'key': GOOGLE_API_KEY, 'cx': GOOGLE_CSE_ID, 'q': query, 'num': 3}
         search_response = requests.get(search_url, params=search_params, timeout=5)
@@ -95,6 +101,15 @@ def perform_web_search(query: str) -> str:
         return "정보를 검색하는 중에 문제가 발생했습니다."
 
 # --- 핸들러 로직 ---
+# 라우터가 고른 dashboard_field -> 계산할 대시보드 필드
+DASHBOARD_FIELDS_BY_QUESTION = {
+    "credits": "total_points",
+    "carbon_saved": "total_saved",
+    "garden_level": "garden_level",
+    "today_saved": "co2_saved_today",
+}
+DASHBOARD_SUMMARY_FIELDS = "total_points,total_saved,garden_level,co2_saved_today,challenge"
+
 async def _handle_dashboard_query(user_id: int, db: Session, router_decision: RouterDecision) -> str:
     """사용자 대시보드 정보를 조회하여 답변 구성"""
     try:
@@ -102,8 +117,11 @@ async def _handle_dashboard_query(user_id: int, db: Session, router_decision: Ro
         if not current_user_obj:
             return "사용자 정보를 찾을 수 없습니다."
 
-        dashboard_data = await get_dashboard(current_user=current_user_obj, db=db)
         field = router_decision.dashboard_field
+        # 질문에 필요한 대시보드 항목만 계산합니다.
+        dashboard_data = await get_dashboard(
+            current_user=current_user_obj, db=db, fields=DASHBOARD_FIELDS_BY_QUESTION.get(field, DASHBOARD_SUMMARY_FIELDS)
+        )
 
         if field == "credits":
             return f"현재 보유하신 크레딧은 {dashboard_data.total_points:,}C입니다."
@@ -129,7 +147,7 @@ async def _handle_dashboard_query(user_id: int, db: Session, router_decision: Ro
 async def _handle_recommend_challenge(user_query: str, user_id: int, db: Session, router_decision: RouterDecision) -> str:
     """AI를 통해 맞춤형 챌린지 생성 및 참여"""
     current_user_obj = db.query(User).filter(User.user_id == user_id).first()
-    dashboard_data = await get_dashboard(current_user=current_user_obj, db=db)
+    dashboard_data = await get_dashboard(current_user=current_user_obj, db=db, fields="modeStats,total_saved")
     
     # 통계 추출
     mode_stats = {m.mode: m.saved_g for m in dashboard_data.modeStats}
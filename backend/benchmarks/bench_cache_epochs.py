@@ -0,0 +1,139 @@
+# benchmarks/bench_cache_epochs.py
+"""
+여러 워커 프로세스가 같은 SQLite 파일을 쓸 때 cache_epochs 로 응답 캐시가 무효화되는지
+확인하고, 다른 프로세스의 커밋이 각 워커 캐시에 반영되기까지의 지연과 폴링 비용을 잽니다.
+
+각 워커는 TTL 을 길게 잡은 캐시 라우트로 사용자 수를 읽어 둔 뒤 폴링만 합니다. 부모
+프로세스가 사용자를 추가하고 커밋하면, TTL 이 아니라 epoch 통지로 새 값을 읽어야 합니다.
+롤백된 쓰기는 통지를 만들지 않아야 합니다.
+
+    python -m benchmarks.bench_cache_epochs --workers 4 --poll 0.05
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import CacheEpoch, User
+from services.cache_epochs import cache_epochs
+from services.response_cache import STATISTICS, ResponseCache
+
+TIMEOUT_SECONDS = 10
+
+
+def _engine(path: str):
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def worker(path: str, poll_seconds: float, ready, start, results):
+    engine = _engine(path)
+    Session = sessionmaker(bind=engine)
+    cache = ResponseCache()
+    cache.install(Session)
+
+    @cache.cached(ttl=3600, tags=(STATISTICS,))
+    def user_count():
+        db = Session()
+        try:
+            return db.query(User).count()
+        finally:
+            db.close()
+
+    cache_epochs.connect(engine)
+    cache_epochs.poll()
+    before = user_count()
+    ready.put(os.getpid())
+    committed_at = start.get()
+
+    deadline = time.time() + TIMEOUT_SECONDS
+    value = user_count()
+    while value == before and time.time() < deadline:
+        time.sleep(poll_seconds)
+        cache_epochs.poll()
+        value = user_count()
+    results.put({
+        "pid": os.getpid(),
+        "before": before,
+        "after": value,
+        "latency_ms": (time.time() - committed_at) * 1000,
+        "polls": cache_epochs.polls,
+        "table_reads": cache_epochs.reads,
+        "misses": sum(r["misses"] for r in cache.metrics()["routes"].values()),
+    })
+    cache_epochs.close()
+
+
+def idle_poll_cost(path: str, polls: int) -> float:
+    """Microseconds per poll when nothing was committed (PRAGMA only)."""
+    engine = _engine(path)
+    cache_epochs.connect(engine)
+    cache_epochs.poll()
+    started = time.perf_counter()
+    for _ in range(polls):
+        cache_epochs.poll()
+    elapsed = time.perf_counter() - started
+    cache_epochs.close()
+    engine.dispose()
+    return elapsed / polls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-process response cache invalidation through cache_epochs.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--poll", type=float, default=0.05, help="poll interval of the workers in seconds")
+    parser.add_argument("--idle-polls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = _engine(path)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        writer_cache = ResponseCache()
+        writer_cache.install(Session)
+
+        ready, start, results = ctx.Queue(), ctx.Queue(), ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(path, args.poll, ready, start, results)) for _ in range(args.workers)]
+        for p in procs:
+            p.start()
+        for _ in procs:
+            ready.get(timeout=60)
+
+        db = Session()
+        # 롤백된 쓰기: epoch 가 바뀌지 않아야 합니다.
+        db.add(User(username="rolled-back"))
+        db.flush()
+        db.rollback()
+        db.add(User(username="committed"))
+        db.commit()
+        committed_at = time.time()
+        epoch = db.query(CacheEpoch.epoch).filter(CacheEpoch.tag == STATISTICS).scalar()
+        assert epoch == 1, f"rolled-back write bumped the epoch ({epoch})"
+        db.close()
+        for _ in procs:
+            start.put(committed_at)
+
+        rows = [results.get(timeout=TIMEOUT_SECONDS * 2) for _ in procs]
+        for p in procs:
+            p.join()
+
+        print(f"workers={args.workers} poll={args.poll}s")
+        print(f"{'pid':>8} {'before':>7} {'after':>6} {'latency ms':>11} {'polls':>6} {'reads':>6} {'misses':>7}")
+        for r in rows:
+            print(f"{r['pid']:>8} {r['before']:>7} {r['after']:>6} {r['latency_ms']:>11.1f} "
+                  f"{r['polls']:>6} {r['table_reads']:>6} {r['misses']:>7}")
+            assert r["before"] == 0 and r["after"] == 1, f"worker {r['pid']} kept a stale value"
+            assert r["misses"] == 2, f"worker {r['pid']} recomputed {r['misses']} times"
+
+        print(f"idle poll: {idle_poll_cost(path, args.idle_polls):.1f} us")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
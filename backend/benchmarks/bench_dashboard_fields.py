@@ -0,0 +1,79 @@
+# benchmarks/bench_dashboard_fields.py
+"""
+대시보드 필드별로 실행되는 SQL 문 수와 소요 시간을 측정하고, 각 필드가 자기 섹션과
+의존 섹션만 실행하는지 (QUERY_BUDGET) 확인합니다.
+
+    python -m benchmarks.bench_dashboard_fields --logs 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import CreditsLedger, CreditType, GardenLevel, MobilityLog, TransportMode, User, UserGarden
+from routes.dashboard import DASHBOARD_FIELDS, compute_dashboard
+
+# 필드 -> 허용되는 SQL 문 수 (challenge 는 total_saved -> total_saved_g 한 번)
+QUERY_BUDGET = {field: 1 for field in DASHBOARD_FIELDS}
+USER_ID = 1
+
+
+def populate(db, logs: int, seed: int = 7):
+    rng = random.Random(seed)
+    db.add(User(user_id=USER_ID, username="bench"))
+    db.add(GardenLevel(level_id=1, level_number=3, level_name="새싹", image_path="/images/3.png"))
+    db.add(UserGarden(user_id=USER_ID, current_level_id=1))
+    now = datetime.utcnow()
+    modes = [TransportMode.BUS, TransportMode.SUBWAY, TransportMode.BIKE, TransportMode.WALK]
+    db.bulk_insert_mappings(MobilityLog, [
+        {
+            "user_id": USER_ID, "mode": rng.choice(modes), "distance_km": 3,
+            "started_at": now - timedelta(hours=i), "ended_at": now - timedelta(hours=i) + timedelta(minutes=20),
+            "co2_saved_g": rng.uniform(50, 500), "created_at": now - timedelta(hours=i),
+        }
+        for i in range(logs)
+    ])
+    db.bulk_insert_mappings(CreditsLedger, [
+        {"user_id": USER_ID, "type": CreditType.EARN, "points": 10, "reason": "bench", "created_at": now - timedelta(hours=i)}
+        for i in range(logs)
+    ])
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query count and latency per dashboard field.")
+    parser.add_argument("--logs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        populate(db, args.logs)
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *rest: statements.append(sql))
+
+        print(f"logs={args.logs}")
+        print(f"{'fields':>20} {'queries':>8} {'ms':>8}")
+        for fields in [[field] for field in DASHBOARD_FIELDS] + [DASHBOARD_FIELDS]:
+            statements.clear()
+            started = time.perf_counter()
+            compute_dashboard(db, USER_ID, fields)
+            elapsed = (time.perf_counter() - started) * 1000
+            label = fields[0] if len(fields) == 1 else "(all)"
+            print(f"{label:>20} {len(statements):>8} {elapsed:>8.2f}")
+            budget = QUERY_BUDGET[fields[0]] if len(fields) == 1 else sum(QUERY_BUDGET.values()) - 1
+            assert len(statements) <= budget, f"{label}: {len(statements)} queries > {budget}"
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
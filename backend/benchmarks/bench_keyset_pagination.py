@@ -0,0 +1,97 @@
+# benchmarks/bench_keyset_pagination.py
+"""
+credits_ledger 내역 페이지 조회를 OFFSET 방식과 (created_at, entry_id) 키셋 커서 방식으로
+깊이별로 비교합니다. 키셋은 깊이와 무관하게 거의 일정해야 합니다.
+
+    python -m benchmarks.bench_keyset_pagination --rows 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import CreditsLedger, CreditType, User
+from services.pagination import encode_cursor, keyset_page
+
+USER_ID = 1
+
+
+def populate(db, rows: int, other_users: int = 20, seed: int = 7):
+    """`rows` ledger entries for USER_ID plus the same number spread over other users."""
+    rng = random.Random(seed)
+    db.bulk_insert_mappings(User, [
+        {"user_id": i, "username": f"user{i}", "created_at": datetime(2024, 1, 1)} for i in range(1, other_users + 2)
+    ])
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(rows * 2):
+        batch.append({
+            "user_id": USER_ID if i % 2 == 0 else rng.randint(2, other_users + 1),
+            "type": CreditType.EARN,
+            "points": rng.randint(1, 100),
+            "reason": "bench",
+            # 같은 시각이 여러 번 나오도록 초 단위로 자릅니다 (id 가 동점을 가름)
+            "created_at": start + timedelta(seconds=i // 3),
+        })
+        if len(batch) == 20_000:
+            db.bulk_insert_mappings(CreditsLedger, batch)
+            batch = []
+    db.bulk_insert_mappings(CreditsLedger, batch)
+    db.commit()
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OFFSET vs keyset pagination on credits_ledger.")
+    parser.add_argument("--rows", type=int, default=200_000, help="ledger rows for the paged user")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        populate(db, args.rows)
+
+        base = db.query(CreditsLedger).filter(CreditsLedger.user_id == USER_ID)
+        order = (CreditsLedger.created_at.desc(), CreditsLedger.entry_id.desc())
+        print(f"rows={args.rows} page_size={args.page_size}")
+        print(f"{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+        depths = []
+        depth = args.page_size
+        while depth < args.rows - args.page_size:
+            depths.append(depth)
+            depth *= 10
+        depths.append(args.rows - args.page_size)   # 마지막 페이지
+        for depth in depths:
+            # 해당 깊이 직전 행의 커서 (클라이언트가 앞 페이지들을 넘겨 온 상태)
+            prev = base.order_by(*order).offset(depth - 1).limit(1).one()
+            cursor = encode_cursor(prev.created_at, prev.entry_id)
+
+            offset_page = lambda: base.order_by(*order).offset(depth).limit(args.page_size).all()
+            keyset = lambda: keyset_page(base, CreditsLedger.created_at, CreditsLedger.entry_id, cursor, args.page_size)
+            assert [r.entry_id for r in offset_page()] == [r.entry_id for r in keyset()[0]]
+
+            print(f"{depth:>10} {timed(offset_page, args.repeat):>10.2f} {timed(keyset, args.repeat):>10.2f}")
+            db.expunge_all()
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
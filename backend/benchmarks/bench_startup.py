@@ -0,0 +1,99 @@
+# benchmarks/bench_startup.py
+"""
+서버 시작 프로파일 리포트.
+
+1) `python -X importtime -c "import main"` 을 새 프로세스로 실행해 main 이 직접/간접으로
+   불러오는 모듈 중 누적 import 시간이 큰 순서로 보여 줍니다.
+2) 임시 DB 로 앱 startup 훅을 두 번 실행해 (빈 DB 첫 부팅 / 시드가 끝난 재부팅)
+   services/startup_profile.py 에 기록된 단계별 시간을 나란히 보여 줍니다. 재부팅에서는
+   seed_fingerprints 가 일치하므로 create_all / 시딩이 빠져야 합니다.
+
+    python -m benchmarks.bench_startup --top 25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# 임시 DB 로 import 부터 startup / shutdown 까지 실행하고 startup_profile 리포트를 JSON 으로 출력
+BOOT_SCRIPT = """
+import asyncio, json, sys
+from sqlalchemy import create_engine
+import database
+engine = create_engine("sqlite:///" + sys.argv[1], connect_args={"check_same_thread": False})
+database.engine = engine
+database.SessionLocal.configure(bind=engine)
+import main
+from services.startup_profile import startup_profile
+
+async def boot():
+    await main.startup_event()
+    await main.shutdown_event()
+
+asyncio.run(boot())
+print("@@" + json.dumps(startup_profile.report()))
+"""
+
+
+def import_times(top: int):
+    """(cumulative ms, self ms, module, depth) of main's imports, largest first."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.strip(), depth))
+    total = next((r[0] for r in rows if r[2] == "main"), None)
+    below_main = [r for r in rows if r[3] in (1, 2)]
+    return total, sorted(below_main, reverse=True)[:top]
+
+
+def boot(db_path: str, artifact_dir: str) -> dict:
+    env = {**os.environ, "STATION_ARTIFACT_DIR": artifact_dir}
+    result = subprocess.run(
+        [sys.executable, "-c", BOOT_SCRIPT, db_path], capture_output=True, text=True, env=env, check=True,
+    )
+    line = next(l for l in result.stdout.splitlines() if l.startswith("@@"))
+    return json.loads(line[2:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-import and per-startup-step timing report.")
+    parser.add_argument("--top", type=int, default=25, help="number of imports to list")
+    args = parser.parse_args()
+
+    total, rows = import_times(args.top)
+    print(f"import main: {total:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for cumulative, self_ms, name, depth in rows:
+        print(f"{cumulative:>14.1f} {self_ms:>8.1f}  {'  ' * (depth - 1)}{name}")
+    heavy = [m for m in ("openai", "requests", "reportlab") if any(r[2] == m for r in rows)]
+    print(f"heavy optional dependencies loaded at import: {', '.join(heavy) or 'none'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "startup.db")
+        artifact_dir = os.path.join(tmp, "stations")
+        cold = boot(db_path, artifact_dir)
+        warm = boot(db_path, artifact_dir)
+
+    cold_ms = {s["name"]: s["ms"] for s in cold["steps"]}
+    warm_ms = {s["name"]: s["ms"] for s in warm["steps"]}
+    names = list(dict.fromkeys([s["name"] for s in cold["steps"]] + [s["name"] for s in warm["steps"]]))
+    width = max(len(n) for n in names)
+    print()
+    print(f"{'startup step':<{width}} {'first boot':>11} {'reboot':>9}")
+    for name in names:
+        c, w = cold_ms.get(name), warm_ms.get(name)
+        print(f"{name:<{width}} {c if c is not None else '-':>11} {w if w is not None else '-':>9}")
+    print(f"{'(ready)':<{width}} {cold['ready_ms']:>11} {warm['ready_ms']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_station_import.py
+"""
+합성 EUC-KR 버스 정류장 CSV로 seed_transport_data 의 적재 속도를 측정합니다.
+전체 적재 후, 일부 행만 바꾼 파일로 --delta 재적재도 측정합니다.
+
+    python -m benchmarks.bench_station_import --rows 500000
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+
+from sqlalchemy import create_engine
+
+from seed_transport_data import import_csv
+
+
+def write_bus_csv(path: str, rows: int, changed_ratio: float = 0.0, seed: int = 7):
+    """Write a bus-stop CSV; ~changed_ratio of rows get a moved coordinate, ~0.1% are invalid."""
+    rng = random.Random(seed)
+    change = random.Random(seed + 1)
+    with open(path, "w", encoding="euc-kr", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["정류장번호", "정류장명", "위도", "경도"])
+        for i in range(rows):
+            lat = 37.45 + rng.random() * 0.25
+            lon = 126.8 + rng.random() * 0.35
+            if changed_ratio and change.random() < changed_ratio:
+                lat += 0.0001
+            if i % 1000 == 999:
+                lat = "N/A"
+            writer.writerow([100000 + i, f"정류장{i}", lat, lon])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming station CSV importer.")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--changed", type=float, default=0.01, help="share of rows changed for the delta run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "bus.csv")
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        write_bus_csv(csv_path, args.rows)
+        full = import_csv("bus", csv_path, engine=engine, chunk_size=args.chunk_size)
+        print(f"full : read={full['read']} written={full['written']} skipped={full['skipped']} "
+              f"elapsed={full['elapsed_s']}s rows/s={full['rows_per_s']:,}")
+
+        write_bus_csv(csv_path, args.rows, changed_ratio=args.changed)
+        delta = import_csv("bus", csv_path, engine=engine, chunk_size=args.chunk_size, delta=True)
+        print(f"delta: read={delta['read']} written={delta['written']} skipped={delta['skipped']} "
+              f"elapsed={delta['elapsed_s']}s rows/s={delta['rows_per_s']:,}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
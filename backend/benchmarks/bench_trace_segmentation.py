@@ -0,0 +1,55 @@
+# benchmarks/bench_trace_segmentation.py
+"""
+합성 GPS 궤적으로 정지/이동 구간 분리 성능과 최대 메모리를 측정합니다.
+
+    python -m benchmarks.bench_trace_segmentation --points 100000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from services.trace_service import CHUNK_SIZE, classify_segment, iter_point_chunks, segment_trace
+
+# (속도 km/h, 점 비율) — 도보, 정지, 버스, 정지, 자전거
+PHASES = [(4.5, 0.2), (0.0, 0.1), (25.0, 0.3), (0.0, 0.1), (15.0, 0.3)]
+
+
+def synthetic_trace(n_points: int, interval_s: float = 1.0, seed: int = 7):
+    """Yield {lat, lon, ts} dicts heading north-east from Seoul City Hall with GPS jitter."""
+    rng = np.random.default_rng(seed)
+    lat, lon, ts = 37.5663, 126.9779, 1_700_000_000.0
+    for speed_kmh, share in PHASES:
+        count = int(n_points * share)
+        step_km = speed_kmh * interval_s / 3600
+        jitter = rng.normal(0, 0.000002, size=(count, 2))
+        for i in range(count):
+            lat += step_km / 111.0 * 0.7 + jitter[i, 0]
+            lon += step_km / 88.2 * 0.7 + jitter[i, 1]
+            ts += interval_s
+            yield {"lat": lat, "lon": lon, "ts": ts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming GPS trace segmentation.")
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    segments = list(segment_trace(iter_point_chunks(synthetic_trace(args.points), args.chunk_size)))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"points={args.points} chunk_size={args.chunk_size} "
+          f"elapsed={elapsed:.3f}s points/s={args.points / elapsed:,.0f} peak_mem={peak / 1024:.1f} KiB")
+    for n, segment in enumerate(segments, 1):
+        print(f"  segment {n}: {segment.distance_km:.2f} km, {segment.duration_seconds:.0f} s, "
+              f"p85={segment.speed_quantile(0.85):.1f} km/h -> {classify_segment(segment).value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 import models, schemas
 from models import User, Challenge, ChallengeMember, MobilityLog, CreditsLedger, GardenLevel, UserGarden, GardenWateringLog
 from schemas import UserCreate, ChallengeCreate, UserContext
+from services.distribution_service import distribution_service
+from services.carbon_factor_registry import carbon_factor_registry, points_for
 
 # =========================
 # UserGroup
@@ -91,6 +93,7 @@ def delete_user(db: Session, user_id: int):
 
     db.delete(user)
     db.commit()
+    distribution_service.forget(user_id)
     return user
 
 def get_user_with_group(db: Session, user_id: int) -> UserContext | None:
@@ -120,24 +123,14 @@ def authenticate_user(db: Session, username: str, password: str):
 # MobilityLog
 # =========================
 def create_mobility_log(db: Session, log: schemas.MobilityLogCreate):
-    # Get carbon factor for the mode
-    carbon_factor = db.query(models.CarbonFactor).filter(
-        models.CarbonFactor.mode == log.mode,
-        models.CarbonFactor.valid_from <= log.started_at,
-        models.CarbonFactor.valid_to >= log.ended_at
-    ).first()
-
-    if not carbon_factor:
-        # Fallback or raise error if no carbon factor found
-        # For simplicity, let's assume a default or raise an error
-        # For now, we'll use a default if not found, or 0 saved
-        co2_saved_g = 0.0
-        print(f"Warning: No carbon factor found for mode {log.mode}. CO2 saved set to 0.")
-    else:
-        co2_saved_g = float(log.distance_km) * float(carbon_factor.g_per_km)
+    # Resolve the carbon factor valid at started_at from the in-memory registry
+    carbon_factor_registry.ensure_fresh(db)
+    co2_baseline_g, co2_actual_g, co2_saved_g = carbon_factor_registry.emissions(
+        log.mode, log.distance_km, log.started_at
+    )
 
-    # Calculate points earned (e.g., 1 point per 100g CO2 saved)
-    points_earned = int(co2_saved_g / 100) # 1 point per 100g saved
+    # Calculate points earned with the same rule as MobilityService.log_mobility
+    points_earned = points_for(co2_saved_g)
 
     db_log = models.MobilityLog(
         user_id=log.user_id,
@@ -145,12 +138,14 @@ def create_mobility_log(db: Session, log: schemas.MobilityLogCreate):
         distance_km=log.distance_km,
         started_at=log.started_at,
         ended_at=log.ended_at,
+        co2_baseline_g=co2_baseline_g,
+        co2_actual_g=co2_actual_g,
         co2_saved_g=co2_saved_g,
         points_earned=points_earned,
         description=log.description,
         start_point=log.start_point,
         end_point=log.end_point,
-        # source_id, raw_ref_id, co2_baseline_g, co2_actual_g, used_at can be added if needed
+        # source_id, raw_ref_id, used_at can be added if needed
     )
     db.add(db_log)
     db.commit()
@@ -1,4 +1,7 @@
+import hashlib
+import json
 import os
+from datetime import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -44,28 +47,117 @@ def get_db():
     finally:
         db.close()
 
+def add_missing_columns(bind=None):
+    """
+    create_all 은 기존 테이블에 컬럼을 추가하지 않으므로, 모델에 새로 생긴 컬럼을
+    ALTER TABLE ... ADD COLUMN 으로 추가하고 빠진 인덱스를 만듭니다.
+    (새 컬럼은 nullable 이거나 server_default 가 있어야 합니다.)
+    """
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import CreateColumn
+
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            missing = [c for c in table.columns if c.name not in present]
+            for column in missing:
+                ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                added.append(f"{table.name}.{column.name}")
+            # 새 컬럼의 인덱스뿐 아니라 기존 테이블에 새로 선언된 인덱스도 만듭니다.
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    if added:
+        print(f"Added columns: {', '.join(added)}")
+    return added
+
+def _fingerprint(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str, ensure_ascii=False).encode()).hexdigest()
+
+
+def schema_fingerprint() -> str:
+    """Hash of the declared tables, columns and indexes."""
+    return _fingerprint([
+        [
+            table.name,
+            [[c.name, str(c.type), c.nullable, str(c.server_default.arg) if c.server_default is not None else None]
+             for c in table.columns],
+            sorted(index.name for index in table.indexes),
+        ]
+        for table in Base.metadata.sorted_tables
+    ])
+
+
+def _stored_fingerprints(bind) -> dict:
+    """name -> fingerprint from seed_fingerprints ({} when the table does not exist yet)."""
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError, ProgrammingError
+
+    try:
+        with bind.connect() as conn:
+            return dict(conn.execute(text("SELECT name, fingerprint FROM seed_fingerprints")).all())
+    except (OperationalError, ProgrammingError):
+        return {}
+
+
+def _save_fingerprint(db, name: str, fingerprint: str):
+    from models import SeedFingerprint
+
+    db.merge(SeedFingerprint(name=name, fingerprint=fingerprint, applied_at=datetime.utcnow()))
+    db.commit()
+
+
 def init_db():
     """
     데이터베이스 테이블을 생성하고 초기 데이터를 삽입하는 함수입니다.
     서버 시작 시 호출될 수 있습니다.
+
+    스키마(테이블/컬럼/인덱스 정의)와 각 시드 데이터의 해시를 seed_fingerprints 에 남겨 두고,
+    바뀐 것이 없으면 create_all / 컬럼 보정 / 시딩을 건너뜁니다. DB 를 직접 고친 경우에는
+    seed_fingerprints 행을 지우면 다음 시작 때 다시 적용됩니다.
     """
-    # 테이블 생성
-    Base.metadata.create_all(bind=engine)
-    
-    # 초기 데이터 시딩
-    from seed_admin_user import seed_admin_user
-    from seed_challenges import seed_challenges
-    from seed_garden_levels import seed_garden_levels
+    from services.startup_profile import startup_profile
+    from seed_admin_user import seed_admin_user, ADMIN_USER
+    from seed_challenges import seed_challenges, DEFAULT_CHALLENGES
+    from seed_garden_levels import seed_garden_levels, GARDEN_LEVELS
+
+    with startup_profile.step("init_db: read fingerprints"):
+        stored = _stored_fingerprints(engine)
 
+    schema = schema_fingerprint()
+    if stored.get("schema") != schema:
+        # 테이블 생성
+        with startup_profile.step("init_db: create_all"):
+            Base.metadata.create_all(bind=engine)
+        with startup_profile.step("init_db: add_missing_columns"):
+            add_missing_columns()
+
+    # 초기 데이터 시딩 (데이터가 바뀐 시더만)
+    seeders = [
+        ("admin_user", ADMIN_USER, seed_admin_user),
+        ("challenges", DEFAULT_CHALLENGES, seed_challenges),
+        ("garden_levels", GARDEN_LEVELS, seed_garden_levels),
+    ]
     db = SessionLocal()
     try:
-        # 여기에 필요한 초기 데이터 생성 로직을 추가할 수 있습니다.
-        # 예: 기본 그룹 생성 등
-        seed_admin_user(db)
-        seed_challenges(db)
-        seed_garden_levels(db)
-        print("Database seeding completed successfully.")
+        if stored.get("schema") != schema:
+            _save_fingerprint(db, "schema", schema)
+        for name, data, seed in seeders:
+            fingerprint = _fingerprint(data)
+            if stored.get(name) == fingerprint:
+                continue
+            with startup_profile.step(f"init_db: seed {name}"):
+                seed(db)
+                _save_fingerprint(db, name, fingerprint)
+            print(f"Seeded {name}.")
     except Exception as e:
+        db.rollback()
         print(f"An error occurred during database seeding: {e}")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,14 +1,23 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Callable, Optional
+import hashlib
+import hmac
+import json
 import models, schemas
 from database import get_db
+from services.data_version import data_versions
 import os
 
 # .env 파일에서 SECRET_KEY와 ALGORITHM 로드
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
+# /metrics 수집기(Prometheus)용 Bearer 토큰. 없으면 관리자 로그인 토큰만 허용
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -32,6 +41,91 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     return user
 
 def get_current_admin_user(current_user: models.User = Depends(get_current_user)):
-    if current_user.role != schemas.UserRole.ADMIN:
+    if current_user.role != models.UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
     return current_user
+
+def get_metrics_access(request: Request, db: Session = Depends(get_db)):
+    """Let a scraper in with METRICS_TOKEN as its bearer token; anyone else must be an admin."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if METRICS_TOKEN and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        return
+    get_current_admin_user(get_current_user(token, db))
+
+
+# --------------------------------------------------------------------------
+# HTTP 조건부 요청 (ETag / 304)
+# --------------------------------------------------------------------------
+PRIVATE_CACHE_CONTROL = "private, no-cache"          # 매번 재검증 (304 로 본문 생략)
+STATIC_CACHE_CONTROL = "public, max-age=86400"       # 정적 카탈로그는 하루 동안 재검증 없이 사용
+
+
+class NotModified(Exception):
+    """Raised by ETag dependencies before the route body runs; main.py turns it into a bodyless 304."""
+
+    def __init__(self, etag: str, cache_control: str):
+        self.etag = etag
+        self.cache_control = cache_control
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110 §13.1.2) against a comma-separated If-None-Match header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()) == opaque
+        for tag in if_none_match.split(",")
+    )
+
+
+def content_etag(payload) -> str:
+    """Strong ETag from the JSON content of a static catalog."""
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def check_etag(request: Request, response: Response, etag: str, cache_control: str):
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise NotModified(etag, cache_control)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def user_etag(*scopes: str, extra: Optional[Callable[[], object]] = None):
+    """
+    Dependency factory for user-scoped GET routes. The weak ETag combines the
+    user's data_version (already on the authenticated User row), today's UTC
+    date (for "today" / rolling-window figures), the versions of shared
+    `scopes` and `extra()`. A matching If-None-Match ends the request with
+    304 before the route runs any aggregate query. Returns the current user.
+    """
+    def dependency(
+        request: Request,
+        response: Response,
+        current_user: models.User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+    ) -> models.User:
+        parts = [current_user.user_id, current_user.data_version or 0, datetime.utcnow().strftime("%Y%m%d")]
+        if scopes:
+            parts.extend(data_versions.versions(db, scopes))
+        if extra:
+            parts.append(extra())
+        check_etag(request, response, 'W/"' + ".".join(str(p) for p in parts) + '"', PRIVATE_CACHE_CONTROL)
+        return current_user
+    return dependency
+
+
+def static_etag(get_etag: Callable[[], str]):
+    """Dependency factory for static catalogs: content-hash ETag with a long cache lifetime."""
+    def dependency(request: Request, response: Response):
+        check_etag(request, response, get_etag(), STATIC_CACHE_CONTROL)
+    return dependency
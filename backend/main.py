@@ -1,16 +1,46 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from services.startup_profile import startup_profile  # 시작 단계별 시간 기록 (표준 라이브러리만 사용)
+
+with startup_profile.step("import fastapi"):
+    from fastapi import Depends, FastAPI, HTTPException, Request, Response
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import PlainTextResponse
+    from fastapi.staticfiles import StaticFiles
+import logging
 import os
 from dotenv import load_dotenv
 
 # .env 파일 로드
 load_dotenv(os.path.join(os.path.dirname(__file__), "../.env"))
 
-from database import init_db, SessionLocal
-from routes import dashboard, credits, challenges, auth, achievements, users, admin, mobility, ai_challenge_router, groups, group_challenges, shop, garden
-from seed_admin_user import seed_admin_user
-from ai_logic import router as chat_router
+# 구조화 로깅 (LOG_LEVEL, LOG_FORMAT=json|text)
+from services.structured_log import configure_logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
+with startup_profile.step("import database, models"):
+    from database import init_db, SessionLocal, engine
+with startup_profile.step("import routers"):
+    from routes import dashboard, credits, challenges, auth, achievements, users, admin, mobility, ai_challenge_router, groups, group_challenges, shop, garden, statistics, home
+    from dependencies import NotModified, get_metrics_access
+    from ai_logic import router as chat_router
+with startup_profile.step("import services"):
+    from services.distribution_service import distribution_service
+    from services.carbon_factor_registry import carbon_factor_registry
+    from services.station_index import station_index
+    from services.nearby_service import nearby_station_cache
+    from services.event_bus import event_bus, outbox_consumer
+    from services.achievement_engine import achievement_engine
+    from services.achievement_state import achievement_states, achievement_catalog
+    import services.trip_handlers  # TripRecorded / CreditsEarned 핸들러 등록
+    from services.scheduler import scheduler
+    from services.challenge_lifecycle import challenge_lifecycle
+    from services.group_challenge_service import group_challenge_cache
+    from services.group_totals import group_totals
+    import services.scheduled_jobs  # 주기 작업 등록
+    from services.data_version import data_versions
+    from services.response_cache import response_cache, STATIONS
+    from services.cache_epochs import cache_epochs
+    from services.request_metrics import RequestMetricsMiddleware, request_metrics
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -32,7 +62,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],   # 키셋 페이지네이션 다음 커서, 조건부 요청, 요청 계측
 )
+# 요청 계측: 라우트별 지연/응답 크기/SQL 수 + Server-Timing 헤더 (가장 바깥에서 측정하도록 마지막에 추가)
+app.add_middleware(RequestMetricsMiddleware)
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    """If-None-Match 가 일치하면 본문 없는 304"""
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": exc.cache_control})
 
 # 정적 파일 서빙 (이미지 등)
 if os.path.exists("frontend/public"):
@@ -44,6 +82,7 @@ if os.path.exists("backend/reports"):
 
 # 라우터 등록
 app.include_router(dashboard.router)
+app.include_router(home.router)
 app.include_router(credits.router)
 app.include_router(challenges.router)
 app.include_router(auth.router)
@@ -51,19 +90,80 @@ app.include_router(achievements.router)
 app.include_router(users.router)
 app.include_router(admin.router)
 app.include_router(chat_router)
-print("DEBUG: Including mobility.router") # Debug print
+logger.debug("including router", extra={"router": "mobility"})
 app.include_router(mobility.router) # mobility 라우터 추가
 app.include_router(ai_challenge_router.router) # AI 챌린지 라우터 추가
 app.include_router(groups.router)
 app.include_router(group_challenges.router)
 app.include_router(shop.router)
 app.include_router(garden.router)
+app.include_router(statistics.router)
 
 @app.on_event("startup")
 async def startup_event():
     """앱 시작시 실행되는 이벤트"""
     # 데이터베이스 테이블 생성 및 초기 데이터 시딩
-    init_db()
+    with startup_profile.step("init_db"):
+        init_db()
+
+    # 전국 분포 스케치: DB에서 재구성 후 커밋 훅으로 증분 갱신
+    distribution_service.install(SessionLocal)
+    # 탄소 배출 계수 레지스트리: 테이블 변경 시 자동 재적재
+    carbon_factor_registry.install(SessionLocal)
+    # 업적 비트셋: user_achievements 변경과 같은 flush 에서 갱신
+    achievement_states.install(SessionLocal)
+    # 그룹 인원 수 / 누적 절감량: 멤버 변경과 같은 flush 에서 갱신
+    group_totals.install(SessionLocal)
+    # ETag 용 데이터 버전: 사용자 범위 쓰기와 같은 flush 에서 증가
+    data_versions.install(SessionLocal)
+    # 라우트 응답 캐시: 관련 모델이 커밋되면 태그 단위로 무효화
+    response_cache.install(SessionLocal)
+    # 요청별 SQL 문 수 / DB 시간 (/metrics, Server-Timing)
+    request_metrics.install_sql_hooks(engine)
+    db = SessionLocal()
+    try:
+        with startup_profile.step("distribution_service.rebuild"):
+            distribution_service.rebuild(db)
+        with startup_profile.step("carbon_factor_registry.load"):
+            carbon_factor_registry.load(db)
+        # 정류장 데이터: 컴파일된 아티팩트를 mmap (없거나 오래되었으면 테이블에서 읽고 다시 컴파일)
+        with startup_profile.step("station_index.ensure_loaded"):
+            station_index.ensure_loaded(db)
+        # 업적 규칙 카탈로그를 achievements 테이블과 동기화
+        with startup_profile.step("achievement_engine.ensure_catalog"):
+            achievement_engine.ensure_catalog(db)
+            db.commit()
+        with startup_profile.step("achievement_states.ensure_built"):
+            achievement_states.ensure_built(db)
+            achievement_catalog.load(db)
+        with startup_profile.step("group_totals.ensure_built"):
+            group_totals.ensure_built(db)
+        with startup_profile.step("data_versions.ensure_scopes"):
+            data_versions.ensure_scopes(db)
+    finally:
+        db.close()
+
+    # 도메인 이벤트: outbox 를 비우는 비동기 소비자 풀
+    event_bus.install(SessionLocal)
+    outbox_consumer.start(SessionLocal)
+
+    # 챌린지 상태 전이와 주기 작업 (리더 워커 하나만 DB 작업 실행)
+    challenge_lifecycle.install(SessionLocal)
+    group_challenge_cache.install(SessionLocal)
+    scheduler.start(SessionLocal)
+    # 정류장 테이블이 다른 프로세스(seed_transport_data 등)에서 바뀌면 인덱스와 주변 타일 캐시를 다시 만듭니다
+    cache_epochs.subscribe(station_index.invalidate, tags=(STATIONS,))
+    cache_epochs.subscribe(nearby_station_cache.clear, tags=(STATIONS,))
+    # 다른 워커가 올린 캐시 태그 epoch 폴링 (PRAGMA data_version)
+    cache_epochs.start(engine)
+    startup_profile.ready()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """앱 종료시 실행되는 이벤트"""
+    await scheduler.stop()
+    await outbox_consumer.stop()
+    await cache_epochs.stop()
 
 @app.get("/")
 async def root():
@@ -74,6 +174,11 @@ async def root():
         "docs": "/docs"
     }
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(get_metrics_access)])
+def metrics():
+    """Prometheus 수집용 요청 지표 (이 워커 기준, METRICS_TOKEN 또는 관리자 토큰 필요)"""
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     """헬스 체크 엔드포인트"""
@@ -2,7 +2,7 @@ from datetime import datetime
 import enum
 
 from sqlalchemy import (
-    Column, BigInteger, Enum, DateTime, Numeric, String, Integer, ForeignKey, Boolean, Text
+    Column, BigInteger, Enum, DateTime, Numeric, String, Integer, ForeignKey, Boolean, Text, Index, Float, LargeBinary
 )
 from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.orm import relationship
@@ -59,6 +59,12 @@ class GardenStatus(str, enum.Enum):
     IN_PROGRESS = "IN_PROGRESS"
     COMPLETED = "COMPLETED"
 
+class OutboxStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
 # New Enums for Group Feature
 class GroupRole(str, enum.Enum):
     LEADER = "leader"
@@ -105,6 +111,8 @@ class User(Base):
     user_group_id = Column(BigInteger, ForeignKey("user_groups.group_id"))
     role = Column(Enum(UserRole), default=UserRole.USER)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # 사용자 범위 데이터(이동 기록, 크레딧, 정원, 인벤토리 등)가 바뀔 때마다 1 증가 (ETag)
+    data_version = Column(BigInteger, nullable=False, server_default="0", default=0)
     
     # Relationships
     group = relationship("UserGroup", backref="users")
@@ -112,6 +120,11 @@ class User(Base):
     credits = relationship("CreditsLedger", backref="user")
     garden = relationship("UserGarden", backref="user", uselist=False)
 
+    __table_args__ = (
+        # 관리자 사용자 목록 키셋 페이지 (created_at, user_id)
+        Index("ix_users_created", "created_at", "user_id"),
+    )
+
 
 # ---------------------------
 # SOCIAL GROUPS (New)
@@ -127,14 +140,21 @@ class Group(Base):
     created_at = Column(DateTime, server_default=func.now())
     is_active = Column(Boolean, default=True)
     max_members = Column(Integer, default=50)
+    # 비정규화 집계 (services/group_totals.py 가 멤버 변경/이동 기록 때 갱신)
+    active_member_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_co2_saved_g = Column(Numeric(14, 3), nullable=False, default=0, server_default="0")
 
     creator = relationship("User", backref="created_groups")
     members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan")
     challenges = relationship("GroupChallenge", back_populates="group", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_groups_active_co2", "is_active", "total_co2_saved_g"),
+    )
+
     @property
     def member_count(self) -> int:
-        return sum(1 for member in self.members if member.is_active)
+        return self.active_member_count or 0
 
 class GroupMember(Base):
     __tablename__ = "group_members"
@@ -149,6 +169,13 @@ class GroupMember(Base):
     group = relationship("Group", back_populates="members")
     user = relationship("User", backref="group_memberships")
 
+    __table_args__ = (
+        # 그룹별 멤버 키셋 페이지 (group_id, is_active, joined_at, member_id)
+        Index("ix_group_members_group_joined", "group_id", "is_active", "joined_at", "member_id"),
+        # 사용자가 속한 그룹 요약 목록
+        Index("ix_group_members_user_active", "user_id", "is_active"),
+    )
+
 class GroupChallenge(Base):
     __tablename__ = "group_challenges"
 
@@ -233,6 +260,11 @@ class MobilityLog(Base):
     # Relationships
     source = relationship("IngestSource", backref="mobility_logs")
 
+    __table_args__ = (
+        # 이동 내역 키셋 페이지 (user_id, started_at, log_id)
+        Index("ix_mobility_logs_user_started", "user_id", "started_at", "log_id"),
+    )
+
 
 # ---------------------------
 # CREDITS LEDGER
@@ -252,6 +284,11 @@ class CreditsLedger(Base):
     # Relationships
     mobility_log = relationship("MobilityLog", backref="credit_entries")
 
+    __table_args__ = (
+        # 크레딧 내역 키셋 페이지 (user_id, created_at, entry_id)
+        Index("ix_credits_ledger_user_created", "user_id", "created_at", "entry_id"),
+    )
+
 
 # Challenges
 class Challenge(Base):
@@ -305,6 +342,42 @@ class UserAchievement(Base):
     achievement_id = Column(BigInteger, ForeignKey("achievements.achievement_id"), primary_key=True)
     granted_at = Column(DateTime, default=datetime.utcnow)
 
+class UserAchievementCounter(Base):
+    """Per-user running counters the achievement rules are evaluated against."""
+    __tablename__ = "user_achievement_counters"
+
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), primary_key=True)
+    counter = Column(String(50), primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class UserAchievementState(Base):
+    """
+    Compact copy of a user's user_achievements rows: bit `achievement_id` of
+    `unlocked_bits` (little-endian) is set when granted, and `granted_ts` holds
+    the grant times as int64 epoch seconds in ascending achievement_id order.
+    """
+    __tablename__ = "user_achievement_states"
+
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), primary_key=True)
+    unlocked_bits = Column(LargeBinary, nullable=False, default=b"")
+    granted_ts = Column(LargeBinary, nullable=False, default=b"")
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class UserActivityYear(Base):
+    """
+    One calendar year of a user's eco-trip activity: bit d of `active_bits`
+    (little-endian, d = day of year - 1) is set on days with an eco trip, and
+    `intensity` holds that day's CO2 saved in grams as float32[366].
+    """
+    __tablename__ = "user_activity_years"
+
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    active_bits = Column(LargeBinary, nullable=False)
+    intensity = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 # Notifications
 class Notification(Base):
     __tablename__ = "notifications"
@@ -440,3 +513,68 @@ class PlacedObject(Base):
     y = Column(Numeric(10, 4), nullable=False)
     
     user = relationship("User", backref="placed_objects")
+
+
+# ---------------------------
+# Domain Events (Transactional Outbox)
+# ---------------------------
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    event_id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(50), nullable=False)
+    user_id = Column(BigInteger, ForeignKey("users.user_id"))
+    aggregate_id = Column(BigInteger)
+    payload = Column(JSON, nullable=False)
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = Column(String(50))
+    claimed_at = Column(DateTime)
+    processed_at = Column(DateTime)
+    last_error = Column(String(500))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_outbox_events_status_available", "status", "available_at"),
+    )
+
+class OutboxHandled(Base):
+    """Marks that a handler already applied an event (makes redelivery idempotent)."""
+    __tablename__ = "outbox_handled"
+
+    event_id = Column(Integer, ForeignKey("outbox_events.event_id"), primary_key=True)
+    handler = Column(String(100), primary_key=True)
+    handled_at = Column(DateTime, default=datetime.utcnow)
+
+class SchedulerLease(Base):
+    """Leader lock for the in-process scheduler; the holder renews `expires_at` while alive."""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(100), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+class DataVersion(Base):
+    """Version of data shared by many users (e.g. the challenge list), used in ETags."""
+    __tablename__ = "data_versions"
+
+    scope = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class CacheEpoch(Base):
+    """Per-tag invalidation counter shared by worker processes (services/cache_epochs.py)."""
+    __tablename__ = "cache_epochs"
+
+    tag = Column(String(100), primary_key=True)
+    epoch = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class SeedFingerprint(Base):
+    """Hash of the seed data (or schema) last applied at startup; init_db skips unchanged seeders."""
+    __tablename__ = "seed_fingerprints"
+
+    name = Column(String(50), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
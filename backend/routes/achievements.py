@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from typing import List
 
 import crud, models, schemas
 from database import get_db
-from dependencies import get_current_user # Import get_current_user
+from dependencies import content_etag, get_current_user, static_etag, user_etag # Import get_current_user
+from services.achievement_state import achievement_states, achievement_catalog
 
 router = APIRouter(
     prefix="/api/achievements", # Change prefix to include /api
@@ -13,27 +13,51 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[dict]) # Change path to "/" and add response_model
-def get_achievements(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)): # Get user from dependency
-    user_id = current_user.user_id # Get user_id from current_user
-    query = text(
-        """
-        SELECT a.achievement_id, a.title, a.description, ua.granted_at
-        FROM achievements a
-        LEFT JOIN user_achievements ua
-          ON ua.achievement_id = a.achievement_id AND ua.user_id = :uid
-        ORDER BY a.achievement_id
-        """
-    )
-    rows = db.execute(query, {"uid": user_id}).fetchall()
-    result = []
-    for r in rows:
-        is_unlocked = bool(r[3]) # granted_at이 있으면 잠금 해제
-        result.append({
-            "id": int(r[0]),
-            "name": r[1],
-            "desc": r[2],
-            "date": str(r[3]) if r[3] else None,
-            "unlocked": is_unlocked,
-            "progress": 100 if is_unlocked else 0,  # 잠금 해제 여부에 따라 100 또는 0
-        })
-    return result
+def get_achievements(current_user: models.User = Depends(user_etag(extra=lambda: achievement_catalog.version)), db: Session = Depends(get_db)): # Get user from dependency
+    # 메모리 카탈로그를 순회하며 사용자 비트셋만 검사합니다 (JOIN 없음)
+    return achievement_states.listing(db, current_user.user_id)
+
+def _catalog_payload() -> List[dict]:
+    return [{"id": e.achievement_id, "code": e.code, "name": e.title} for e in achievement_catalog.entries]
+
+_catalog_etag = {"version": None, "etag": None}
+
+def _achievement_catalog_etag() -> str:
+    """카탈로그 내용 해시 (카탈로그가 다시 적재될 때만 새로 계산)"""
+    if _catalog_etag["version"] != achievement_catalog.version:
+        _catalog_etag["etag"] = content_etag(_catalog_payload())
+        _catalog_etag["version"] = achievement_catalog.version
+    return _catalog_etag["etag"]
+
+@router.get("/catalog", response_model=List[schemas.AchievementCatalogEntry], dependencies=[Depends(static_etag(_achievement_catalog_etag))])
+def get_achievement_catalog():
+    """전체 업적 목록 (사용자 무관, 내용 해시 ETag)"""
+    return _catalog_payload()
+
+@router.get("/groups/{group_id}", response_model=schemas.GroupAchievementStates)
+def get_group_achievement_states(
+    group_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """그룹 멤버 전체의 업적 잠금 해제 상태를 한 번에 조회합니다."""
+    member_ids = [
+        row[0] for row in db.query(models.GroupMember.user_id).filter(
+            models.GroupMember.group_id == group_id,
+            models.GroupMember.is_active == True
+        )
+    ]
+    if current_user.user_id not in member_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="그룹 멤버만 조회할 수 있습니다.")
+
+    entries = achievement_catalog.ensure_fresh(db)
+    unlocked = achievement_states.unlocked_many(db, member_ids)
+    return {
+        "group_id": group_id,
+        "catalog_version": achievement_catalog.version,
+        "achievements": [{"id": e.achievement_id, "code": e.code, "name": e.title} for e in entries],
+        "members": [
+            {"user_id": user_id, "unlocked": sorted(unlocked[user_id]), "unlocked_count": len(unlocked[user_id])}
+            for user_id in member_ids
+        ],
+    }
@@ -1,18 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
 import database, schemas, models
+from dependencies import get_current_admin_user
 from services.mobility_service import MobilityService # NEW IMPORT
+from services.recompute_service import MobilityRecomputeService
+from services.distribution_service import distribution_service
+from services.achievement_engine import achievement_engine
+from services.activity_calendar import activity_calendar
+from services.scheduler import scheduler
+from services.group_totals import group_totals
+from services.response_cache import response_cache, LEADERBOARD, STATISTICS
+from services.cache_epochs import cache_epochs
+from services.startup_profile import startup_profile
+from services.pagination import filter_range, keyset_page, page_size
 
 router = APIRouter(
     prefix="/admin",
     tags=["Admin"]
 )
 
+# 유지보수 / 운영 지표 엔드포인트는 ADMIN 역할의 토큰이 있어야 합니다
+admin_only = [Depends(get_current_admin_user)]
+
 @router.get("/users", response_model=List[schemas.User])
-def get_all_users(db: Session = Depends(database.get_db)):
-    users = db.query(models.User).all()
+def get_all_users(
+    response: Response,
+    limit: Optional[int] = Query(None, description="페이지 크기 (1~1000 으로 잘림). limit 과 cursor 가 모두 없으면 전체 목록"),
+    cursor: Optional[str] = None,
+    role: Optional[models.UserRole] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(database.get_db)
+):
+    # limit/cursor 가 없으면 기존처럼 전체 목록, 있으면 가입일 역순 키셋 페이지
+    # (다음 페이지 커서는 X-Next-Cursor 헤더)
+    query = db.query(models.User)
+    if role:
+        query = query.filter(models.User.role == role)
+    query = filter_range(query, models.User.created_at, date_from, date_to)
+    if limit is None and cursor is None:
+        return query.all()
+    try:
+        users, next_cursor = keyset_page(
+            query, models.User.created_at, models.User.user_id, cursor, page_size(limit or 100, maximum=1000)
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return users
 
 @router.post("/grant-points")
@@ -65,3 +103,56 @@ def add_mobility_log(
     db_mobility_log = MobilityService.log_mobility(db, log_create, user)
 
     return {"message": f"Mobility log added and {db_mobility_log.points_earned} points earned for user {log_create.user_id}"}
+
+
+@router.post("/carbon-factors/recompute", dependencies=admin_only)
+def recompute_carbon_savings(
+    dry_run: bool = True,
+    since: Optional[datetime] = None,
+    mode: Optional[schemas.TransportMode] = None,
+    db: Session = Depends(database.get_db)
+):
+    """탄소 배출 계수 변경 후 기존 이동 기록의 CO2/포인트를 재계산합니다 (기본값: dry-run)."""
+    summary = MobilityRecomputeService.recompute(
+        database.engine,
+        since=since,
+        modes=[mode] if mode else None,
+        dry_run=dry_run,
+    )
+    if not dry_run and summary["changed"]:
+        # Core UPDATE는 세션 훅을 거치지 않으므로 분포 스케치와 그룹 합계를 다시 구성합니다.
+        distribution_service.rebuild(db)
+        response_cache.invalidate_on_commit(db, LEADERBOARD, STATISTICS)
+        group_totals.rebuild(db)   # 커밋
+    return summary
+
+
+@router.post("/achievements/backfill", dependencies=admin_only)
+def backfill_achievements(db: Session = Depends(database.get_db)):
+    """이동/크레딧 이력 전체로 업적 카운터를 다시 계산하고 충족한 업적을 일괄 부여합니다."""
+    achievement_engine.ensure_catalog(db)
+    return achievement_engine.backfill(db)
+
+
+@router.post("/activity-calendar/backfill", dependencies=admin_only)
+def backfill_activity_calendar(db: Session = Depends(database.get_db)):
+    """이동 기록 전체로 사용자별 연간 활동 비트맵을 다시 만듭니다."""
+    return activity_calendar.backfill(db)
+
+
+@router.get("/scheduler", dependencies=admin_only)
+def get_scheduler_metrics():
+    """스케줄러 리더 상태, 대기 중인 타이머 수, 작업별 실행 지표를 조회합니다."""
+    return scheduler.metrics()
+
+
+@router.get("/response-cache", dependencies=admin_only)
+def get_response_cache_metrics():
+    """라우트 응답 캐시의 항목 수, 라우트별 적중률, 태그별 무효화 횟수와 프로세스 간 무효화 폴링 상태를 조회합니다."""
+    return {**response_cache.metrics(), "cross_process": cache_epochs.metrics()}
+
+
+@router.get("/startup", dependencies=admin_only)
+def get_startup_profile():
+    """이 워커의 시작 단계별 소요 시간 (import 묶음, init_db, startup 훅)을 조회합니다."""
+    return startup_profile.report()
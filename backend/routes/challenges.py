@@ -1,13 +1,14 @@
 # routes/challenges.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from typing import List
 from pydantic import BaseModel
 
 import crud, models, schemas
 from database import get_db
-from dependencies import get_current_user
+from dependencies import get_current_user, user_etag
+from services.data_version import CHALLENGES
+from services.achievement_state import achievement_states
 
 # /api/challenges 경로로 설정
 router = APIRouter(
@@ -45,7 +46,7 @@ def join_challenge(
 
 
 @router.get("/", response_model=List[schemas.FrontendChallenge])
-def get_challenges(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_challenges(current_user: models.User = Depends(user_etag(CHALLENGES)), db: Session = Depends(get_db)):
     """
     사용자의 챌린지 목록과 참여 상태를 반환합니다.
     """
@@ -197,26 +198,4 @@ def complete_challenge(
 
 @router.get("/achievements", response_model=List[dict])
 def get_achievements(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    user_id = current_user.user_id
-    query = text(
-        """
-        SELECT a.achievement_id, a.title, a.description, ua.granted_at
-        FROM achievements a
-        LEFT JOIN user_achievements ua
-          ON ua.achievement_id = a.achievement_id AND ua.user_id = :uid
-        ORDER BY a.achievement_id
-        """
-    )
-    rows = db.execute(query, {"uid": user_id}).fetchall()
-    result = []
-    for r in rows:
-        is_unlocked = bool(r[3])
-        result.append({
-            "id": int(r[0]),
-            "name": r[1],
-            "desc": r[2],
-            "date": str(r[3]) if r[3] else None,
-            "unlocked": is_unlocked,
-            "progress": 100 if is_unlocked else 0,
-        })
-    return result
+    return achievement_states.listing(db, current_user.user_id)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends
+import logging
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
@@ -6,31 +7,40 @@ from datetime import datetime, timedelta
 import json
 
 from database import get_db
-from models import User, CreditsLedger, MobilityLog, UserGarden, GardenWateringLog, GardenLevel
+from models import User, CreditsLedger, CreditType, MobilityLog, TransportMode, UserGarden, GardenWateringLog, GardenLevel
 from schemas import (
     CreditBalance, CreditTransaction, CreditHistory, 
     GardenStatus, WateringRequest, WateringResponse, AddPointsRequest
 )
-from dependencies import get_current_user
+from dependencies import get_current_user, user_etag
+from services.pagination import filter_range, keyset_page, page_size
 
 router = APIRouter(prefix="/api/credits", tags=["credits"])
+logger = logging.getLogger(__name__)
 
 # 크레딧 잔액 조회
 @router.get("/balance", response_model=CreditBalance)
-async def get_credit_balance(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_credit_balance(current_user: User = Depends(user_etag()), db: Session = Depends(get_db)):
     """사용자의 크레딧 잔액을 조회합니다."""
     user_id = current_user.user_id
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
+    return build_credit_balance(db, user_id)
+
+
+def build_credit_balance(
+    db: Session, user_id: int, total_points: Optional[int] = None, total_carbon_reduced_g: Optional[float] = None
+) -> CreditBalance:
+    """잔액 집계 본체. 이미 계산된 누적 포인트 / 누적 절감량은 넘겨받아 다시 합산하지 않습니다."""
     # 총 포인트 계산
-    total_points = db.query(CreditsLedger).filter(
-        CreditsLedger.user_id == user_id
-    ).with_entities(
-        func.sum(CreditsLedger.points)
-    ).scalar() or 0
-    print(f"DEBUG: get_credit_balance - User {user_id} calculated total_points: {total_points}") # Debug log
+    if total_points is None:
+        total_points = db.query(CreditsLedger).filter(
+            CreditsLedger.user_id == user_id
+        ).with_entities(
+            func.sum(CreditsLedger.points)
+        ).scalar() or 0
+    logger.debug("credit balance total_points", extra={"user_id": user_id, "total_points": total_points})
     
     # 최근 30일 적립 포인트
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -43,11 +53,12 @@ async def get_credit_balance(current_user: User = Depends(get_current_user), db:
     ).scalar() or 0
     
     # 총 탄소 절감량 계산
-    total_carbon_reduced_g = db.query(MobilityLog).filter(
-        MobilityLog.user_id == user_id
-    ).with_entities(
-        func.sum(MobilityLog.co2_saved_g)
-    ).scalar() or 0.0
+    if total_carbon_reduced_g is None:
+        total_carbon_reduced_g = db.query(MobilityLog).filter(
+            MobilityLog.user_id == user_id
+        ).with_entities(
+            func.sum(MobilityLog.co2_saved_g)
+        ).scalar() or 0.0
     
     return CreditBalance(
         user_id=user_id,
@@ -60,22 +71,40 @@ async def get_credit_balance(current_user: User = Depends(get_current_user), db:
 # 크레딧 거래 내역 조회
 @router.get("/history/{user_id}", response_model=List[CreditTransaction])
 async def get_credit_history(
-    limit: int = 20, 
+    response: Response,
+    limit: int = Query(20, description="페이지 크기. cursor 로 이어 읽을 때는 1~200 으로 잘리고, 첫 페이지와 offset 방식은 기존처럼 그대로 적용됩니다."),
     offset: int = 0,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    type_filter: Optional[CreditType] = Query(None, alias="type"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(user_etag()),
     db: Session = Depends(get_db)
 ):
-    """사용자의 크레딧 거래 내역을 조회합니다."""
+    """사용자의 크레딧 거래 내역을 조회합니다. 다음 페이지 커서는 X-Next-Cursor 헤더로 돌려줍니다."""
     user_id = current_user.user_id
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    transactions = db.query(CreditsLedger).filter(
-        CreditsLedger.user_id == user_id
-    ).order_by(
-        CreditsLedger.created_at.desc()
-    ).offset(offset).limit(limit).all()
+    query = db.query(CreditsLedger).filter(CreditsLedger.user_id == user_id)
+    if type_filter:
+        query = query.filter(CreditsLedger.type == type_filter)
+    query = filter_range(query, CreditsLedger.created_at, date_from, date_to)
+    if not cursor and (offset or limit < 1):
+        # 기존 offset 방식 (하위 호환, limit 범위 제한 없음)
+        transactions = query.order_by(
+            CreditsLedger.created_at.desc(), CreditsLedger.entry_id.desc()
+        ).offset(offset).limit(limit).all()
+    else:
+        try:
+            transactions, next_cursor = keyset_page(
+                query, CreditsLedger.created_at, CreditsLedger.entry_id, cursor, page_size(limit) if cursor else limit
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
     
     return [
         CreditTransaction(
@@ -224,7 +253,7 @@ async def water_garden(
     ).with_entities(
         func.sum(CreditsLedger.points)
     ).scalar() or 0
-    print(f"DEBUG: water_garden - User {user_id} current balance BEFORE deduction: {current_balance}") # Debug log
+    logger.debug("water_garden balance before deduction", extra={"user_id": user_id, "balance": current_balance})
     
     if current_balance < request.points_spent:
         raise HTTPException(status_code=400, detail="Insufficient points")
@@ -277,7 +306,7 @@ async def water_garden(
     ).with_entities(
         func.sum(CreditsLedger.points)
     ).scalar() or 0
-    print(f"DEBUG: water_garden - User {user_id} balance AFTER deduction and commit: {updated_balance}") # Debug log
+    logger.debug("water_garden balance after deduction", extra={"user_id": user_id, "balance": updated_balance})
     
     return WateringResponse(
         success=True,
@@ -292,13 +321,16 @@ async def water_garden(
 
 # 정원 상태 조회
 @router.get("/garden/{user_id}", response_model=GardenStatus)
-async def get_garden_status(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_garden_status(current_user: User = Depends(user_etag()), db: Session = Depends(get_db)):
     """사용자의 정원 상태를 조회합니다."""
     user_id = current_user.user_id
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
+    return build_garden_status(db, user_id)
+
+
+def build_garden_status(db: Session, user_id: int) -> GardenStatus:
     garden = db.query(UserGarden).filter(
         UserGarden.user_id == user_id
     ).first()
@@ -439,22 +471,40 @@ async def add_points(
 # 대중교통 이용 내역 조회
 @router.get("/mobility/{user_id}", response_model=List[dict])
 async def get_mobility_history(
-    limit: int = 20,
+    response: Response,
+    limit: int = Query(20, description="페이지 크기. cursor 로 이어 읽을 때는 1~200 으로 잘리고, 첫 페이지와 offset 방식은 기존처럼 그대로 적용됩니다."),
     offset: int = 0,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    mode: Optional[TransportMode] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(user_etag()),
     db: Session = Depends(get_db)
 ):
-    """사용자의 대중교통 이용 내역을 조회합니다."""
+    """사용자의 대중교통 이용 내역을 조회합니다. 다음 페이지 커서는 X-Next-Cursor 헤더로 돌려줍니다."""
     user_id = current_user.user_id
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    logs = db.query(MobilityLog).filter(
-        MobilityLog.user_id == user_id
-    ).order_by(
-        MobilityLog.started_at.desc()
-    ).offset(offset).limit(limit).all()
+    query = db.query(MobilityLog).filter(MobilityLog.user_id == user_id)
+    if mode:
+        query = query.filter(MobilityLog.mode == mode)
+    query = filter_range(query, MobilityLog.started_at, date_from, date_to)
+    if not cursor and (offset or limit < 1):
+        # 기존 offset 방식 (하위 호환, limit 범위 제한 없음)
+        logs = query.order_by(
+            MobilityLog.started_at.desc(), MobilityLog.log_id.desc()
+        ).offset(offset).limit(limit).all()
+    else:
+        try:
+            logs, next_cursor = keyset_page(
+                query, MobilityLog.started_at, MobilityLog.log_id, cursor, page_size(limit) if cursor else limit
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
     
     return [
         {
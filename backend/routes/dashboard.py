@@ -1,99 +1,182 @@
 # backend/routes/dashboard.py
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text, func
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple, Union
+from datetime import date, datetime, timedelta
 from database import get_db
 from models import User, CreditsLedger, MobilityLog, UserGarden, GardenLevel
 from schemas import DashboardStats, DailySaving, ModeStat, ChallengeStat, DailyStats, WeeklyStats
-from dependencies import get_current_user
+from dependencies import get_current_user, user_etag
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+logger = logging.getLogger(__name__)
 
 import os
 
 # 📌 챌린지 목표 (환경 변수에서 로드, 기본값 100kg)
 CHALLENGE_GOAL_KG = float(os.getenv("DEFAULT_CHALLENGE_GOAL_KG", 100))
 
-@router.get("/", response_model=DashboardStats)
-async def get_dashboard(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> DashboardStats:
-    """
-    대시보드 통합 API
-    - 오늘 절약량
-    - 오늘 획득 포인트
-    - 정원 레벨
-    - 누적 절약량
-    - 최근 7일 절감량
-    - 교통수단별 절감 비율
-    - 챌린지 진행 상황
-    """
-    user_id = current_user.user_id
-    # 사용자 존재 확인
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+# ---------------------------------------------------------------------------
+# 대시보드 섹션: 필드 이름 -> (의존하는 섹션, 계산 함수)
+# 계산 함수는 (db, user_id, 이미 계산된 값 dict) 를 받으며, 요청한 필드와 그 의존
+# 섹션만 실행됩니다. total_saved_g 는 응답에 없는 내부 집계입니다.
+# ---------------------------------------------------------------------------
+def _today() -> date:
+    return datetime.utcnow().date()
+
 
+def _co2_saved_today(db: Session, user_id: int, values: dict):
     # 📌 오늘 절약량 (g)
-    co2_saved_today = db.query(func.sum(MobilityLog.co2_saved_g)).filter(
+    return db.query(func.sum(MobilityLog.co2_saved_g)).filter(
         MobilityLog.user_id == user_id,
-        func.date(MobilityLog.created_at) == datetime.utcnow().date()
+        func.date(MobilityLog.created_at) == _today()
     ).scalar() or 0
 
+
+def _eco_credits_earned(db: Session, user_id: int, values: dict):
     # 📌 오늘 획득 크레딧
-    eco_credits_earned = db.query(func.sum(CreditsLedger.points)).filter(
+    return db.query(func.sum(CreditsLedger.points)).filter(
         CreditsLedger.user_id == user_id,
         CreditsLedger.type == 'EARN',
-        func.date(CreditsLedger.created_at) == datetime.utcnow().date()
+        func.date(CreditsLedger.created_at) == _today()
     ).scalar() or 0
 
-    # 📌 정원 레벨 정보
-    garden = db.query(UserGarden).filter(UserGarden.user_id == user_id).first()
-    garden_level = 1
-    if garden and garden.level:
-        garden_level = garden.level.level_number
 
-    # 📌 누적 절약량 (kg)
+def _garden_level(db: Session, user_id: int, values: dict):
+    # 📌 정원 레벨 정보 (정원이 없으면 1레벨)
+    level_number = db.query(GardenLevel.level_number).join(
+        UserGarden, UserGarden.current_level_id == GardenLevel.level_id
+    ).filter(UserGarden.user_id == user_id).limit(1).scalar()
+    return level_number or 1
+
+
+def _total_saved_g(db: Session, user_id: int, values: dict):
     total_saved_g = db.query(func.sum(MobilityLog.co2_saved_g)).filter(MobilityLog.user_id == user_id).scalar() or 0
-    total_saved_kg = total_saved_g / 1000
-    print(f"DEBUG: Dashboard total_saved_g for user {user_id}: {total_saved_g}g ({total_saved_kg}kg)") # Debug print
+    logger.debug("dashboard total_saved_g", extra={"user_id": user_id, "total_saved_g": total_saved_g})
+    return total_saved_g
 
+
+def _total_points(db: Session, user_id: int, values: dict):
     # 📌 누적 크레딧
-    total_points = db.query(func.sum(CreditsLedger.points)).filter(CreditsLedger.user_id == user_id).scalar() or 0
+    return db.query(func.sum(CreditsLedger.points)).filter(CreditsLedger.user_id == user_id).scalar() or 0
+
 
+def _last7days(db: Session, user_id: int, values: dict):
     # 📌 최근 7일 절감량
     last7days_data = db.query(
         func.date(MobilityLog.created_at),
         func.sum(MobilityLog.co2_saved_g)
     ).filter(
         MobilityLog.user_id == user_id,
-        MobilityLog.created_at >= datetime.utcnow().date() - timedelta(days=7)
+        MobilityLog.created_at >= _today() - timedelta(days=7)
     ).group_by(func.date(MobilityLog.created_at)).order_by(func.date(MobilityLog.created_at)).all()
+    return [DailySaving(date=str(d), saved_g=s) for d, s in last7days_data]
 
-    last7days = [DailySaving(date=str(d), saved_g=s) for d, s in last7days_data]
 
+def _mode_stats(db: Session, user_id: int, values: dict):
     # 📌 교통수단별 절감 비율
     mode_stats_data = db.query(
         MobilityLog.mode,
         func.sum(MobilityLog.co2_saved_g)
     ).filter(MobilityLog.user_id == user_id).group_by(MobilityLog.mode).all()
+    return [ModeStat(mode=m, saved_g=s) for m, s in mode_stats_data]
 
-    modeStats = [ModeStat(mode=m, saved_g=s) for m, s in mode_stats_data]
 
+DASHBOARD_SECTIONS: Dict[str, Tuple[Tuple[str, ...], Callable[[Session, int, dict], Any]]] = {
+    "co2_saved_today": ((), _co2_saved_today),
+    "eco_credits_earned": ((), _eco_credits_earned),
+    "garden_level": ((), _garden_level),
+    "total_saved_g": ((), _total_saved_g),
+    # 📌 누적 절약량 (kg)
+    "total_saved": (("total_saved_g",), lambda db, user_id, values: values["total_saved_g"] / 1000),
+    "total_points": ((), _total_points),
+    "last7days": ((), _last7days),
+    "modeStats": ((), _mode_stats),
     # 📌 챌린지 진행 상황
-    challenge = ChallengeStat(goal=CHALLENGE_GOAL_KG, progress=total_saved_kg)
-
-    return DashboardStats(
-        user_id=user_id,
-        co2_saved_today=co2_saved_today,
-        eco_credits_earned=eco_credits_earned,
-        garden_level=garden_level,
-        total_saved=total_saved_kg,
-        total_points=total_points,
-        last7days=last7days,
-        modeStats=modeStats,
-        challenge=challenge
-    )
+    "challenge": (("total_saved",), lambda db, user_id, values: ChallengeStat(goal=CHALLENGE_GOAL_KG, progress=values["total_saved"])),
+}
+# 응답 필드 (DashboardStats 순서)
+DASHBOARD_FIELDS = [
+    "co2_saved_today", "eco_credits_earned", "garden_level", "total_saved",
+    "total_points", "last7days", "modeStats", "challenge",
+]
+
+
+def parse_dashboard_fields(fields: Optional[Union[str, Iterable[str]]]) -> List[str]:
+    """"a,b" / ["a", "b"] / None(전체) -> 필드 목록. 알 수 없는 필드는 ValueError."""
+    if fields is None:
+        return list(DASHBOARD_FIELDS)
+    names = [f.strip() for f in (fields.split(",") if isinstance(fields, str) else fields) if f.strip()]
+    unknown = [f for f in names if f not in DASHBOARD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown dashboard fields: {', '.join(unknown)}")
+    return names or list(DASHBOARD_FIELDS)
+
+
+def compute_dashboard(db: Session, user_id: int, fields: Iterable[str], values: Optional[dict] = None) -> dict:
+    """
+    Compute only `fields` and the sections they depend on. `values` may carry
+    already computed sections (e.g. total_saved_g, total_points from /api/home)
+    and is filled in place.
+    """
+    values = {} if values is None else values
+
+    def resolve(name: str):
+        if name in values:
+            return
+        depends_on, compute = DASHBOARD_SECTIONS[name]
+        for dependency in depends_on:
+            resolve(dependency)
+        values[name] = compute(db, user_id, values)
+
+    for name in fields:
+        resolve(name)
+    return {name: values[name] for name in fields}
+
+
+@router.get("/", response_model=DashboardStats, response_model_exclude_unset=True)
+async def get_dashboard(
+    current_user: User = Depends(user_etag()),
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None   # 쉼표로 구분한 필드 (생략 시 전체). 내부 호출도 같은 형식
+) -> DashboardStats:
+    """
+    대시보드 통합 API (fields 로 필요한 항목만 계산)
+    - 오늘 절약량
+    - 오늘 획득 포인트
+    - 정원 레벨
+    - 누적 절약량
+    - 최근 7일 절감량
+    - 교통수단별 절감 비율
+    - 챌린지 진행 상황
+    """
+    user_id = current_user.user_id
+    try:
+        names = parse_dashboard_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # 사용자 존재 확인
+    user = db.query(User).filter(User.user_id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return DashboardStats(user_id=user_id, **compute_dashboard(db, user_id, names))
+
+
+def build_dashboard(
+    db: Session, user_id: int, total_saved_g: Optional[float] = None, total_points: Optional[int] = None
+) -> DashboardStats:
+    """
+    전체 대시보드. 누적 절약량 / 누적 크레딧을 이미 계산한 호출자(/api/home)는
+    값을 넘겨 같은 SUM 을 다시 하지 않도록 합니다.
+    """
+    values = {}
+    if total_saved_g is not None:
+        values["total_saved_g"] = total_saved_g
+    if total_points is not None:
+        values["total_points"] = total_points
+    return DashboardStats(user_id=user_id, **compute_dashboard(db, user_id, DASHBOARD_FIELDS, values))
 
 @router.get("/{user_id}/daily", response_model=List[DailyStats])
 async def get_daily_stats(days: int = 7, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> List[DailyStats]:
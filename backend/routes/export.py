@@ -7,12 +7,6 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import io
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 import os
 from dotenv import load_dotenv
 
@@ -110,6 +104,14 @@ def calculate_statistics(data: Dict[str, Any]) -> Dict[str, Any]:
 
 def create_pdf_report(user_data: Dict[str, Any], stats: Dict[str, Any]) -> bytes:
     """PDF 리포트 생성"""
+    # ReportLab 은 PDF 를 만들 때만 필요하므로 여기서 불러옵니다 (서버 시작 시간 단축).
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch)
     story = []
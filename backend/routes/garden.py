@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
 import models, schemas
 from database import get_db
-from dependencies import get_current_user
+from dependencies import STATIC_CACHE_CONTROL, check_etag, content_etag, get_current_user, user_etag
 from data.shop_data import SHOP_ITEMS
 
 router = APIRouter(
@@ -17,8 +17,24 @@ class PlaceRequest(schemas.BaseModel):
     x: float
     y: float
 
+@router.get("/levels", response_model=List[schemas.GardenLevelInfo])
+def get_garden_levels(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Get the garden level catalog (content-hash ETag, long cache lifetime)."""
+    levels = [
+        {
+            "level_number": level.level_number,
+            "level_name": level.level_name,
+            "image_path": level.image_path,
+            "required_waters": level.required_waters,
+            "description": level.description,
+        }
+        for level in db.query(models.GardenLevel).order_by(models.GardenLevel.level_number)
+    ]
+    check_etag(request, response, content_etag(levels), STATIC_CACHE_CONTROL)
+    return levels
+
 @router.get("/inventory", response_model=List[schemas.InventoryItem])
-def get_user_inventory(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_user_inventory(current_user: models.User = Depends(user_etag()), db: Session = Depends(get_db)):
     """Get the current user's inventory of purchased items."""
     inventory_items = db.query(models.UserInventory).filter(models.UserInventory.user_id == current_user.user_id).all()
     
@@ -34,7 +50,7 @@ def get_user_inventory(current_user: models.User = Depends(get_current_user), db
     return response
 
 @router.get("/objects", response_model=List[schemas.PlacedObject])
-def get_placed_objects(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_placed_objects(current_user: models.User = Depends(user_etag()), db: Session = Depends(get_db)):
     """Get all objects placed in the user's garden with full details."""
     placed_objects = db.query(models.PlacedObject).filter(models.PlacedObject.user_id == current_user.user_id).all()
     
@@ -1,10 +1,10 @@
 # api/group_challenges.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
 from dependencies import get_current_user
-from schemas import GroupChallengeCreate, GroupChallengeResponse
+from schemas import GroupChallengeCreate, GroupChallengeResponse, ChallengeStatus
 from services.group_challenge_service import GroupChallengeService
 
 router = APIRouter(prefix="/groups", tags=["group-challenges"])
@@ -51,38 +51,19 @@ def create_group_challenge(
 @router.get("/{group_id}/challenges", response_model=List[GroupChallengeResponse])
 def get_group_challenges(
     group_id: int,
+    status_filter: Optional[List[ChallengeStatus]] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    offset: int = Query(0, ge=0),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all challenges for a group"""
-    # Update challenge statuses first
-    GroupChallengeService.update_challenge_statuses(db)
-    
-    challenges = GroupChallengeService.get_group_challenges(db, group_id, current_user.user_id)
-    
-    response_list = []
-    for challenge in challenges:
-        challenge_details = GroupChallengeService.get_challenge_details(
-            db, challenge.challenge_id, current_user.user_id
-        )
-        
-        response_list.append(GroupChallengeResponse(
-            challenge_id=challenge.challenge_id,
-            group_id=challenge.group_id,
-            title=challenge.title,
-            description=challenge.description,
-            goal_type=challenge.goal_type,
-            goal_value=float(challenge.goal_value),
-            start_date=challenge.start_date,
-            end_date=challenge.end_date,
-            status=challenge.status,
-            created_by=challenge.created_by,
-            created_at=challenge.created_at,
-            progress=challenge_details["progress"],
-            completion_percentage=challenge_details["completion_percentage"]
-        ))
-    
-    return response_list
+    # 상태 전이는 스케줄러(services/challenge_lifecycle.py)가 경계 시각에 적용합니다.
+    # 멤버 확인 1회 + 챌린지별 기여도 합계 1회 (그룹 단위 캐시)
+    challenges = GroupChallengeService.list_group_challenges(
+        db, group_id, current_user.user_id, statuses=status_filter, limit=limit, offset=offset
+    )
+    return [GroupChallengeResponse(**c) for c in challenges or []]
 
 @router.post("/{group_id}/challenges/{challenge_id}/join", response_model=dict)
 def join_group_challenge(
@@ -1,11 +1,12 @@
 # api/groups.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
 from dependencies import get_current_user
-from schemas import GroupCreateWithUsernames, GroupUpdate, Group as GroupSchema
+from schemas import GroupCreateWithUsernames, GroupUpdate, Group as GroupSchema, GroupSummary, GroupMemberPage
 from services.group_service import GroupService
+from services.response_cache import response_cache, params, GROUP_RANKING
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
@@ -26,7 +27,16 @@ def get_user_groups(
     """Get all groups for the current user."""
     return GroupService.get_user_groups(db, current_user.user_id)
 
+@router.get("/summary", response_model=List[GroupSummary])
+def get_user_group_summaries(
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get lightweight summaries (counts, totals, role) of the current user's groups without member lists."""
+    return GroupService.get_user_group_summaries(db, current_user.user_id)
+
 @router.get("/ranking", response_model=List[dict])
+@response_cache.cached(ttl=60, key=params("limit"), tags=(GROUP_RANKING,))
 def get_global_group_ranking(
     limit: int = 100,
     db: Session = Depends(get_db)
@@ -46,6 +56,34 @@ def get_group(
         raise HTTPException(status_code=404, detail="Group not found")
     return group
 
+@router.get("/{group_id}/summary", response_model=GroupSummary)
+def get_group_summary(
+    group_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a lightweight summary of a single group the current user belongs to."""
+    summary = GroupService.get_group_summary(db, group_id, current_user.user_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return summary
+
+@router.get("/{group_id}/members/page", response_model=GroupMemberPage)
+def get_group_member_page(
+    group_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a page of group members (user_id, username, role, joined_at), paginated by keyset."""
+    if not GroupService.is_active_member(db, group_id, current_user.user_id):
+        raise HTTPException(status_code=403, detail="Not a member of this group")
+    try:
+        return GroupService.get_group_member_page(db, group_id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.delete("/{group_id}", response_model=dict)
 def delete_group(
     group_id: int,
@@ -0,0 +1,154 @@
+# backend/routes/home.py
+"""
+홈 화면 통합 API.
+
+프론트엔드가 대시보드 / 잔액 / 정원 / 챌린지 / 업적을 따로 호출하면 요청마다 인증과
+사용자 조회를 다시 하고 누적 절감량·누적 포인트 SUM 을 여러 번 계산합니다.
+GET /api/home?sections=... 는 요청한 섹션 빌더를 한 번에 실행하고, 인증된 사용자
+객체와 공통 집계를 공유한 뒤 섹션별 소요 시간과 함께 돌려줍니다.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from dependencies import user_etag
+from models import CreditsLedger, MobilityLog, User
+from routes.challenges import get_challenges
+from routes.credits import build_credit_balance, build_garden_status
+from routes.dashboard import build_dashboard
+from schemas import HomeResponse
+from services.achievement_state import achievement_catalog, achievement_states
+from services.data_version import CHALLENGES
+
+router = APIRouter(prefix="/api/home", tags=["home"])
+
+# 여러 섹션이 함께 쓰는 집계
+AGGREGATES: Dict[str, Callable[[Session, int], Any]] = {
+    "total_co2_g": lambda db, user_id: float(
+        db.query(func.sum(MobilityLog.co2_saved_g)).filter(MobilityLog.user_id == user_id).scalar() or 0
+    ),
+    "total_points": lambda db, user_id: int(
+        db.query(func.sum(CreditsLedger.points)).filter(CreditsLedger.user_id == user_id).scalar() or 0
+    ),
+}
+
+
+# 현재 섹션이 워커 스레드에서 쓴 시간(초)을 모으는 칸. 섹션 태스크마다 따로 설정됩니다.
+_section_seconds: ContextVar[Optional[List[float]]] = ContextVar("home_section_seconds", default=None)
+
+
+class HomeContext:
+    """
+    Per-request state shared by the section builders: the authenticated user
+    and memoised aggregates. Every run() call gets its own session in a worker
+    thread, so sections (and the shared aggregates) query concurrently. The
+    thread time of a run() is credited to the section that called it; shared
+    aggregates are not credited to any section.
+    """
+
+    def __init__(self, user: User, session_factory: Callable[[], Session] = SessionLocal):
+        self.user = user
+        self.session_factory = session_factory
+        self._aggregates: Dict[str, asyncio.Future] = {}
+
+    def _call(self, func: Callable, args: tuple, spent: Optional[List[float]]):
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            return func(db, *args)
+        finally:
+            db.close()
+            if spent is not None:
+                spent[0] += time.perf_counter() - started
+
+    async def run(self, func: Callable, *args):
+        """func(db, *args) in a worker thread with a session of its own."""
+        return await asyncio.to_thread(self._call, func, args, _section_seconds.get())
+
+    async def _compute(self, name: str):
+        _section_seconds.set(None)   # 이 태스크 안에서만 적용: 공유 집계는 요청한 섹션의 시간에 넣지 않습니다
+        return await self.run(AGGREGATES[name], self.user.user_id)
+
+    async def aggregate(self, name: str):
+        """Compute an aggregate once per request, however many sections ask for it."""
+        future = self._aggregates.get(name)
+        if future is None:
+            future = self._aggregates[name] = asyncio.ensure_future(self._compute(name))
+        return await future
+
+
+async def _dashboard(ctx: HomeContext):
+    total_co2_g, total_points = await asyncio.gather(ctx.aggregate("total_co2_g"), ctx.aggregate("total_points"))
+    return await ctx.run(build_dashboard, ctx.user.user_id, total_co2_g, total_points)
+
+
+async def _balance(ctx: HomeContext):
+    total_co2_g, total_points = await asyncio.gather(ctx.aggregate("total_co2_g"), ctx.aggregate("total_points"))
+    return await ctx.run(build_credit_balance, ctx.user.user_id, total_points, total_co2_g)
+
+
+async def _garden(ctx: HomeContext):
+    return await ctx.run(build_garden_status, ctx.user.user_id)
+
+
+async def _challenges(ctx: HomeContext):
+    return await ctx.run(lambda db: get_challenges(current_user=ctx.user, db=db))
+
+
+async def _achievements(ctx: HomeContext):
+    return await ctx.run(achievement_states.listing, ctx.user.user_id)
+
+
+SECTIONS: Dict[str, Callable[[HomeContext], Awaitable[Any]]] = {
+    "dashboard": _dashboard,
+    "balance": _balance,
+    "garden": _garden,
+    "challenges": _challenges,
+    "achievements": _achievements,
+}
+
+
+async def _timed(name: str, builder, ctx: HomeContext, timings: Dict[str, float], errors: Dict[str, str]):
+    # gather 가 섹션마다 태스크를 만들므로 이 설정은 해당 섹션에만 보입니다
+    spent = [0.0]
+    _section_seconds.set(spent)
+    try:
+        return await builder(ctx)
+    except HTTPException as e:
+        errors[name] = str(e.detail)
+    except Exception as e:
+        errors[name] = str(e)
+    finally:
+        timings[name] = round(spent[0] * 1000, 2)
+    return None
+
+
+@router.get("/", response_model=HomeResponse)
+async def get_home(
+    sections: Optional[str] = Query(None, description="comma-separated: " + ",".join(SECTIONS)),
+    current_user: User = Depends(user_etag(CHALLENGES, extra=lambda: achievement_catalog.version)),
+):
+    """홈 화면에 필요한 섹션을 한 번에 조회합니다 (sections 생략 시 전체)."""
+    requested: List[str] = [s.strip() for s in sections.split(",") if s.strip()] if sections else list(SECTIONS)
+    unknown = [s for s in requested if s not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+
+    ctx = HomeContext(current_user)
+    timings: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_timed(name, SECTIONS[name], ctx, timings, errors) for name in requested))
+    return HomeResponse(
+        user_id=current_user.user_id,
+        sections={name: result for name, result in zip(requested, results) if name not in errors},
+        timings_ms=timings,
+        errors=errors,
+        total_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
@@ -1,6 +1,7 @@
 import os
 import json
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -9,11 +10,18 @@ import schemas, models, database # Import database module
 from database import get_db # Import get_db function
 from dependencies import get_current_user # Assuming authentication is required
 from services.mobility_service import MobilityService # NEW IMPORT
+from services.carbon_factor_registry import carbon_factor_registry, points_for, ECO_MODES
+from services.station_index import station_index
+from services.station_search import station_search
+from services.nearby_service import nearby_station_cache, NEARBY_MAX_AGE_SECONDS
+from services.trace_service import TraceIngestService
+from services.response_cache import response_cache, POINT_RULES
 
 router = APIRouter(
     prefix="/mobility",
     tags=["mobility"],
 )
+logger = logging.getLogger(__name__)
 
 @router.post("/log", response_model=schemas.MobilityLogResponse)
 async def log_mobility_data(
@@ -44,22 +52,94 @@ async def log_mobility_data(
         end_point=db_mobility_log.end_point,
     )
 
+@router.post("/trace", response_model=List[schemas.MobilityLogResponse])
+def upload_gps_trace(
+    trace: schemas.GpsTraceUpload,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """원시 GPS 궤적을 저장하고, 정지 구간으로 나눈 이동 구간마다 이동 기록을 생성합니다."""
+    if trace.user_id != current_user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot log data for another user"
+        )
+
+    points = [{"lat": p.lat, "lon": p.lon, "ts": p.ts.isoformat()} for p in trace.points]
+    raw = TraceIngestService.store_trace(db, current_user, points)
+    station_index.ensure_loaded(db)
+    logs = TraceIngestService.process_trace(db, raw, current_user, station_index)
+
+    return [
+        schemas.MobilityLogResponse(
+            log_id=log.log_id,
+            user_id=log.user_id,
+            mode=log.mode,
+            distance_km=log.distance_km,
+            started_at=log.started_at,
+            ended_at=log.ended_at,
+            co2_saved_g=log.co2_saved_g,
+            eco_credits_earned=log.points_earned,
+            description=log.description,
+            start_point=log.start_point,
+            end_point=log.end_point,
+        )
+        for log in logs
+    ]
+
+@router.get("/stations/search", response_model=List[schemas.StationSearchResult])
+def search_stations(
+    q: str,
+    limit: int = 10,
+    types: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """역/정류장 이름 자동완성 (예: '강남', '2호선 강남', '강ㄴ')"""
+    station_search.ensure_loaded(db)
+    type_filter = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    return station_search.search(q, limit=max(1, min(limit, 50)), types=type_filter)
+
+@router.get("/stations/nearby", response_model=schemas.NearbyStations)
+def get_nearby_stations(
+    request: Request,
+    response: Response,
+    lat: float,
+    lon: float,
+    radius: float = 200,
+    types: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """주변 역/정류장 조회 (약 110 m 타일 단위로 캐시, ETag 지원)"""
+    station_index.ensure_loaded(db)
+    type_filter = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    etag, payload = nearby_station_cache.get(lat, lon, radius, type_filter)
+
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={NEARBY_MAX_AGE_SECONDS}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return payload
+
 @router.get("/point-rules")
-async def get_point_rules() -> List[Dict[str, Any]]:
+@response_cache.cached(ttl=300, tags=(POINT_RULES,))
+async def get_point_rules(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
     """현재 설정된 교통수단별 포인트 적립 규칙을 조회합니다."""
+    carbon_factor_registry.ensure_fresh(db)
     rules = []
-    car_emission_baseline = CARBON_EMISSION_FACTORS_G_PER_KM.get(schemas.TransportMode.CAR, 170)
+    factors = carbon_factor_registry.current_factors()
+    car_emission_baseline = factors.get(schemas.TransportMode.CAR.value, 170)
 
-    for mode, emission_factor in CARBON_EMISSION_FACTORS_G_PER_KM.items():
-        if mode in [schemas.TransportMode.WALK, schemas.TransportMode.BIKE, schemas.TransportMode.BUS, schemas.TransportMode.SUBWAY]:
+    for mode, emission_factor in factors.items():
+        if mode in ECO_MODES:
             # Calculate CO2 saved per km against car baseline
             co2_saved_per_km = (car_emission_baseline - emission_factor)
-            points_per_km = int(co2_saved_per_km * CREDIT_PER_G_CO2)
+            points_per_km = points_for(co2_saved_per_km)
             if points_per_km > 0:
                 rules.append({
-                    "mode": mode.value,
+                    "mode": mode,
                     "points_per_km": points_per_km,
-                    "description": f"{mode.value} 이용 시 1km당 {points_per_km} 포인트 적립"
+                    "description": f"{mode} 이용 시 1km당 {points_per_km} 포인트 적립"
                 })
     # Add a generic rule for other eco-friendly activities if applicable
     rules.append({
@@ -71,5 +151,5 @@ async def get_point_rules() -> List[Dict[str, Any]]:
 
 @router.get("/history/{user_id}") # Removed response_model for simplicity
 def get_mobility_history(user_id: int):
-    print(f"DEBUG: get_mobility_history hit for user_id: {user_id}")
+    logger.debug("get_mobility_history", extra={"user_id": user_id})
     return {"message": f"Mobility history for user {user_id} (test response)"}
@@ -5,8 +5,9 @@ from typing import List
 
 import models, schemas, crud
 from database import get_db
-from dependencies import get_current_user
+from dependencies import content_etag, get_current_user, static_etag
 from data.shop_data import SHOP_ITEMS
+from services.response_cache import response_cache, SHOP
 
 router = APIRouter(
     prefix="/api/shop",
@@ -17,7 +18,10 @@ class BuyRequest(schemas.BaseModel):
     item_id: str
     quantity: int
 
-@router.get("/items", response_model=List[schemas.GardenObject])
+SHOP_ITEMS_ETAG = content_etag(SHOP_ITEMS)
+
+@router.get("/items", response_model=List[schemas.GardenObject], dependencies=[Depends(static_etag(lambda: SHOP_ITEMS_ETAG))])
+@response_cache.cached(ttl=3600, tags=(SHOP,))
 def get_shop_items():
     """Returns a list of all items available in the shop."""
     return SHOP_ITEMS
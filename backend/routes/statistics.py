@@ -7,17 +7,23 @@ from datetime import datetime, timedelta
 import json
 
 from database import get_db
+from dependencies import get_current_user, user_etag
 from models import User, CreditsLedger, MobilityLog, UserGarden, GardenWateringLog
 from schemas import (
     StatisticsOverview, RegionalStatistics, LeaderboardEntry, 
-    FriendsComparison, UserRanking, PersonalCarbonFootprint
+    FriendsComparison, UserRanking, PersonalCarbonFootprint,
+    StatisticsDistribution, ModeStat, DailyStats, ActivityStreak, ActivityHeatmap
 )
+from services.distribution_service import distribution_service, DEFAULT_QUANTILES
+from services.activity_calendar import activity_calendar
+from services.response_cache import response_cache, params, LEADERBOARD, STATISTICS
 from utils.public_data_api import public_data_api
 
 router = APIRouter(prefix="/api/statistics", tags=["statistics"])
 
 # 전체 통계 개요
 @router.get("/overview", response_model=StatisticsOverview)
+@response_cache.cached(ttl=60, tags=(STATISTICS,))
 async def get_statistics_overview(db: Session = Depends(get_db)):
     """전체 사용자 통계 개요를 조회합니다."""
     try:
@@ -69,6 +75,7 @@ async def get_statistics_overview(db: Session = Depends(get_db)):
 
 # 지역별 통계 (공공데이터 API 연동)
 @router.get("/regional/{region}", response_model=RegionalStatistics)
+@response_cache.cached(ttl=300, key=params("region"), tags=(STATISTICS,))
 async def get_regional_statistics(region: str, db: Session = Depends(get_db)):
     """특정 지역의 통계를 조회합니다 (공공데이터 API 연동)."""
     try:
@@ -138,6 +145,7 @@ async def get_regional_statistics(region: str, db: Session = Depends(get_db)):
 
 # 리더보드 조회
 @router.get("/leaderboard", response_model=List[LeaderboardEntry])
+@response_cache.cached(ttl=30, key=params("limit", "period"), tags=(LEADERBOARD,))
 async def get_leaderboard(
     limit: int = 10,
     period: str = "all",  # all, month, week
@@ -244,34 +252,23 @@ async def get_leaderboard(
 async def get_friends_comparison(user_id: int, db: Session = Depends(get_db)):
     """특정 사용자의 친구들과의 비교 통계를 조회합니다."""
     try:
-        # 현재 사용자 데이터
-        user_credits = db.query(func.sum(CreditsLedger.points)).filter(
-            CreditsLedger.user_id == user_id,
-            CreditsLedger.type == "EARN"
-        ).scalar() or 0
-        
-        user_carbon = db.query(func.sum(MobilityLog.co2_saved_g)).filter(
-            MobilityLog.user_id == user_id
-        ).scalar() or 0
+        distribution_service.ensure_fresh(db)
+
+        # 현재 사용자 데이터 (분포 스케치의 사용자별 누적값)
+        user_credits = int(distribution_service.user_value("credits", user_id))
+        user_carbon = distribution_service.user_value("co2_saved_g", user_id)
         
         # 전체 평균 (친구들 평균으로 사용)
-        total_users = db.query(User).count()
-        total_credits = db.query(func.sum(CreditsLedger.points)).filter(
-            CreditsLedger.type == "EARN"
-        ).scalar() or 0
-        total_carbon = db.query(func.sum(MobilityLog.co2_saved_g)).scalar() or 0
+        total_users = distribution_service.total_users()
+        friends_avg_credits = distribution_service.average("credits")
+        friends_avg_carbon = distribution_service.average("co2_saved_g") / 1000
         
-        friends_avg_credits = total_credits / max(total_users, 1)
-        friends_avg_carbon = (total_carbon / 1000) / max(total_users, 1)
-        
-        # 사용자 순위 계산
-        user_rank = db.query(User).join(CreditsLedger).filter(
-            CreditsLedger.user_id == user_id,
-            CreditsLedger.type == "EARN"
-        ).count()
+        # 사용자 순위 및 백분위 (스케치 조회)
+        user_rank = distribution_service.rank("credits", user_id)
+        percentile = distribution_service.percentile("credits", user_id)
         
         # 국가 평균 (전체 통계에서 가져오기)
-        national_avg = (total_carbon / 1000) / max(total_users, 1)
+        national_avg = friends_avg_carbon
         
         return FriendsComparison(
             user_id=user_id,
@@ -282,7 +279,7 @@ async def get_friends_comparison(user_id: int, db: Session = Depends(get_db)):
             national_average_carbon_kg=round(national_avg, 2),
             user_rank=user_rank,
             total_users=total_users,
-            percentile=round((1 - user_rank / max(total_users, 1)) * 100, 1),
+            percentile=round(percentile, 1),
             last_updated=datetime.utcnow()
         )
         
@@ -307,23 +304,12 @@ async def get_friends_comparison(user_id: int, db: Session = Depends(get_db)):
 async def get_user_ranking(user_id: int, db: Session = Depends(get_db)):
     """특정 사용자의 순위 정보를 조회합니다."""
     try:
-        # 사용자 데이터
-        user_credits = db.query(func.sum(CreditsLedger.points)).filter(
-            CreditsLedger.user_id == user_id,
-            CreditsLedger.type == "EARN"
-        ).scalar() or 0
-        
-        # 전체 사용자 수
-        total_users = db.query(User).count()
-        
-        # 사용자보다 높은 크레딧을 가진 사용자 수
-        higher_credits_count = db.query(User).join(CreditsLedger).filter(
-            CreditsLedger.type == "EARN",
-            func.sum(CreditsLedger.points) > user_credits
-        ).group_by(User.user_id).count()
-        
-        rank = higher_credits_count + 1
-        percentile = round((1 - rank / max(total_users, 1)) * 100, 1)
+        distribution_service.ensure_fresh(db)
+
+        # 전체 사용자 수, 순위, 백분위 모두 분포 스케치에서 O(1)로 조회
+        total_users = distribution_service.total_users()
+        rank = distribution_service.rank("credits", user_id)
+        percentile = round(distribution_service.percentile("credits", user_id), 1)
         
         return UserRanking(
             user_id=user_id,
@@ -343,6 +329,52 @@ async def get_user_ranking(user_id: int, db: Session = Depends(get_db)):
             last_updated=datetime.utcnow()
         )
 
+# 전국 분포 (분위수) 조회
+@router.get("/distribution", response_model=StatisticsDistribution)
+async def get_statistics_distribution(
+    quantiles: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """사용자별 누적 탄소 절감량과 적립 크레딧의 분위수를 조회합니다."""
+    try:
+        qs = [float(q) for q in quantiles.split(",")] if quantiles else list(DEFAULT_QUANTILES)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="quantiles must be comma-separated numbers between 0 and 1")
+    if any(q < 0 or q > 1 for q in qs):
+        raise HTTPException(status_code=400, detail="quantiles must be comma-separated numbers between 0 and 1")
+
+    distribution_service.ensure_fresh(db)
+
+    co2_quantiles = distribution_service.quantiles("co2_saved_g", qs)
+    return StatisticsDistribution(
+        total_users=distribution_service.total_users(),
+        carbon_saved_kg={k: round(v / 1000, 3) for k, v in co2_quantiles.items()},
+        credits=distribution_service.quantiles("credits", qs),
+        last_updated=datetime.utcnow()
+    )
+
+# 연속 활동 기록 조회
+@router.get("/streak", response_model=ActivityStreak)
+async def get_activity_streak(
+    current_user: User = Depends(user_etag()),
+    db: Session = Depends(get_db)
+):
+    """현재 연속 활동 일수와 최장 연속 기록을 조회합니다."""
+    return activity_calendar.streaks(db, current_user.user_id)
+
+# 연간 활동 히트맵 조회
+@router.get("/heatmap", response_model=ActivityHeatmap)
+async def get_activity_heatmap(
+    year: Optional[int] = None,
+    current_user: User = Depends(user_etag()),
+    db: Session = Depends(get_db)
+):
+    """연간 일별 CO2 절감량(히트맵)을 조회합니다."""
+    year = year or datetime.utcnow().year
+    if year < 2000 or year > 9998:
+        raise HTTPException(status_code=400, detail="year out of range")
+    return activity_calendar.heatmap(db, current_user.user_id, year)
+
 # 개인 탄소 발자국 조회
 @router.get("/carbon-footprint", response_model=PersonalCarbonFootprint)
 async def get_personal_carbon_footprint(
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from models import User, ChallengeCompletionType, ChallengeStatus 
 
@@ -93,6 +93,15 @@ class GardenStatus(BaseModel):
     class Config:
         from_attributes = True
 
+class GardenLevelInfo(BaseModel):
+    level_number: int
+    level_name: str
+    image_path: str
+    required_waters: int
+    description: Optional[str] = None
+    class Config:
+        from_attributes = True
+
 class WateringRequest(BaseModel):
     user_id: int
     points_spent: int = 10
@@ -123,18 +132,26 @@ class ChallengeStat(BaseModel):
     progress: float
 
 class DashboardStats(BaseModel):
+    # fields= 로 일부만 요청하면 나머지는 None 이고 응답에서 빠집니다.
     user_id: int
-    co2_saved_today: float
-    eco_credits_earned: int
-    garden_level: int
-    total_saved: float
-    total_points: int
-    last7days: List[DailySaving]
-    modeStats: List[ModeStat]
-    challenge: ChallengeStat
+    co2_saved_today: Optional[float] = None
+    eco_credits_earned: Optional[int] = None
+    garden_level: Optional[int] = None
+    total_saved: Optional[float] = None
+    total_points: Optional[int] = None
+    last7days: Optional[List[DailySaving]] = None
+    modeStats: Optional[List[ModeStat]] = None
+    challenge: Optional[ChallengeStat] = None
     class Config:
         from_attributes = True
 
+class HomeResponse(BaseModel):
+    user_id: int
+    sections: Dict[str, Any]          # 섹션 이름 -> 해당 단일 API 와 같은 형태의 응답
+    timings_ms: Dict[str, float]      # 섹션별 자체 실행 시간 (공유 집계와 대기 제외)
+    errors: Dict[str, str] = {}       # 실패한 섹션 -> 오류 메시지
+    total_ms: float
+
 class MobilityLog(BaseModel):
     log_id: int
     mode: TransportMode
@@ -157,6 +174,55 @@ class MobilityLogCreate(BaseModel):
     start_point: Optional[str] = None
     end_point: Optional[str] = None
 
+class GpsPoint(BaseModel):
+    lat: float
+    lon: float
+    ts: datetime
+
+class GpsTraceUpload(BaseModel):
+    user_id: int
+    points: List[GpsPoint] = Field(..., min_items=2)
+
+class StationSearchResult(BaseModel):
+    type: str
+    station_id: int
+    name: str
+    line: Optional[str] = None
+    latitude: float
+    longitude: float
+    score: float
+
+class NearbyStation(BaseModel):
+    type: str
+    station_id: int
+    name: str
+    line: Optional[str] = None
+    latitude: float
+    longitude: float
+    distance_m: float
+
+class NearbyStations(BaseModel):
+    tile_latitude: float
+    tile_longitude: float
+    radius_m: int
+    stations: List[NearbyStation]
+
+class AchievementCatalogEntry(BaseModel):
+    id: int
+    code: Optional[str] = None
+    name: str
+
+class MemberAchievementState(BaseModel):
+    user_id: int
+    unlocked: List[int]
+    unlocked_count: int
+
+class GroupAchievementStates(BaseModel):
+    group_id: int
+    catalog_version: int
+    achievements: List[AchievementCatalogEntry]
+    members: List[MemberAchievementState]
+
 # 챌린지 관련 스키마
 class Challenge(BaseModel):
     challenge_id: int
@@ -337,6 +403,33 @@ class Group(GroupBase):
 class GroupUpdate(GroupBase):
     pass
 
+class GroupSummary(BaseModel):
+    """그룹 목록용 요약 (멤버 목록 없이 집계 컬럼만)"""
+    group_id: int
+    name: str
+    description: Optional[str] = None
+    max_members: Optional[int] = None
+    member_count: int
+    total_co2_saved_g: float
+    role: GroupRole
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class GroupMemberItem(BaseModel):
+    user_id: int
+    username: str
+    role: GroupRole
+    joined_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class GroupMemberPage(BaseModel):
+    items: List[GroupMemberItem]
+    next_cursor: Optional[str] = None   # 다음 페이지 요청의 cursor 값 (마지막 페이지면 None)
+
 class GroupChallengeCreate(BaseModel):
     title: str
     description: Optional[str] = None
@@ -389,6 +482,71 @@ class MonthlyStats(BaseModel):
     total_activities: int
     weekly_breakdown: List[WeeklyStats]
 
+class StatisticsOverview(BaseModel):
+    total_users: int
+    total_credits: int
+    total_carbon_saved_kg: float
+    national_average_carbon_kg: float
+    active_users_30days: int
+    average_garden_level: float
+    last_updated: datetime
+
+class RegionalStatistics(BaseModel):
+    region: str
+    user_count: int
+    average_carbon_kg: float
+    total_carbon_saved_kg: float
+    air_quality_index: float
+    green_space_index: float
+    public_transport_index: float
+    recycling_rate_index: float
+    overall_score: float
+    last_updated: datetime
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    name: str
+    total_credits: int
+    carbon_reduced_kg: float
+    badge_count: int
+    is_current_user: bool = False
+
+class FriendsComparison(BaseModel):
+    user_id: int
+    user_credits: int
+    user_carbon_kg: float
+    friends_average_credits: float
+    friends_average_carbon_kg: float
+    national_average_carbon_kg: float
+    user_rank: int
+    total_users: int
+    percentile: float
+    last_updated: datetime
+
+class UserRanking(BaseModel):
+    user_id: int
+    rank: int
+    total_users: int
+    percentile: float
+    last_updated: datetime
+
+class StatisticsDistribution(BaseModel):
+    total_users: int
+    carbon_saved_kg: Dict[str, float] # 분위수 라벨(p50 등) -> 누적 절감량(kg)
+    credits: Dict[str, float] # 분위수 라벨 -> 누적 적립 크레딧
+    last_updated: datetime
+
+class ActivityStreak(BaseModel):
+    current_streak: int # 오늘(또는 어제)까지 이어진 연속 활동 일수
+    longest_streak: int
+    last_active_date: Optional[date] = None
+
+class ActivityHeatmap(BaseModel):
+    year: int
+    active_days: int
+    intensity: List[float] # 1월 1일부터 일별 CO2 절감량(g)
+
 # API 응답 스키마
 class APIResponse(BaseModel):
     success: bool
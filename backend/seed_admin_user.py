@@ -4,12 +4,15 @@ from datetime import datetime
 from database import SessionLocal, engine
 import crud, schemas, models
 
-# Ensure tables are created
-models.Base.metadata.create_all(bind=engine)
+ADMIN_USER = {
+    "username": "admin",
+    "password": "12345678", # In a real app, this would be hashed!
+    "email": "admin@admin", # Dummy email
+}
 
 def seed_admin_user(db: Session):
-    admin_username = "admin"
-    admin_password = "12345678" # In a real app, this would be hashed!
+    admin_username = ADMIN_USER["username"]
+    admin_password = ADMIN_USER["password"]
 
     # Check if admin user already exists
     existing_admin = db.query(models.User).filter(models.User.username == admin_username).first()
@@ -17,7 +20,7 @@ def seed_admin_user(db: Session):
     if not existing_admin:
         admin_user_data = schemas.UserCreate(
             username=admin_username,
-            email="admin@admin", # Dummy email
+            email=ADMIN_USER["email"],
             password_hash=admin_password,
             role=models.UserRole.ADMIN, # Set role to ADMIN
             user_group_id=None # Or an existing group ID if applicable
@@ -28,6 +31,8 @@ def seed_admin_user(db: Session):
         print(f"Admin user '{admin_username}' already exists.")
 
 if __name__ == "__main__":
+    # Ensure tables are created
+    models.Base.metadata.create_all(bind=engine)
     db = SessionLocal()
     try:
         seed_admin_user(db)
@@ -4,68 +4,65 @@ from sqlalchemy.orm import Session
 from database import SessionLocal, engine
 import crud, schemas, models
 
-# Ensure tables are created
-models.Base.metadata.create_all(bind=engine)
+# 기본 챌린지 정의 (기간은 시딩 시점부터 duration_days 일)
+DEFAULT_CHALLENGES = [
+    {
+        "title": "대중교통 이용 챌린지",
+        "description": "이번 주 대중교통으로 5kg CO₂ 절감하기",
+        "target_mode": schemas.TransportMode.ANY,
+        "goal_type": schemas.ChallengeGoalType.CO2_SAVED,
+        "goal_target_value": 5000.0, # 5kg
+        "duration_days": 7,
+        "reward": "에코 크레딧 200P + 뱃지",
+    },
+    {
+        "title": "자전거 출퇴근 챌린지",
+        "description": "한 달간 자전거로 50km 이동하기",
+        "target_mode": schemas.TransportMode.BIKE,
+        "goal_type": schemas.ChallengeGoalType.DISTANCE_KM,
+        "goal_target_value": 50.0, # 50km
+        "duration_days": 30,
+        "reward": "에코 크레딧 150P + 뱃지",
+    },
+    {
+        "title": "도보 생활 챌린지",
+        "description": "일주일간 10km 도보 이동하기",
+        "target_mode": schemas.TransportMode.WALK,
+        "goal_type": schemas.ChallengeGoalType.DISTANCE_KM,
+        "goal_target_value": 10.0, # 10km
+        "duration_days": 7,
+        "reward": "에코 크레딧 100P",
+    },
+    {
+        "title": "친환경 이동 30일",
+        "description": "30일 연속 친환경 교통수단 이용하기 (총 10회 이상)",
+        "target_mode": schemas.TransportMode.ANY,
+        "goal_type": schemas.ChallengeGoalType.TRIP_COUNT,
+        "goal_target_value": 10.0, # 10 trips
+        "duration_days": 30,
+        "reward": "에코 크레딧 300P + 특별 뱃지",
+    },
+]
 
 def seed_challenges(db: Session):
 
     now = datetime.utcnow()
-    # Admin user ID (assuming admin user is created with ID 1)
-    admin_user_id = 1 
 
     challenges_to_create = [
         schemas.ChallengeCreate(
-            title="대중교통 이용 챌린지",
-            description="이번 주 대중교통으로 5kg CO₂ 절감하기",
+            title=c["title"],
+            description=c["description"],
             scope=schemas.ChallengeScope.PERSONAL,
             completion_type=schemas.ChallengeCompletionType.AUTO,
-            target_mode=schemas.TransportMode.ANY,
-            goal_type=schemas.ChallengeGoalType.CO2_SAVED,
-            goal_target_value=5000.0, # 5kg
+            target_mode=c["target_mode"],
+            goal_type=c["goal_type"],
+            goal_target_value=c["goal_target_value"],
             start_at=now,
-            end_at=now + timedelta(days=7),
-            reward="에코 크레딧 200P + 뱃지",
-            created_by=None
-        ),
-        schemas.ChallengeCreate(
-            title="자전거 출퇴근 챌린지",
-            description="한 달간 자전거로 50km 이동하기",
-            scope=schemas.ChallengeScope.PERSONAL,
-            completion_type=schemas.ChallengeCompletionType.AUTO,
-            target_mode=schemas.TransportMode.BIKE,
-            goal_type=schemas.ChallengeGoalType.DISTANCE_KM,
-            goal_target_value=50.0, # 50km
-            start_at=now,
-            end_at=now + timedelta(days=30),
-            reward="에코 크레딧 150P + 뱃지",
-            created_by=None
-        ),
-        schemas.ChallengeCreate(
-            title="도보 생활 챌린지",
-            description="일주일간 10km 도보 이동하기",
-            scope=schemas.ChallengeScope.PERSONAL,
-            completion_type=schemas.ChallengeCompletionType.AUTO,
-            target_mode=schemas.TransportMode.WALK,
-            goal_type=schemas.ChallengeGoalType.DISTANCE_KM,
-            goal_target_value=10.0, # 10km
-            start_at=now,
-            end_at=now + timedelta(days=7),
-            reward="에코 크레딧 100P",
-            created_by=None
-        ),
-        schemas.ChallengeCreate(
-            title="친환경 이동 30일",
-            description="30일 연속 친환경 교통수단 이용하기 (총 10회 이상)",
-            scope=schemas.ChallengeScope.PERSONAL,
-            completion_type=schemas.ChallengeCompletionType.AUTO,
-            target_mode=schemas.TransportMode.ANY,
-            goal_type=schemas.ChallengeGoalType.TRIP_COUNT,
-            goal_target_value=10.0, # 10 trips
-            start_at=now,
-            end_at=now + timedelta(days=30),
-            reward="에코 크레딧 300P + 특별 뱃지",
+            end_at=now + timedelta(days=c["duration_days"]),
+            reward=c["reward"],
             created_by=None
         )
+        for c in DEFAULT_CHALLENGES
     ]
 
     for challenge_data in challenges_to_create:
@@ -80,6 +77,8 @@ def seed_challenges(db: Session):
             print(f"Created challenge: {challenge_data.title}")
 
 if __name__ == "__main__":
+    # Ensure tables are created
+    models.Base.metadata.create_all(bind=engine)
     db = SessionLocal()
     try:
         seed_challenges(db)
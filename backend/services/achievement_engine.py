@@ -0,0 +1,240 @@
+# services/achievement_engine.py
+"""
+선언형 업적 규칙 엔진.
+
+규칙은 (카운터, 임계값) 쌍이고, 카운터는 사용자별로 user_achievement_counters 에
+저장되어 TripRecorded / CreditsEarned 이벤트마다 증분 갱신됩니다. 임계값을 넘는
+순간 업적이 부여되며, 이력 전체를 다시 보는 것은 backfill 뿐입니다.
+
+카운터는 `value = value + :delta` upsert 로, 업적은 INSERT ... ON CONFLICT DO NOTHING
+으로 기록하므로 같은 사용자의 배치가 동시에 처리되어도 증분이 사라지거나 중복 부여되지
+않습니다. 최장 연속 기록(streak_best)은 활동 비트맵(services/activity_calendar.py)에서
+계산하므로 늦게 도착한 이동도 반영됩니다.
+
+    python -m services.achievement_engine --backfill
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import (
+    Achievement, CreditsLedger, CreditType, MobilityLog, UserAchievement, UserAchievementCounter
+)
+from services.achievement_state import achievement_states
+from services.activity_calendar import longest_run
+from services.carbon_factor_registry import ECO_MODES
+from services.data_version import bump_users
+
+# 카운터 이름
+TRIP_COUNT = "trip_count"
+BIKE_KM = "bike_km"
+CO2_SAVED_G = "co2_saved_g"
+CREDITS_EARNED_POINTS = "credits_earned"
+STREAK_BEST = "streak_best"
+
+BIKE_MODES = {"BIKE", "TTAREUNGI"}
+
+
+class AchievementRule:
+    def __init__(self, code: str, title: str, description: str, counter: str, threshold: float):
+        self.code = code
+        self.title = title
+        self.description = description
+        self.counter = counter
+        self.threshold = threshold
+
+
+ACHIEVEMENT_RULES: List[AchievementRule] = [
+    AchievementRule("FIRST_TRIP", "첫 친환경 이동", "처음으로 친환경 이동을 기록했습니다.", TRIP_COUNT, 1),
+    AchievementRule("TRIPS_50", "꾸준한 이동러", "친환경 이동을 50회 기록했습니다.", TRIP_COUNT, 50),
+    AchievementRule("BIKE_10KM", "자전거 10km", "자전거로 누적 10km를 이동했습니다.", BIKE_KM, 10),
+    AchievementRule("BIKE_100KM", "자전거 100km", "자전거로 누적 100km를 이동했습니다.", BIKE_KM, 100),
+    AchievementRule("STREAK_7", "7일 연속 실천", "7일 연속으로 친환경 이동을 기록했습니다.", STREAK_BEST, 7),
+    AchievementRule("STREAK_30", "30일 연속 실천", "30일 연속으로 친환경 이동을 기록했습니다.", STREAK_BEST, 30),
+    AchievementRule("CO2_10KG", "탄소 10kg 절감", "누적 10kg의 CO2를 절감했습니다.", CO2_SAVED_G, 10_000),
+    AchievementRule("CO2_100KG", "탄소 100kg 절감", "누적 100kg의 CO2를 절감했습니다.", CO2_SAVED_G, 100_000),
+    AchievementRule("CREDITS_1000", "크레딧 1000", "누적 1000 크레딧을 적립했습니다.", CREDITS_EARNED_POINTS, 1000),
+]
+
+
+def longest_streak(days: Iterable[date]) -> int:
+    """Longest run of consecutive days (one bit per day ordinal)."""
+    ordinals = {day.toordinal() for day in days}
+    if not ordinals:
+        return 0
+    base = min(ordinals)
+    return longest_run(sum(1 << (ordinal - base) for ordinal in ordinals))
+
+
+class AchievementEngine:
+    def __init__(self, rules: List[AchievementRule]):
+        self.rules = rules
+        self._achievement_ids: Dict[str, int] = {}
+
+    def ensure_catalog(self, db: Session) -> Dict[str, int]:
+        """Make sure every rule has an Achievement row; returns code -> achievement_id."""
+        if self._achievement_ids and len(self._achievement_ids) == len(self.rules):
+            return self._achievement_ids
+        existing = {a.code: a for a in db.query(Achievement).filter(Achievement.code.in_([r.code for r in self.rules]))}
+        for rule in self.rules:
+            if rule.code not in existing:
+                achievement = Achievement(code=rule.code, title=rule.title, description=rule.description)
+                db.add(achievement)
+                existing[rule.code] = achievement
+        db.flush()
+        self._achievement_ids = {code: a.achievement_id for code, a in existing.items()}
+        return self._achievement_ids
+
+    @staticmethod
+    def _upsert_counters(db: Session, values: Dict[int, Dict[str, float]], combine: Callable) -> Dict[int, Dict[str, float]]:
+        """
+        Merge `values` into the stored counters in one INSERT ... ON CONFLICT DO
+        UPDATE SET value = combine(value, excluded.value), so the merge happens
+        inside the statement. Returns the stored values after the merge.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {"user_id": user_id, "counter": counter, "value": float(value), "updated_at": now}
+            for user_id, changes in values.items() for counter, value in changes.items()
+        ]
+        if not rows:
+            return {}
+        table = UserAchievementCounter.__table__
+        stmt = sqlite_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.counter],
+            set_={"value": combine(table.c.value, stmt.excluded.value), "updated_at": stmt.excluded.updated_at},
+        ).returning(table.c.user_id, table.c.counter, table.c.value)
+        stored: Dict[int, Dict[str, float]] = defaultdict(dict)
+        for user_id, counter, value in db.execute(stmt):
+            stored[user_id][counter] = value
+        bump_users(db.connection(), stored)   # Core upsert 는 ORM flush 훅을 거치지 않으므로 ETag 버전을 직접 올립니다
+        return stored
+
+    def _grant(self, db: Session, crossed: Dict[int, Set[str]], granted_at: Optional[datetime] = None) -> int:
+        """Insert UserAchievement rows for (user, rule code) pairs; pairs already granted are skipped by the insert."""
+        if not crossed:
+            return 0
+        ids = self.ensure_catalog(db)
+        granted_at = granted_at or datetime.utcnow()
+        rows = [
+            {"user_id": user_id, "achievement_id": ids[code], "granted_at": granted_at}
+            for user_id, codes in crossed.items() for code in codes
+        ]
+        table = UserAchievement.__table__
+        stmt = sqlite_insert(table).values(rows).on_conflict_do_nothing().returning(
+            table.c.user_id, table.c.achievement_id, table.c.granted_at
+        )
+        inserted: Dict[int, Dict[int, datetime]] = defaultdict(dict)
+        for user_id, achievement_id, row_granted_at in db.execute(stmt):
+            inserted[user_id][int(achievement_id)] = row_granted_at
+        # Core insert 는 ORM flush 훅을 거치지 않으므로 비트셋(과 ETag 버전)을 직접 갱신합니다.
+        achievement_states.record_grants(db, inserted)
+        return sum(len(v) for v in inserted.values())
+
+    def apply(self, db: Session, deltas: Dict[int, Dict[str, float]]) -> int:
+        """
+        Add counter deltas for a batch of users and grant every rule whose
+        threshold was crossed by this increment. Does not commit.
+        """
+        deltas = {u: {c: d for c, d in changes.items() if d} for u, changes in deltas.items()}
+        deltas = {u: changes for u, changes in deltas.items() if changes}
+        stored = self._upsert_counters(db, deltas, lambda value, delta: value + delta)
+
+        crossed: Dict[int, Set[str]] = defaultdict(set)
+        for user_id, values in stored.items():
+            for rule in self.rules:
+                delta = deltas[user_id].get(rule.counter)
+                if delta and values[rule.counter] - delta < rule.threshold <= values[rule.counter]:
+                    crossed[user_id].add(rule.code)
+        return self._grant(db, crossed)
+
+    def apply_streaks(self, db: Session, longest: Dict[int, int]) -> int:
+        """
+        Raise each user's streak_best to `longest` (computed from the activity
+        bitmap, so late days are included) and grant the streak rules reached.
+        Does not commit.
+        """
+        stored = self._upsert_counters(db, {u: {STREAK_BEST: v} for u, v in longest.items() if v}, func.max)
+        crossed: Dict[int, Set[str]] = defaultdict(set)
+        for user_id, values in stored.items():
+            for rule in self.rules:
+                if rule.counter == STREAK_BEST and values[STREAK_BEST] >= rule.threshold:
+                    crossed[user_id].add(rule.code)
+        return self._grant(db, crossed)
+
+    # ------------------------------------------------------------------
+    # Backfill (전체 이력을 한 번에 집계)
+    # ------------------------------------------------------------------
+    def backfill(self, db: Session) -> dict:
+        """Rebuild every user's counters from history with grouped queries, then grant in bulk. Commits."""
+        counters: Dict[int, Dict[str, float]] = defaultdict(dict)
+        eco = list(ECO_MODES)
+
+        for user_id, trips, co2 in db.query(
+            MobilityLog.user_id, func.count(MobilityLog.log_id), func.coalesce(func.sum(MobilityLog.co2_saved_g), 0)
+        ).filter(MobilityLog.mode.in_(eco)).group_by(MobilityLog.user_id):
+            counters[user_id][TRIP_COUNT] = float(trips)
+            counters[user_id][CO2_SAVED_G] = float(co2)
+
+        for user_id, km in db.query(
+            MobilityLog.user_id, func.coalesce(func.sum(MobilityLog.distance_km), 0)
+        ).filter(MobilityLog.mode.in_(list(BIKE_MODES))).group_by(MobilityLog.user_id):
+            counters[user_id][BIKE_KM] = float(km)
+
+        for user_id, points in db.query(
+            CreditsLedger.user_id, func.coalesce(func.sum(CreditsLedger.points), 0)
+        ).filter(CreditsLedger.type == CreditType.EARN).group_by(CreditsLedger.user_id):
+            counters[user_id][CREDITS_EARNED_POINTS] = float(points)
+
+        # 연속 기록: 사용자별 활동일을 비트로 세운 뒤 가장 긴 연속 구간을 셉니다.
+        days_by_user: Dict[int, List[date]] = defaultdict(list)
+        for user_id, day in db.query(
+            MobilityLog.user_id, func.date(MobilityLog.started_at)
+        ).filter(MobilityLog.mode.in_(eco)).distinct():
+            days_by_user[user_id].append(day if isinstance(day, date) else date.fromisoformat(str(day)))
+        for user_id, days in days_by_user.items():
+            counters[user_id][STREAK_BEST] = float(longest_streak(days))
+
+        db.query(UserAchievementCounter).delete(synchronize_session=False)
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(UserAchievementCounter, [
+            {"user_id": u, "counter": c, "value": v, "updated_at": now}
+            for u, values in counters.items() for c, v in values.items()
+        ])
+
+        reached = {
+            u: {rule.code for rule in self.rules if values.get(rule.counter, 0.0) >= rule.threshold}
+            for u, values in counters.items()
+        }
+        granted = self._grant(db, {u: codes for u, codes in reached.items() if codes}, granted_at=now)
+        bump_users(db.connection(), counters)
+        db.commit()
+        return {"users": len(counters), "counters": sum(len(v) for v in counters.values()), "granted": granted}
+
+
+# 전역 인스턴스
+achievement_engine = AchievementEngine(ACHIEVEMENT_RULES)
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Achievement rules engine maintenance.")
+    parser.add_argument("--backfill", action="store_true", help="rebuild all counters from history and grant in bulk")
+    args = parser.parse_args()
+
+    if args.backfill:
+        db = SessionLocal()
+        try:
+            achievement_engine.ensure_catalog(db)
+            print(f"[achievements] backfill done: {achievement_engine.backfill(db)}")
+        finally:
+            db.close()
+    else:
+        parser.print_help()
@@ -0,0 +1,300 @@
+# services/achievement_state.py
+"""
+업적 목록 조회용 인메모리 카탈로그와 사용자별 잠금 해제 비트셋.
+
+목록 API는 카탈로그(메모리)를 순회하며 사용자 비트셋의 비트만 검사하므로
+achievements / user_achievements JOIN 없이 사용자 행 하나만 읽습니다.
+user_achievements 가 원본이고, 비트셋은 같은 flush 안에서 함께 갱신됩니다.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, event, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import Achievement, UserAchievement, UserAchievementState
+from services.cache_epochs import cache_epochs
+from services.data_version import bump_users
+from services.response_cache import ACHIEVEMENT_CATALOG
+
+ACHIEVEMENT_CATALOG_RELOAD_SECONDS = float(os.getenv("ACHIEVEMENT_CATALOG_RELOAD_SECONDS", 60))
+EPOCH = datetime(1970, 1, 1)
+
+
+def pack_unlocked(granted: Dict[int, datetime]) -> Tuple[bytes, bytes]:
+    """achievement_id -> granted_at  =>  (little-endian bitset, int64 epoch seconds in id order)."""
+    if not granted:
+        return b"", b""
+    ids = sorted(granted)
+    bits = np.zeros(ids[-1] // 8 + 1, dtype=np.uint8)
+    positions = np.array(ids, dtype=np.int64)
+    np.bitwise_or.at(bits, positions // 8, (1 << (positions % 8)).astype(np.uint8))
+    ts = np.array([int(((granted[i] or EPOCH) - EPOCH).total_seconds()) for i in ids], dtype="<i8")
+    return bits.tobytes(), ts.tobytes()
+
+
+def _bit_ids(bits: bytes) -> np.ndarray:
+    return np.flatnonzero(np.unpackbits(np.frombuffer(bits, dtype=np.uint8), bitorder="little"))
+
+
+def unpack_unlocked(unlocked_bits: bytes, granted_ts: bytes) -> Dict[int, datetime]:
+    if not unlocked_bits:
+        return {}
+    ids = _bit_ids(unlocked_bits)
+    ts = np.frombuffer(granted_ts, dtype="<i8")
+    return {int(i): datetime.utcfromtimestamp(int(t)) for i, t in zip(ids, ts)}
+
+
+def _merge(stored_bits: bytes, stored_ts: bytes, delta_bits: bytes, delta_ts: bytes, revoked_bits: bytes) -> Tuple[bytes, bytes]:
+    """Stored state plus the delta's grants (earliest grant time kept) minus the revoked ids."""
+    unlocked = unpack_unlocked(stored_bits, stored_ts)
+    for achievement_id, granted_at in unpack_unlocked(delta_bits, delta_ts).items():
+        unlocked.setdefault(achievement_id, granted_at)
+    for achievement_id in _bit_ids(revoked_bits):
+        unlocked.pop(int(achievement_id), None)
+    return pack_unlocked(unlocked)
+
+
+def _register_merge_functions(db: Session):
+    """Make the bitset merge available to SQL on the session's SQLite connection (idempotent)."""
+    connection = db.connection().connection.driver_connection
+    connection.create_function("achievement_merge_bits", 5, lambda *a: _merge(*a)[0], deterministic=True)
+    connection.create_function("achievement_merge_ts", 5, lambda *a: _merge(*a)[1], deterministic=True)
+
+
+class CatalogEntry:
+    __slots__ = ("achievement_id", "code", "title", "description")
+
+    def __init__(self, achievement_id: int, code: Optional[str], title: str, description: Optional[str]):
+        self.achievement_id = achievement_id
+        self.code = code
+        self.title = title
+        self.description = description
+
+
+class AchievementCatalog:
+    """
+    In-memory copy of the `achievements` table ordered by id, with a version
+    stamp that increases on every reload. Reloads after an ORM commit touching
+    Achievement in this process or, through the ACHIEVEMENT_CATALOG epoch, in
+    another one; a (count, max id) fingerprint is still re-checked at most every
+    ACHIEVEMENT_CATALOG_RELOAD_SECONDS for rows written outside the ORM.
+    """
+
+    def __init__(self, reload_interval: float = ACHIEVEMENT_CATALOG_RELOAD_SECONDS):
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self.entries: List[CatalogEntry] = []
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._installed = False
+        self.version = 0
+
+    @staticmethod
+    def _table_fingerprint(db: Session):
+        return tuple(db.query(func.count(Achievement.achievement_id), func.max(Achievement.achievement_id)).one())
+
+    def load(self, db: Session):
+        fingerprint = self._table_fingerprint(db)
+        entries = [
+            CatalogEntry(*row) for row in db.query(
+                Achievement.achievement_id, Achievement.code, Achievement.title, Achievement.description
+            ).order_by(Achievement.achievement_id)
+        ]
+        with self._lock:
+            self.entries = entries
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            self._stale = False
+            self.version += 1
+
+    def ensure_fresh(self, db: Session) -> List[CatalogEntry]:
+        if self._stale:
+            self.load(db)
+        elif time.monotonic() - self._checked_at >= self.reload_interval:
+            if self._table_fingerprint(db) != self._fingerprint:
+                self.load(db)
+            else:
+                self._checked_at = time.monotonic()
+        return self.entries
+
+    def invalidate(self):
+        self._stale = True
+
+
+class AchievementStateStore:
+    """Maintains and reads the per-user UserAchievementState bitsets."""
+
+    def __init__(self, catalog: AchievementCatalog):
+        self.catalog = catalog
+        self._installed = False
+
+    def install(self, session_factory):
+        """
+        Keep bitsets in step with user_achievements: UserAchievement rows added
+        or deleted through the ORM update the owner's state row in the same
+        flush, and Achievement changes invalidate the catalog after commit.
+        """
+        if self._installed:
+            return
+        self._installed = True
+        cache_epochs.subscribe(self.catalog.invalidate, tags=(ACHIEVEMENT_CATALOG,))
+
+        def _sync_states(session, flush_context, instances):
+            granted: Dict[int, Dict[int, datetime]] = defaultdict(dict)
+            revoked: Dict[int, List[int]] = defaultdict(list)
+            for obj in session.new:
+                if isinstance(obj, UserAchievement):
+                    if obj.granted_at is None:
+                        obj.granted_at = datetime.utcnow()
+                    granted[obj.user_id][int(obj.achievement_id)] = obj.granted_at
+                elif isinstance(obj, Achievement):
+                    session.info["achievement_catalog_changed"] = True
+            for obj in session.deleted:
+                if isinstance(obj, UserAchievement):
+                    revoked[obj.user_id].append(int(obj.achievement_id))
+                elif isinstance(obj, Achievement):
+                    session.info["achievement_catalog_changed"] = True
+            if any(isinstance(obj, Achievement) for obj in session.dirty):
+                session.info["achievement_catalog_changed"] = True
+            if granted or revoked:
+                with session.no_autoflush:
+                    self._apply(session, granted, revoked)
+
+        def _reload(session):
+            if session.info.pop("achievement_catalog_changed", False):
+                self.catalog.invalidate()
+
+        event.listen(session_factory, "before_flush", _sync_states)
+        event.listen(session_factory, "after_commit", _reload)
+
+    def record_grants(self, db: Session, granted: Dict[int, Dict[int, datetime]]):
+        """Set the bits of user_achievements rows inserted with Core statements (no ORM flush hook runs)."""
+        granted = {user_id: rows for user_id, rows in granted.items() if rows}
+        if granted:
+            self._apply(db, granted, {})
+
+    @staticmethod
+    def _apply(db: Session, granted: Dict[int, Dict[int, datetime]], revoked: Dict[int, List[int]]):
+        """
+        Merge grants / revocations into the stored bitsets with one upsert per
+        user. The merge runs inside the statement (SQL functions over the stored
+        blobs), so a request flush and the outbox consumer writing the same user
+        cannot drop each other's bits.
+        """
+        user_ids = set(granted) | set(revoked)
+        # 상태 행이 없는 사용자는 기존 user_achievements 를 함께 넣어 행을 처음 만듭니다.
+        missing = user_ids - {
+            row[0] for row in db.query(UserAchievementState.user_id).filter(UserAchievementState.user_id.in_(user_ids))
+        }
+        existing: Dict[int, Dict[int, datetime]] = defaultdict(dict)
+        if missing:
+            for user_id, achievement_id, granted_at in db.query(
+                UserAchievement.user_id, UserAchievement.achievement_id, UserAchievement.granted_at
+            ).filter(UserAchievement.user_id.in_(missing)):
+                existing[user_id][int(achievement_id)] = granted_at
+
+        now = datetime.utcnow()
+        params = []
+        for user_id in user_ids:
+            delta = dict(existing.get(user_id, {}))
+            for achievement_id, granted_at in granted.get(user_id, {}).items():
+                delta.setdefault(achievement_id, granted_at)
+            revoked_bits, _ = pack_unlocked({achievement_id: EPOCH for achievement_id in revoked.get(user_id, [])})
+            bits, ts = _merge(b"", b"", *pack_unlocked(delta), revoked_bits)
+            params.append({
+                "b_user_id": user_id, "b_bits": bits, "b_ts": ts, "b_revoked": revoked_bits, "b_updated_at": now,
+            })
+
+        _register_merge_functions(db)
+        table = UserAchievementState.__table__
+        stmt = sqlite_insert(table).values(
+            user_id=bindparam("b_user_id"), unlocked_bits=bindparam("b_bits"),
+            granted_ts=bindparam("b_ts"), updated_at=bindparam("b_updated_at"),
+        )
+        # SET 의 오른쪽은 모두 갱신 전 값을 보므로 두 함수가 같은 저장 상태에서 계산합니다.
+        merge_args = (table.c.unlocked_bits, table.c.granted_ts, stmt.excluded.unlocked_bits, stmt.excluded.granted_ts, bindparam("b_revoked"))
+        db.connection().execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                "unlocked_bits": func.achievement_merge_bits(*merge_args),
+                "granted_ts": func.achievement_merge_ts(*merge_args),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ), params)
+        # Core 쓰기라 ORM flush 훅이 버전을 올리지 않는 경로(record_grants)가 있으므로 여기서 올립니다.
+        bump_users(db.connection(), user_ids)
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Recreate every state row from user_achievements (migration / repair). Commits."""
+        unlocked: Dict[int, Dict[int, datetime]] = defaultdict(dict)
+        for user_id, achievement_id, granted_at in db.query(
+            UserAchievement.user_id, UserAchievement.achievement_id, UserAchievement.granted_at
+        ):
+            unlocked[user_id][int(achievement_id)] = granted_at
+        now = datetime.utcnow()
+        rows = []
+        for user_id, granted in unlocked.items():
+            bits, ts = pack_unlocked(granted)
+            rows.append({"user_id": user_id, "unlocked_bits": bits, "granted_ts": ts, "updated_at": now})
+        stale = [row[0] for row in db.query(UserAchievementState.user_id)]
+        db.query(UserAchievementState).delete(synchronize_session=False)
+        db.bulk_insert_mappings(UserAchievementState, rows)
+        bump_users(db.connection(), [*stale, *unlocked])
+        db.commit()
+        return len(rows)
+
+    def ensure_built(self, db: Session):
+        """Build state rows on first start after the table was introduced."""
+        if db.query(UserAchievementState.user_id).first() is None and db.query(UserAchievement.user_id).first() is not None:
+            self.rebuild(db)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    @staticmethod
+    def unlocked_many(db: Session, user_ids: Iterable[int]) -> Dict[int, Dict[int, datetime]]:
+        """user_id -> {achievement_id: granted_at} for many users with one query."""
+        user_ids = list(user_ids)
+        result: Dict[int, Dict[int, datetime]] = {user_id: {} for user_id in user_ids}
+        for user_id, bits, ts in db.query(
+            UserAchievementState.user_id, UserAchievementState.unlocked_bits, UserAchievementState.granted_ts
+        ).filter(UserAchievementState.user_id.in_(user_ids)):
+            result[user_id] = unpack_unlocked(bits, ts)
+        return result
+
+    def listing(self, db: Session, user_id: int) -> List[dict]:
+        """The achievement list for one user: a catalog walk with bit tests."""
+        entries = self.catalog.ensure_fresh(db)
+        row = db.query(UserAchievementState.unlocked_bits, UserAchievementState.granted_ts).filter(
+            UserAchievementState.user_id == user_id
+        ).first()
+        bits = int.from_bytes(row[0], "little") if row else 0
+        granted = unpack_unlocked(row[0], row[1]) if bits else {}
+
+        result = []
+        for entry in entries:
+            is_unlocked = bool(bits >> entry.achievement_id & 1)
+            granted_at = granted.get(entry.achievement_id) if is_unlocked else None
+            result.append({
+                "id": entry.achievement_id,
+                "name": entry.title,
+                "desc": entry.description,
+                "date": str(granted_at) if granted_at else None,
+                "unlocked": is_unlocked,
+                "progress": 100 if is_unlocked else 0,
+            })
+        return result
+
+
+# 전역 인스턴스
+achievement_catalog = AchievementCatalog()
+achievement_states = AchievementStateStore(achievement_catalog)
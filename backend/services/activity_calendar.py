@@ -0,0 +1,224 @@
+# services/activity_calendar.py
+"""
+사용자별 연간 활동 비트맵 (연속 기록 / 히트맵).
+
+하루 = 1비트. 친환경 이동이 있는 날의 비트를 세우고 일별 CO2 절감량을 함께
+누적합니다. 연속 기록은 여러 해의 비트맵을 하나의 정수로 이어 붙인 뒤 비트 연산으로
+계산하므로 mobility_logs 를 GROUP BY 하지 않습니다.
+
+    python -m services.activity_calendar --backfill
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import MobilityLog, UserActivityYear
+from services.carbon_factor_registry import ECO_MODES
+from services.data_version import bump_users
+
+DAYS_PER_ROW = 366
+BITMAP_BYTES = (DAYS_PER_ROW + 7) // 8
+
+
+def day_index(day: date) -> int:
+    return day.timetuple().tm_yday - 1
+
+
+def _empty_row() -> Tuple[np.ndarray, np.ndarray]:
+    return np.zeros(BITMAP_BYTES, dtype=np.uint8), np.zeros(DAYS_PER_ROW, dtype="<f4")
+
+
+def _set_days(bits: np.ndarray, intensity: np.ndarray, days: Dict[int, float]):
+    idx = np.fromiter(days.keys(), dtype=np.int64, count=len(days))
+    np.bitwise_or.at(bits, idx // 8, (1 << (idx % 8)).astype(np.uint8))
+    np.add.at(intensity, idx, np.fromiter(days.values(), dtype="<f4", count=len(days)))
+
+
+def longest_run(bits: int) -> int:
+    """Length of the longest run of set bits (x &= x >> 1 removes one bit from every run)."""
+    run = 0
+    while bits:
+        bits &= bits >> 1
+        run += 1
+    return run
+
+
+def trailing_run(bits: int, position: int) -> int:
+    """Number of consecutive set bits ending at `position` and going down."""
+    window = ~bits & ((1 << (position + 1)) - 1)
+    return position + 1 - window.bit_length() if window else position + 1
+
+
+def _or_bits(stored: bytes, delta: bytes) -> bytes:
+    return (np.frombuffer(stored, dtype=np.uint8) | np.frombuffer(delta, dtype=np.uint8)).tobytes()
+
+
+def _add_intensity(stored: bytes, delta: bytes) -> bytes:
+    return (np.frombuffer(stored, dtype="<f4") + np.frombuffer(delta, dtype="<f4")).tobytes()
+
+
+def _register_merge_functions(db: Session):
+    """Make the blob merge functions available to SQL on the session's SQLite connection (idempotent)."""
+    connection = db.connection().connection.driver_connection
+    connection.create_function("activity_or_bits", 2, _or_bits, deterministic=True)
+    connection.create_function("activity_add_intensity", 2, _add_intensity, deterministic=True)
+
+
+class ActivityCalendar:
+    """Per-user, per-year active-day bitmaps maintained from TripRecorded events."""
+
+    @staticmethod
+    def record(db: Session, days_by_user: Dict[int, Dict[date, float]]):
+        """
+        Mark days active and add their CO2 saved with one upsert for every
+        touched (user, year). The new days travel as a bitmap / intensity delta
+        and are merged into the stored row by SQL functions inside the
+        statement, so concurrent handlers for the same user cannot drop each
+        other's days. Does not commit.
+        """
+        grouped: Dict[Tuple[int, int], Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        for user_id, days in days_by_user.items():
+            for day, co2 in days.items():
+                grouped[(user_id, day.year)][day_index(day)] += co2
+        if not grouped:
+            return
+
+        now = datetime.utcnow()
+        rows = []
+        for (user_id, year), days in grouped.items():
+            bits, intensity = _empty_row()
+            _set_days(bits, intensity, days)
+            rows.append({
+                "user_id": user_id, "year": year,
+                "active_bits": bits.tobytes(), "intensity": intensity.tobytes(), "updated_at": now,
+            })
+        _register_merge_functions(db)
+        table = UserActivityYear.__table__
+        stmt = sqlite_insert(table).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.year],
+            set_={
+                "active_bits": func.activity_or_bits(table.c.active_bits, stmt.excluded.active_bits),
+                "intensity": func.activity_add_intensity(table.c.intensity, stmt.excluded.intensity),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ))
+        bump_users(db.connection(), days_by_user)   # Core upsert 는 ORM flush 훅을 거치지 않으므로 ETag 버전을 직접 올립니다
+
+    @staticmethod
+    def _timelines(db: Session, user_ids: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+        """user_id -> (ordinal of bit 0, all years' bitmaps concatenated into one int)."""
+        timelines: Dict[int, Tuple[int, int]] = {}
+        for user_id, year, active_bits in db.query(
+            UserActivityYear.user_id, UserActivityYear.year, UserActivityYear.active_bits
+        ).filter(UserActivityYear.user_id.in_(list(user_ids))).order_by(UserActivityYear.user_id, UserActivityYear.year):
+            base, timeline = timelines.get(user_id) or (date(year, 1, 1).toordinal(), 0)
+            timeline |= int.from_bytes(active_bits, "little") << (date(year, 1, 1).toordinal() - base)
+            timelines[user_id] = (base, timeline)
+        return timelines
+
+    def _timeline(self, db: Session, user_id: int) -> Tuple[int, int]:
+        return self._timelines(db, [user_id]).get(user_id, (0, 0))
+
+    def longest_streaks(self, db: Session, user_ids: Iterable[int]) -> Dict[int, int]:
+        """Longest run of active days for each user, with one query."""
+        return {user_id: longest_run(timeline) for user_id, (_, timeline) in self._timelines(db, user_ids).items()}
+
+    def streaks(self, db: Session, user_id: int, today: Optional[date] = None) -> dict:
+        """
+        Current and longest streak. The current streak still counts when today
+        has no trip yet but yesterday had one.
+        """
+        today = today or datetime.utcnow().date()
+        base, timeline = self._timeline(db, user_id)
+        if not timeline:
+            return {"current_streak": 0, "longest_streak": 0, "last_active_date": None}
+
+        last_active = date.fromordinal(base + timeline.bit_length() - 1)
+        position = today.toordinal() - base
+        current = 0
+        if position >= 0:
+            current = trailing_run(timeline, position)
+            if current == 0 and position > 0:
+                current = trailing_run(timeline, position - 1)
+        return {"current_streak": current, "longest_streak": longest_run(timeline), "last_active_date": last_active}
+
+    @staticmethod
+    def heatmap(db: Session, user_id: int, year: int) -> dict:
+        row = db.query(UserActivityYear.active_bits, UserActivityYear.intensity).filter(
+            UserActivityYear.user_id == user_id, UserActivityYear.year == year
+        ).first()
+        days_in_year = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+        if row is None:
+            return {"year": year, "active_days": 0, "intensity": [0.0] * days_in_year}
+        active = np.unpackbits(np.frombuffer(row[0], dtype=np.uint8), bitorder="little")[:days_in_year]
+        intensity = np.frombuffer(row[1], dtype="<f4")[:days_in_year]
+        return {
+            "year": year,
+            "active_days": int(active.sum()),
+            "intensity": [round(float(v), 1) for v in intensity],
+        }
+
+    @staticmethod
+    def backfill(db: Session, user_ids: Optional[Iterable[int]] = None) -> dict:
+        """Rebuild bitmaps from mobility_logs with one grouped query. Commits."""
+        query = db.query(
+            MobilityLog.user_id,
+            func.date(MobilityLog.started_at),
+            func.coalesce(func.sum(MobilityLog.co2_saved_g), 0),
+        ).filter(MobilityLog.mode.in_(list(ECO_MODES)), MobilityLog.started_at.isnot(None))
+        delete = db.query(UserActivityYear)
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            query = query.filter(MobilityLog.user_id.in_(user_ids))
+            delete = delete.filter(UserActivityYear.user_id.in_(user_ids))
+
+        grouped: Dict[Tuple[int, int], Dict[int, float]] = defaultdict(dict)
+        days = 0
+        for user_id, day, co2 in query.group_by(MobilityLog.user_id, func.date(MobilityLog.started_at)):
+            day = day if isinstance(day, date) else date.fromisoformat(str(day))
+            grouped[(user_id, day.year)][day_index(day)] = float(co2)
+            days += 1
+
+        now = datetime.utcnow()
+        rows = []
+        for (user_id, year), active_days in grouped.items():
+            bits, intensity = _empty_row()
+            _set_days(bits, intensity, active_days)
+            rows.append({
+                "user_id": user_id, "year": year,
+                "active_bits": bits.tobytes(), "intensity": intensity.tobytes(), "updated_at": now,
+            })
+        touched = {row[0] for row in delete.with_entities(UserActivityYear.user_id).distinct()}
+        delete.delete(synchronize_session=False)
+        db.bulk_insert_mappings(UserActivityYear, rows)
+        bump_users(db.connection(), touched | {user_id for user_id, _ in grouped})
+        db.commit()
+        return {"rows": len(rows), "active_days": days}
+
+
+# 전역 인스턴스
+activity_calendar = ActivityCalendar()
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Activity calendar maintenance.")
+    parser.add_argument("--backfill", action="store_true", help="rebuild every user's day bitmaps from mobility_logs")
+    args = parser.parse_args()
+
+    if args.backfill:
+        db = SessionLocal()
+        try:
+            print(f"[activity] backfill done: {activity_calendar.backfill(db)}")
+        finally:
+            db.close()
+    else:
+        parser.print_help()
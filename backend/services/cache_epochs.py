@@ -0,0 +1,171 @@
+# services/cache_epochs.py
+"""
+워커 프로세스 사이의 캐시 무효화 채널 (Redis 없이 SQLite 만 사용).
+
+- 쓰기: 캐시 태그를 무효화하는 트랜잭션이 같은 트랜잭션 안에서 cache_epochs(tag, epoch)
+  를 1 올립니다 (bump_epochs). 커밋되어야 다른 프로세스에 보이므로 롤백된 쓰기는
+  무효화를 일으키지 않습니다.
+- 읽기: 각 워커는 전용 연결 하나로 CACHE_EPOCH_POLL_SECONDS 마다 PRAGMA data_version 을
+  확인합니다. 이 값은 다른 연결이 DB 파일에 커밋했을 때만 바뀌므로, 평소에는 PRAGMA 한 번
+  으로 끝나고 바뀌었을 때만 cache_epochs 를 읽어 epoch 가 달라진 태그를 구독자에게 알립니다.
+
+같은 프로세스의 커밋도 data_version 을 바꾸므로 자기 자신이 올린 태그도 한 번 더
+통지되지만, 이미 비운 캐시를 다시 비울 뿐이라 문제되지 않습니다.
+
+구독자: 응답 캐시(태그별), 그룹 챌린지 목록 캐시, 업적 카탈로그, 정류장 인덱스와 그
+위의 검색 / 노선 / 주변 타일 캐시, 분포 스케치. 태그는 services/response_cache.py 에 있습니다.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from models import CacheEpoch
+
+logger = logging.getLogger(__name__)
+
+CACHE_EPOCH_POLL_SECONDS = float(os.getenv("CACHE_EPOCH_POLL_SECONDS", 1.0))
+
+
+def bump_epochs(bind, tags: Iterable[str]):
+    """Increment the epoch of each tag inside the caller's transaction; `bind` is a Session or Connection."""
+    tags = sorted(set(tags))
+    if not tags:
+        return
+    table = CacheEpoch.__table__
+    now = datetime.utcnow()
+    bind.execute(
+        table.update().where(table.c.tag.in_(tags)).values(epoch=table.c.epoch + 1, updated_at=now)
+    )
+    # 처음 쓰이는 태그만 행을 만듭니다. 쓰기 트랜잭션 안이라 SQLite 에서는 다른 프로세스와 겹치지 않습니다.
+    present = {row[0] for row in bind.execute(table.select().with_only_columns(table.c.tag).where(table.c.tag.in_(tags)))}
+    missing = [tag for tag in tags if tag not in present]
+    if missing:
+        bind.execute(table.insert(), [{"tag": tag, "epoch": 1, "updated_at": now} for tag in missing])
+
+
+class CacheEpochs:
+    """
+    Polls `cache_epochs` from a dedicated connection and calls the subscribers
+    with the tags whose epoch moved since the previous poll.
+    """
+
+    def __init__(self, poll_seconds: float = CACHE_EPOCH_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._subscribers: List[Callable[..., None]] = []
+        self._epochs: Optional[Dict[str, int]] = None   # None: 아직 기준값을 읽지 않음
+        self._data_version: Optional[int] = None
+        self._connection = None
+        self._sqlite = False
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.reads = 0
+        self.notified: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+
+    def subscribe(self, callback: Callable[..., None], tags: Optional[Iterable[str]] = None):
+        """
+        `callback(*tags)` runs in the polling thread for tags bumped since the
+        last poll. With `tags`, `callback()` runs only when one of those moved
+        (for in-memory caches that are dropped as a whole).
+        """
+        if tags is not None:
+            tags = frozenset(tags)
+            target = callback
+
+            def callback(*changed):
+                if tags.intersection(changed):
+                    target()
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def connect(self, engine):
+        """Open the dedicated DB-API connection; PRAGMA data_version is only comparable on one connection."""
+        with self._lock:
+            if self._connection is None:
+                self._connection = engine.raw_connection()
+                self._sqlite = engine.dialect.name == "sqlite"
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self._data_version = None
+
+    def poll(self) -> List[str]:
+        """One check; returns (and publishes) the tags bumped since the previous one."""
+        with self._lock:
+            cursor = self._connection.cursor()
+            try:
+                self.polls += 1
+                if self._sqlite:
+                    cursor.execute("PRAGMA data_version")
+                    data_version = cursor.fetchone()[0]
+                    if data_version == self._data_version and self._epochs is not None:
+                        return []
+                    self._data_version = data_version
+                cursor.execute(f"SELECT tag, epoch FROM {CacheEpoch.__tablename__}")
+                epochs = {tag: int(epoch) for tag, epoch in cursor.fetchall()}
+                self.reads += 1
+            finally:
+                cursor.close()
+                if not self._sqlite:
+                    self._connection.rollback()   # 다음 읽기가 새 스냅샷을 보도록
+
+            previous, self._epochs = self._epochs, epochs
+            if previous is None:
+                return []
+            changed = sorted(tag for tag, epoch in epochs.items() if previous.get(tag) != epoch)
+            for tag in changed:
+                self.notified[tag] = self.notified.get(tag, 0) + 1
+
+        if changed:
+            for callback in self._subscribers:
+                callback(*changed)
+        return changed
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.poll)
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("cache epoch poll failed")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self, engine):
+        if self._task:
+            return
+        self.connect(engine)
+        self.poll()   # 기준 epoch
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self.close()
+
+    def metrics(self) -> dict:
+        return {
+            "poll_seconds": self.poll_seconds,
+            "polls": self.polls,
+            "table_reads": self.reads,
+            "tags": len(self._epochs or {}),
+            "notified": dict(self.notified),
+            "last_error": self.last_error,
+        }
+
+
+# 전역 인스턴스
+cache_epochs = CacheEpochs()
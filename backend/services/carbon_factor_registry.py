@@ -0,0 +1,190 @@
+# services/carbon_factor_registry.py
+import os
+import json
+import math
+import time
+import threading
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+import schemas
+from models import CarbonFactor
+
+# carbon_factors 테이블에 해당 교통수단 행이 없을 때 사용하는 기본값 (gCO2/km)
+DEFAULT_CARBON_FACTORS = {
+    schemas.TransportMode.WALK.value: 0,
+    schemas.TransportMode.BIKE.value: 0,
+    schemas.TransportMode.TTAREUNGI.value: 0,
+    schemas.TransportMode.BUS.value: 100,
+    schemas.TransportMode.SUBWAY.value: 50,
+    schemas.TransportMode.CAR.value: 170,
+}
+CARBON_EMISSION_FACTORS_G_PER_KM = json.loads(
+    os.getenv("CARBON_EMISSION_FACTORS_JSON", json.dumps(DEFAULT_CARBON_FACTORS))
+)
+CREDIT_PER_G_CO2 = float(os.getenv("CREDIT_PER_G_CO2", 0.1))
+CARBON_FACTOR_RELOAD_SECONDS = float(os.getenv("CARBON_FACTOR_RELOAD_SECONDS", 60))
+
+
+def points_for(co2_saved_g: float) -> int:
+    """Credits earned for `co2_saved_g` grams of CO2 saved (CREDIT_PER_G_CO2, rounded down)."""
+    return int(math.floor(co2_saved_g * CREDIT_PER_G_CO2))
+
+# CO2 절감량이 인정되는 교통수단
+ECO_MODES = {
+    schemas.TransportMode.WALK.value,
+    schemas.TransportMode.BIKE.value,
+    schemas.TransportMode.BUS.value,
+    schemas.TransportMode.SUBWAY.value,
+    schemas.TransportMode.TTAREUNGI.value,
+}
+
+
+Interval = Tuple[datetime, datetime, float]   # (valid_from, valid_to, g_per_km)
+
+
+def _mode_key(mode) -> str:
+    return getattr(mode, "value", mode)
+
+
+class CarbonFactorRegistry:
+    """
+    In-memory index of `carbon_factors` rows.
+
+    Rows are grouped per mode and sorted by `valid_from`, so resolving the factor
+    valid at a given time is a bisect (O(log n)) instead of a query. Modes without
+    any rows fall back to CARBON_EMISSION_FACTORS_JSON. The index reloads when a
+    CarbonFactor row is committed through the ORM, and otherwise re-checks a cheap
+    table fingerprint at most every CARBON_FACTOR_RELOAD_SECONDS.
+
+    A load builds a new immutable (starts, intervals) pair and publishes it
+    with a single assignment, so readers never need the lock and never see
+    the starts of one load with the intervals of another.
+    """
+
+    def __init__(self, defaults: Dict[str, float], reload_interval: float = CARBON_FACTOR_RELOAD_SECONDS):
+        self.defaults = {k: float(v) for k, v in defaults.items()}
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._index: Tuple[Dict[str, Tuple[datetime, ...]], Dict[str, Tuple[Interval, ...]]] = ({}, {})
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._installed = False
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # 로딩 / 갱신
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _table_fingerprint(db: Session):
+        return tuple(db.query(
+            func.count(CarbonFactor.factor_id),
+            func.max(CarbonFactor.factor_id),
+            func.sum(CarbonFactor.g_per_km),
+            func.max(CarbonFactor.valid_from),
+            func.max(CarbonFactor.valid_to),
+        ).one())
+
+    def load(self, db: Session):
+        """Load every CarbonFactor row into the per-mode interval index."""
+        fingerprint = self._table_fingerprint(db)
+        rows = db.query(
+            CarbonFactor.mode, CarbonFactor.valid_from, CarbonFactor.valid_to, CarbonFactor.g_per_km
+        ).order_by(CarbonFactor.mode, CarbonFactor.valid_from).all()
+
+        grouped: Dict[str, List[Interval]] = {}
+        for mode, valid_from, valid_to, g_per_km in rows:
+            grouped.setdefault(_mode_key(mode), []).append(
+                (valid_from, valid_to or datetime.max, float(g_per_km))
+            )
+        intervals = {mode: tuple(items) for mode, items in grouped.items()}
+        starts = {mode: tuple(i[0] for i in items) for mode, items in intervals.items()}
+
+        with self._lock:
+            self._index = (starts, intervals)
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            self._stale = False
+            self.version += 1
+
+    def ensure_fresh(self, db: Session):
+        """Reload if the table changed; the fingerprint query runs at most once per interval."""
+        if self._stale:
+            self.load(db)
+            return
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return
+        fingerprint = self._table_fingerprint(db)
+        if fingerprint != self._fingerprint:
+            self.load(db)
+        else:
+            self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        self._stale = True
+
+    def install(self, session_factory):
+        """Mark the index stale whenever a session commits a CarbonFactor change."""
+        if self._installed:
+            return
+        self._installed = True
+
+        def _track(session, flush_context):
+            if any(isinstance(obj, CarbonFactor) for obj in (*session.new, *session.dirty, *session.deleted)):
+                session.info["carbon_factors_changed"] = True
+
+        def _reload(session):
+            if session.info.pop("carbon_factors_changed", False):
+                self.invalidate()
+
+        event.listen(session_factory, "after_flush", _track)
+        event.listen(session_factory, "after_commit", _reload)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _lookup(self, index, key: str, at: datetime) -> float:
+        starts, intervals = index
+        mode_starts = starts.get(key)
+        if mode_starts:
+            position = bisect_right(mode_starts, at) - 1
+            if position >= 0:
+                valid_from, valid_to, g_per_km = intervals[key][position]
+                if at <= valid_to:
+                    return g_per_km
+        return self.defaults.get(key, 0.0)
+
+    def factor(self, mode, at: Optional[datetime] = None) -> float:
+        """gCO2/km for `mode` valid at `at` (defaults to now)."""
+        return self._lookup(self._index, _mode_key(mode), at or datetime.utcnow())
+
+    def emissions(self, mode, distance_km: float, at: Optional[datetime] = None) -> Tuple[float, float, float]:
+        """Return (baseline_g, actual_g, saved_g) for a trip against the car baseline."""
+        index, at = self._index, at or datetime.utcnow()   # 두 계수를 같은 적재본에서 읽습니다
+        distance_km = float(distance_km or 0)
+        baseline_g = self._lookup(index, schemas.TransportMode.CAR.value, at) * distance_km
+        actual_g = self._lookup(index, _mode_key(mode), at) * distance_km
+        saved_g = max(baseline_g - actual_g, 0.0) if _mode_key(mode) in ECO_MODES else 0.0
+        return baseline_g, actual_g, saved_g
+
+    def intervals(self, mode) -> List[Interval]:
+        """(valid_from, valid_to, g_per_km) rows for `mode`, sorted by valid_from."""
+        return list(self._index[1].get(_mode_key(mode), ()))
+
+    def default_factor(self, mode) -> float:
+        return self.defaults.get(_mode_key(mode), 0.0)
+
+    def current_factors(self, at: Optional[datetime] = None) -> Dict[str, float]:
+        """Factor for every known mode at `at`."""
+        index, at = self._index, at or datetime.utcnow()
+        modes = set(self.defaults) | set(index[0])
+        return {mode: self._lookup(index, mode, at) for mode in sorted(modes)}
+
+
+# 전역 인스턴스
+carbon_factor_registry = CarbonFactorRegistry(CARBON_EMISSION_FACTORS_G_PER_KM)
@@ -0,0 +1,178 @@
+# services/challenge_lifecycle.py
+"""
+챌린지 상태 전이 (UPCOMING -> ACTIVE -> COMPLETED) 를 경계 시각에 맞춰 예약합니다.
+
+- 그룹 챌린지: 기존 규칙 그대로 날짜 단위 (서버 로컬 시간).
+  시작일 00:00 에 ACTIVE, 종료일 다음 날 00:00 에 COMPLETED.
+- 개인 챌린지: start_at / end_at (UTC) 시각 그대로.
+
+전이는 스케줄러의 타이머 힙으로 실행되고, 각 전이는 현재 상태를 조건으로 건
+UPDATE 이므로 여러 번 실행되어도 안전합니다. 타이머는 리더 워커에서만 실행되므로
+다른 워커에서 커밋된 챌린지는 CHALLENGE_SCHEDULE 태그를 올려 리더가 예약을
+다시 채우게 합니다.
+"""
+import os
+from datetime import datetime, time as dt_time, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from models import Challenge, ChallengeStatus, GroupChallenge
+from services.data_version import CHALLENGES, bump_scope
+from services.group_challenge_service import group_challenge_cache
+from services.cache_epochs import bump_epochs, cache_epochs
+from services.response_cache import response_cache, CHALLENGE_SCHEDULE, GROUP_CHALLENGES
+from services.scheduler import Scheduler, scheduler
+
+CHALLENGE_SCHEDULE_HORIZON_SECONDS = float(os.getenv("CHALLENGE_SCHEDULE_HORIZON_SECONDS", 3600))
+REFILL_JOB = "challenge_schedule"
+
+GROUP = "group"
+PERSONAL = "personal"
+MODELS = {GROUP: (GroupChallenge, GroupChallenge.challenge_id), PERSONAL: (Challenge, Challenge.challenge_id)}
+OPEN_STATUSES = (ChallengeStatus.UPCOMING, ChallengeStatus.ACTIVE)
+NEXT_STATUS = {ChallengeStatus.UPCOMING: ChallengeStatus.ACTIVE, ChallengeStatus.ACTIVE: ChallengeStatus.COMPLETED}
+
+Transition = Tuple[datetime, str, int, ChallengeStatus, ChallengeStatus]
+
+
+def _local_midnight_utc(day) -> datetime:
+    """Local 00:00 of `day` as naive UTC."""
+    local = datetime.combine(day, dt_time.min)
+    return datetime.utcfromtimestamp(local.timestamp())
+
+
+def group_boundaries(start_date: datetime, end_date: datetime) -> Tuple[datetime, datetime]:
+    return _local_midnight_utc(start_date.date()), _local_midnight_utc(end_date.date() + timedelta(days=1))
+
+
+def next_transition(kind: str, challenge_id: int, status, start, end) -> Optional[Transition]:
+    """The single next transition for a challenge in an open status (may already be due)."""
+    status = ChallengeStatus(status) if status is not None else None
+    if status not in NEXT_STATUS or start is None or end is None:
+        return None
+    activate_at, complete_at = group_boundaries(start, end) if kind == GROUP else (start, end)
+    due = activate_at if status == ChallengeStatus.UPCOMING else complete_at
+    return due, kind, challenge_id, status, NEXT_STATUS[status]
+
+
+class ChallengeLifecycle:
+    def __init__(self, scheduler: Scheduler):
+        self.scheduler = scheduler
+        self._installed = False
+
+    @staticmethod
+    def apply(db: Session, kind: str, challenge_id: int, from_status: ChallengeStatus, to_status: ChallengeStatus) -> bool:
+        """Guarded transition; a no-op if the challenge already moved on (or was cancelled)."""
+        model, pk = MODELS[kind]
+        changed = db.execute(
+            update(model)
+            .where(pk == challenge_id, model.status == from_status)
+            .values(status=to_status)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if changed and kind == PERSONAL:
+            bump_scope(db, CHALLENGES)   # 챌린지 목록 ETag
+        if changed and kind == GROUP:
+            response_cache.invalidate_on_commit(db, GROUP_CHALLENGES)   # 다른 워커의 목록 캐시
+        db.commit()
+        if changed and kind == GROUP:
+            group_challenge_cache.invalidate(challenge_id=challenge_id)
+        return bool(changed)
+
+    def schedule(self, transition: Transition):
+        due, kind, challenge_id, from_status, to_status = transition
+
+        def run(db: Session):
+            moved = self.apply(db, kind, challenge_id, from_status, to_status)
+            if moved:
+                # 다음 전이(ACTIVE -> COMPLETED)가 예약 범위 안이면 이어서 예약합니다.
+                row = db.query(*self._columns(kind)).filter(MODELS[kind][1] == challenge_id).first()
+                following = next_transition(kind, *row) if row else None
+                if following and following[0] <= datetime.utcnow() + timedelta(seconds=CHALLENGE_SCHEDULE_HORIZON_SECONDS):
+                    self.schedule(following)
+            return {"challenge": f"{kind}:{challenge_id}", "to": to_status.value, "moved": moved}
+
+        self.scheduler.at(due, (kind, challenge_id), "challenge_transition", run)
+
+    @staticmethod
+    def _columns(kind: str):
+        if kind == GROUP:
+            return GroupChallenge.challenge_id, GroupChallenge.status, GroupChallenge.start_date, GroupChallenge.end_date
+        return Challenge.challenge_id, Challenge.status, Challenge.start_at, Challenge.end_at
+
+    def pending(self, db: Session, until: datetime) -> List[Transition]:
+        """Next transition of every open challenge due before `until` (overdue ones included)."""
+        transitions = []
+        # 그룹 챌린지 경계는 날짜 단위라 하루 여유를 두고 읽은 뒤 정확한 시각으로 거릅니다.
+        margin = until + timedelta(days=1)
+        for kind, model, start_col, end_col in (
+            (GROUP, GroupChallenge, GroupChallenge.start_date, GroupChallenge.end_date),
+            (PERSONAL, Challenge, Challenge.start_at, Challenge.end_at),
+        ):
+            rows = db.query(*self._columns(kind)).filter(
+                model.status.in_(OPEN_STATUSES),
+                ((model.status == ChallengeStatus.UPCOMING) & (start_col <= margin))
+                | ((model.status == ChallengeStatus.ACTIVE) & (end_col <= margin)),
+            )
+            for row in rows:
+                transition = next_transition(kind, *row)
+                if transition and transition[0] <= until:
+                    transitions.append(transition)
+        return transitions
+
+    def refill(self, db: Session, horizon_seconds: float = CHALLENGE_SCHEDULE_HORIZON_SECONDS) -> dict:
+        """Put every transition due within the horizon on the timer heap (overdue ones fire immediately)."""
+        transitions = self.pending(db, datetime.utcnow() + timedelta(seconds=horizon_seconds))
+        for transition in transitions:
+            self.schedule(transition)
+        return {"scheduled": len(transitions)}
+
+    def install(self, session_factory):
+        """
+        Schedule the next transition of challenges created or rescheduled
+        through the ORM, after commit. Timers only fire in the leader, so a
+        transition within the horizon also bumps CHALLENGE_SCHEDULE and the
+        leader (whichever worker it is) refills its heap on the next poll.
+        """
+        if self._installed:
+            return
+        self._installed = True
+        cache_epochs.subscribe(lambda: self.scheduler.run_soon(REFILL_JOB), tags=(CHALLENGE_SCHEDULE,))
+
+        def _track(session, flush_context):
+            touched = session.info.setdefault("challenge_schedule", [])
+            horizon = datetime.utcnow() + timedelta(seconds=CHALLENGE_SCHEDULE_HORIZON_SECONDS)
+            due_soon = False
+            for obj in (*session.new, *session.dirty):
+                if isinstance(obj, GroupChallenge):
+                    args = (GROUP, obj.challenge_id, obj.status, obj.start_date, obj.end_date)
+                elif isinstance(obj, Challenge):
+                    args = (PERSONAL, obj.challenge_id, obj.status, obj.start_at, obj.end_at)
+                else:
+                    continue
+                touched.append(args)
+                transition = next_transition(*args)
+                due_soon = due_soon or bool(transition and transition[0] <= horizon)
+            if due_soon:
+                # 같은 트랜잭션에서 올려 커밋과 함께 리더에게 보입니다 (리더가 예약을 다시 채움)
+                bump_epochs(session.connection(), [CHALLENGE_SCHEDULE])
+
+        def _schedule(session):
+            horizon = datetime.utcnow() + timedelta(seconds=CHALLENGE_SCHEDULE_HORIZON_SECONDS)
+            for args in session.info.pop("challenge_schedule", []):
+                transition = next_transition(*args)
+                if transition and transition[0] <= horizon:
+                    self.schedule(transition)
+
+        def _discard(session, previous_transaction=None):
+            session.info.pop("challenge_schedule", None)
+
+        event.listen(session_factory, "after_flush", _track)
+        event.listen(session_factory, "after_commit", _schedule)
+        event.listen(session_factory, "after_soft_rollback", _discard)
+
+
+# 전역 인스턴스
+challenge_lifecycle = ChallengeLifecycle(scheduler)
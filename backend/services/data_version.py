@@ -0,0 +1,100 @@
+# services/data_version.py
+"""
+HTTP 조건부 요청(ETag / 304)용 데이터 버전.
+
+- users.data_version: 사용자 범위 테이블(이동 기록, 크레딧, 챌린지 참여, 업적, 활동 달력,
+  정원, 인벤토리, 배치 오브젝트)에 ORM 쓰기가 있으면 같은 flush 안에서 1 증가합니다.
+  get_current_user 가 이미 읽은 User 행에 들어 있으므로 ETag 비교에 추가 쿼리가 없습니다.
+- data_versions(scope, version): 여러 사용자가 함께 보는 데이터의 버전 (챌린지 목록).
+
+ORM 을 거치지 않는 쓰기(탄소 계수 재계산, 이벤트 핸들러의 업적 카운터 / 비트셋 / 활동 달력 upsert,
+백필 등)는 같은 트랜잭션 안에서 bump_users / bump_scope 를 직접 호출합니다.
+"""
+from datetime import datetime
+from typing import Iterable, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import (
+    Challenge, ChallengeMember, CreditsLedger, DataVersion, GardenWateringLog, MobilityLog, PlacedObject,
+    User, UserAchievement, UserActivityYear, UserGarden, UserInventory,
+)
+
+CHALLENGES = "challenges"
+SHARED_SCOPES = (CHALLENGES,)
+
+USER_SCOPED_MODELS = (
+    MobilityLog, CreditsLedger, ChallengeMember, UserAchievement, UserActivityYear,
+    UserGarden, GardenWateringLog, UserInventory, PlacedObject,
+)
+SCOPED_MODELS = {Challenge: CHALLENGES}
+
+
+def bump_users(bind, user_ids: Iterable[int]):
+    """Increment data_version for `user_ids`; `bind` is a Session or Connection."""
+    ids = sorted({int(u) for u in user_ids if u is not None})
+    if not ids:
+        return
+    table = User.__table__
+    bind.execute(
+        table.update().where(table.c.user_id.in_(ids)).values(data_version=table.c.data_version + 1)
+    )
+
+
+def bump_scope(bind, scope: str):
+    table = DataVersion.__table__
+    bind.execute(
+        table.update().where(table.c.scope == scope).values(version=table.c.version + 1, updated_at=datetime.utcnow())
+    )
+
+
+class DataVersions:
+    def __init__(self):
+        self._installed = False
+
+    @staticmethod
+    def ensure_scopes(db: Session):
+        """Create the shared scope rows once so that bumps are plain UPDATEs. Commits."""
+        present = {row[0] for row in db.query(DataVersion.scope)}
+        for scope in SHARED_SCOPES:
+            if scope not in present:
+                db.add(DataVersion(scope=scope, version=0))
+        db.commit()
+
+    @staticmethod
+    def versions(db: Session, scopes: Sequence[str]) -> Tuple[int, ...]:
+        found = dict(db.query(DataVersion.scope, DataVersion.version).filter(DataVersion.scope.in_(list(scopes))))
+        return tuple(found.get(scope, 0) for scope in scopes)
+
+    def install(self, session_factory):
+        """Bump the owners' versions (and shared scopes) in the same flush as the write."""
+        if self._installed:
+            return
+        self._installed = True
+
+        def _bump(session, flush_context):
+            user_ids, scopes = set(), set()
+            changed = [*session.new, *session.deleted, *(o for o in session.dirty if session.is_modified(o))]
+            for obj in changed:
+                if isinstance(obj, USER_SCOPED_MODELS):
+                    user_ids.add(obj.user_id)
+                elif type(obj) in SCOPED_MODELS:
+                    scopes.add(SCOPED_MODELS[type(obj)])
+            if not user_ids and not scopes:
+                return
+
+            connection = session.connection()
+            bump_users(connection, user_ids)
+            for scope in scopes:
+                bump_scope(connection, scope)
+            # 세션에 올라와 있는 User 객체는 다음 접근 때 새 버전을 읽도록 만료시킵니다.
+            for obj in session.identity_map.values():
+                if isinstance(obj, User) and obj.user_id in user_ids:
+                    session.expire(obj, ["data_version"])
+
+        event.listen(session_factory, "after_flush", _bump)
+
+
+# 전역 인스턴스
+data_versions = DataVersions()
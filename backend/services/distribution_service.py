@@ -0,0 +1,314 @@
+# services/distribution_service.py
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from models import User, MobilityLog, CreditsLedger, CreditType
+from services.cache_epochs import cache_epochs
+from services.response_cache import LEADERBOARD, STATISTICS
+
+# 다른 워커의 쓰기가 통지된 뒤 다시 구성하기까지의 최소 간격 (그 사이에는 이 워커의 증분만 반영)
+DISTRIBUTION_REBUILD_SECONDS = float(os.getenv("DISTRIBUTION_REBUILD_SECONDS", 60))
+
+METRICS = ("co2_saved_g", "credits")
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+class LogBucketHistogram:
+    """
+    Fixed log-bucket histogram.
+
+    Exact zeros (the most common total) are counted separately as a point mass.
+    Bucket 0 holds the positive values below `min_value`; bucket i >= 1 covers
+    [min_value * growth^(i-1), min_value * growth^i). Two histograms with the same
+    configuration can be merged by adding their counts.
+    """
+
+    def __init__(self, min_value: float = 1.0, growth: float = 1.2, bucket_count: int = 128):
+        self.min_value = min_value
+        self.growth = growth
+        self.bucket_count = bucket_count
+        self._log_growth = math.log(growth)
+        self.counts: List[int] = [0] * bucket_count
+        self.zeros = 0
+        self.total = 0
+        self._cumulative: Optional[List[int]] = None
+
+    def bucket_index(self, value: float) -> int:
+        if value < self.min_value:
+            return 0
+        index = int(math.log(value / self.min_value) / self._log_growth) + 1
+        return min(index, self.bucket_count - 1)
+
+    def bucket_bounds(self, index: int) -> Tuple[float, float]:
+        if index == 0:
+            return 0.0, self.min_value
+        lower = self.min_value * self.growth ** (index - 1)
+        return lower, lower * self.growth
+
+    def _adjust(self, value: float, count: int):
+        if value <= 0:
+            self.zeros += count
+        else:
+            self.counts[self.bucket_index(value)] += count
+        self.total += count
+        self._cumulative = None
+
+    def add(self, value: float, count: int = 1):
+        self._adjust(value, count)
+
+    def remove(self, value: float, count: int = 1):
+        present = self.zeros if value <= 0 else self.counts[self.bucket_index(value)]
+        self._adjust(value, -min(count, present))
+
+    def move(self, old_value: float, new_value: float):
+        if (old_value <= 0, self.bucket_index(old_value)) != (new_value <= 0, self.bucket_index(new_value)):
+            self._adjust(old_value, -1)
+            self._adjust(new_value, 1)
+
+    def merge(self, other: "LogBucketHistogram"):
+        if (other.min_value, other.growth, other.bucket_count) != (self.min_value, self.growth, self.bucket_count):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.zeros += other.zeros
+        self.total += other.total
+        self._cumulative = None
+
+    def _cumulative_counts(self) -> List[int]:
+        # 버킷 수가 고정이므로 재계산 비용은 사용자 수와 무관한 상수입니다. 0 은 모든 버킷보다 앞에 셉니다.
+        if self._cumulative is None:
+            running, cumulative = self.zeros, []
+            for c in self.counts:
+                running += c
+                cumulative.append(running)
+            self._cumulative = cumulative
+        return self._cumulative
+
+    def _locate(self, value: float) -> Tuple[float, int, float]:
+        """(samples in lower buckets and zeros, samples in value's bucket, fraction of that bucket below value)."""
+        index = self.bucket_index(value)
+        cumulative = self._cumulative_counts()
+        below = cumulative[index - 1] if index > 0 else self.zeros
+        lower, upper = self.bucket_bounds(index)
+        fraction = 0.0 if upper <= lower else min(max((value - lower) / (upper - lower), 0.0), 1.0)
+        return below, self.counts[index], fraction
+
+    def count_below(self, value: float) -> float:
+        """Estimated number of samples strictly below `value` (linear within a bucket)."""
+        if self.total == 0 or value <= 0:
+            return 0.0
+        below, in_bucket, fraction = self._locate(value)
+        return below + in_bucket * fraction
+
+    def member_position(self, value: float) -> Tuple[float, float]:
+        """
+        Estimated (below, above) counts of the *other* samples for a sample
+        that is itself in the histogram at `value`. Ties at zero count as neither.
+        """
+        if self.total == 0:
+            return 0.0, 0.0
+        if value <= 0:
+            return 0.0, float(self.total - self.zeros)
+        below, in_bucket, fraction = self._locate(value)
+        others = max(in_bucket - 1, 0)
+        return below + others * fraction, self.total - below - in_bucket + others * (1 - fraction)
+
+    def percentile_of(self, value: float) -> float:
+        """Percentage of samples below `value`, 0-100."""
+        if self.total == 0:
+            return 0.0
+        return self.count_below(value) / self.total * 100
+
+    def quantile(self, q: float) -> float:
+        if self.total == 0:
+            return 0.0
+        target = min(max(q, 0.0), 1.0) * self.total
+        if target <= self.zeros:
+            return 0.0
+        cumulative = self._cumulative_counts()
+        for index, running in enumerate(cumulative):
+            if running >= target and self.counts[index] > 0:
+                lower, upper = self.bucket_bounds(index)
+                before = running - self.counts[index]
+                fraction = (target - before) / self.counts[index]
+                return lower + (upper - lower) * fraction
+        return self.bucket_bounds(self.bucket_count - 1)[1]
+
+
+class DistributionService:
+    """
+    사용자별 누적 CO2 절감량(g)과 적립 크레딧의 전국 분포를 메모리에서 유지합니다.
+    쓰기 시점에 세션 커밋 훅으로 갱신되며, rebuild()로 DB에서 언제든 재구성할 수 있습니다.
+    다른 프로세스의 쓰기(다른 워커, 재계산 CLI)는 cache_epochs 의 STATISTICS / LEADERBOARD
+    통지로 stale 표시만 하고, ensure_fresh() 가 rebuild_seconds 간격으로 다시 구성합니다.
+    """
+
+    def __init__(self, rebuild_seconds: float = DISTRIBUTION_REBUILD_SECONDS):
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._totals: Dict[int, List[float]] = {}
+        self._sums: List[float] = [0.0] * len(METRICS)   # average() 용 지표별 합계 (_totals 와 함께 갱신)
+        self._histograms = {metric: LogBucketHistogram() for metric in METRICS}
+        self._installed = False
+        self._built_at = 0.0
+        self.built = False
+        self.stale = False
+
+    def invalidate(self):
+        """Mark the sketch as behind the database; the next ensure_fresh() may rebuild it."""
+        self.stale = True
+
+    def ensure_fresh(self, db: Session):
+        """Build on first use, and rebuild when stale and the last build is older than rebuild_seconds."""
+        if not self.built or (self.stale and time.monotonic() - self._built_at >= self.rebuild_seconds):
+            self.rebuild(db)
+
+    def rebuild(self, db: Session):
+        """Rebuild the per-user totals and histograms from the database."""
+        # 조회 도중 들어온 통지는 다시 stale 로 남도록 조회 전에 내립니다.
+        self.stale = False
+        co2_subquery = db.query(
+            MobilityLog.user_id,
+            func.sum(MobilityLog.co2_saved_g).label("co2_saved_g")
+        ).group_by(MobilityLog.user_id).subquery()
+
+        credits_subquery = db.query(
+            CreditsLedger.user_id,
+            func.sum(CreditsLedger.points).label("credits")
+        ).filter(CreditsLedger.type == CreditType.EARN).group_by(CreditsLedger.user_id).subquery()
+
+        rows = (
+            db.query(User.user_id, co2_subquery.c.co2_saved_g, credits_subquery.c.credits)
+            .outerjoin(co2_subquery, User.user_id == co2_subquery.c.user_id)
+            .outerjoin(credits_subquery, User.user_id == credits_subquery.c.user_id)
+            .all()
+        )
+
+        totals = {}
+        sums = [0.0] * len(METRICS)
+        histograms = {metric: LogBucketHistogram() for metric in METRICS}
+        for user_id, co2_saved_g, credits in rows:
+            values = [float(co2_saved_g or 0), float(credits or 0)]
+            totals[user_id] = values
+            for i, (metric, value) in enumerate(zip(METRICS, values)):
+                histograms[metric].add(value)
+                sums[i] += value
+
+        with self._lock:
+            self._totals = totals
+            self._sums = sums
+            self._histograms = histograms
+            self._built_at = time.monotonic()
+            self.built = True
+
+    def record(self, user_id: int, co2_saved_g: float = 0.0, credits: float = 0.0):
+        """Apply a committed delta for one user."""
+        with self._lock:
+            values = self._totals.get(user_id)
+            if values is None:
+                values = [0.0, 0.0]
+                self._totals[user_id] = values
+                for metric in METRICS:
+                    self._histograms[metric].add(0.0)
+            for i, (metric, delta) in enumerate(zip(METRICS, (co2_saved_g, credits))):
+                if delta:
+                    old_value = values[i]
+                    values[i] = old_value + delta
+                    self._sums[i] += delta
+                    self._histograms[metric].move(old_value, values[i])
+
+    def forget(self, user_id: int):
+        with self._lock:
+            values = self._totals.pop(user_id, None)
+            if values is not None:
+                for i, (metric, value) in enumerate(zip(METRICS, values)):
+                    self._histograms[metric].remove(value)
+                    self._sums[i] -= value
+
+    def user_value(self, metric: str, user_id: int) -> float:
+        values = self._totals.get(user_id)
+        return values[METRICS.index(metric)] if values else 0.0
+
+    def total_users(self) -> int:
+        return len(self._totals)
+
+    def percentile(self, metric: str, user_id: int) -> float:
+        """Share of the other users (0-100) whose total is below this user's total."""
+        with self._lock:
+            histogram = self._histograms[metric]
+            value = self.user_value(metric, user_id)
+            if user_id not in self._totals:
+                return histogram.percentile_of(value)
+            below, _ = histogram.member_position(value)
+            others = histogram.total - 1
+            return below / others * 100 if others > 0 else 0.0
+
+    def rank(self, metric: str, user_id: int) -> int:
+        """Estimated 1-based rank (1 = highest total)."""
+        with self._lock:
+            histogram = self._histograms[metric]
+            value = self.user_value(metric, user_id)
+            if user_id in self._totals:
+                _, higher = histogram.member_position(value)
+            else:
+                higher = histogram.total - histogram.count_below(value) - (histogram.zeros if value <= 0 else 0)
+            return max(int(round(higher)), 0) + 1
+
+    def average(self, metric: str) -> float:
+        with self._lock:
+            if not self._totals:
+                return 0.0
+            return self._sums[METRICS.index(metric)] / len(self._totals)
+
+    def quantiles(self, metric: str, qs=DEFAULT_QUANTILES) -> Dict[str, float]:
+        with self._lock:
+            histogram = self._histograms[metric]
+            return {f"p{round(q * 100, 1):g}": round(histogram.quantile(q), 3) for q in qs}
+
+    def snapshot(self, metric: str) -> LogBucketHistogram:
+        """Copy of one histogram, e.g. for merging with another worker's sketch."""
+        with self._lock:
+            copy = LogBucketHistogram()
+            copy.merge(self._histograms[metric])
+            return copy
+
+    # ------------------------------------------------------------------
+    # 세션 훅: flush된 INSERT를 모아 두었다가 커밋이 확정되면 반영합니다.
+    # ------------------------------------------------------------------
+    def install(self, session_factory):
+        if self._installed:
+            return
+        self._installed = True
+        event.listen(session_factory, "after_flush", self._collect_deltas)
+        event.listen(session_factory, "after_commit", self._apply_deltas)
+        event.listen(session_factory, "after_soft_rollback", self._discard_deltas)
+        cache_epochs.subscribe(self.invalidate, tags=(LEADERBOARD, STATISTICS))
+
+    @staticmethod
+    def _collect_deltas(session: Session, flush_context):
+        deltas = session.info.setdefault("distribution_deltas", [])
+        for obj in session.new:
+            if isinstance(obj, MobilityLog) and obj.co2_saved_g:
+                deltas.append((obj.user_id, float(obj.co2_saved_g), 0.0))
+            elif isinstance(obj, CreditsLedger) and obj.type in (CreditType.EARN, CreditType.EARN.value) and obj.points:
+                deltas.append((obj.user_id, 0.0, float(obj.points)))
+            elif isinstance(obj, User):
+                deltas.append((obj.user_id, 0.0, 0.0))
+
+    def _apply_deltas(self, session: Session):
+        for user_id, co2_saved_g, credits in session.info.pop("distribution_deltas", []):
+            self.record(user_id, co2_saved_g=co2_saved_g, credits=credits)
+
+    @staticmethod
+    def _discard_deltas(session: Session, previous_transaction):
+        session.info.pop("distribution_deltas", None)
+
+
+# 전역 인스턴스
+distribution_service = DistributionService()
@@ -0,0 +1,285 @@
+# services/event_bus.py
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, delete, event, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from models import CreditsLedger, CreditType, OutboxEvent, OutboxHandled, OutboxStatus
+
+logger = logging.getLogger(__name__)
+
+# 도메인 이벤트 종류
+TRIP_RECORDED = "TripRecorded"
+CREDITS_EARNED = "CreditsEarned"    # 이동 기록 외의 적립 (챌린지 보상, 관리자 지급 등)
+
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 2))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 200))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", 2.0))
+OUTBOX_LEASE_SECONDS = 60        # PROCESSING 상태가 이보다 오래되면 다시 가져갑니다 (워커 중단 대비)
+OUTBOX_MAX_ATTEMPTS = 8          # 넘으면 FAILED 로 두고 더 이상 재시도하지 않습니다
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", 72))
+
+Handler = Callable[[Session, List[OutboxEvent]], None]
+
+
+class EventBus:
+    """
+    Domain event bus backed by the `outbox_events` table.
+
+    `publish` only adds an OutboxEvent to the caller's session, so the event is
+    committed atomically with the data that produced it. Handlers are batch
+    functions `handler(db, events)` registered per event type; the consumer
+    pool delivers each event at least once and OutboxHandled markers (written
+    in the handler's transaction) make redelivery a no-op.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Dict[str, Handler]] = defaultdict(dict)
+        self._wakeup: Optional[Callable[[], None]] = None
+        self._installed = False
+
+    def subscribe(self, event_type: str, name: Optional[str] = None):
+        """Decorator registering a batch handler; `name` is the idempotency key (defaults to the function name)."""
+        def decorator(func: Handler) -> Handler:
+            self.handlers[event_type][name or func.__name__] = func
+            return func
+        return decorator
+
+    def publish(self, db: Session, event_type: str, payload: dict, user_id: Optional[int] = None, aggregate_id: Optional[int] = None) -> OutboxEvent:
+        outbox_event = OutboxEvent(
+            event_type=event_type,
+            user_id=user_id,
+            aggregate_id=aggregate_id,
+            payload=payload,
+            status=OutboxStatus.PENDING,
+            attempts=0,
+            available_at=datetime.utcnow(),
+            created_at=datetime.utcnow(),
+        )
+        db.add(outbox_event)
+        db.info["outbox_published"] = True
+        return outbox_event
+
+    def install(self, session_factory):
+        """
+        Wake the consumer pool right after a commit that published events, and
+        turn new non-mobility EARN ledger rows into CreditsEarned events in the
+        same flush (mobility earnings already travel in TripRecorded).
+        """
+        if self._installed:
+            return
+        self._installed = True
+
+        def _ledger_events(session, flush_context, instances):
+            for obj in list(session.new):
+                if isinstance(obj, CreditsLedger) and obj.type == CreditType.EARN and obj.ref_log_id is None:
+                    self.publish(session, CREDITS_EARNED, {"points": int(obj.points or 0), "reason": obj.reason}, user_id=obj.user_id)
+
+        def _notify(session):
+            if session.info.pop("outbox_published", False) and self._wakeup:
+                self._wakeup()
+
+        def _discard(session, previous_transaction=None):
+            session.info.pop("outbox_published", None)
+
+        event.listen(session_factory, "before_flush", _ledger_events)
+        event.listen(session_factory, "after_commit", _notify)
+        event.listen(session_factory, "after_soft_rollback", _discard)
+
+    # ------------------------------------------------------------------
+    # 소비 (동기; 워커 스레드에서 실행)
+    # ------------------------------------------------------------------
+    def claim(self, db: Session, worker_id: str, limit: int = OUTBOX_BATCH_SIZE) -> List[OutboxEvent]:
+        """
+        Lease up to `limit` due events. Events of a user whose events are
+        currently leased by another worker (this process or another one) are
+        skipped, so each user's events are handled by one worker at a time and
+        handlers never race on the same user's rows. The check and the lease
+        are one UPDATE, which SQLite runs under its single write lock.
+        """
+        now = datetime.utcnow()
+        lease_expired = now - timedelta(seconds=OUTBOX_LEASE_SECONDS)
+        leased = aliased(OutboxEvent)
+        user_leased_elsewhere = (
+            select(leased.event_id)
+            .where(
+                leased.user_id == OutboxEvent.user_id,
+                leased.status == OutboxStatus.PROCESSING,
+                leased.claimed_at >= lease_expired,
+                leased.claimed_by != worker_id,
+            )
+            .exists()
+        )
+        candidates = (
+            select(OutboxEvent.event_id)
+            .where(or_(
+                and_(OutboxEvent.status == OutboxStatus.PENDING, OutboxEvent.available_at <= now),
+                and_(OutboxEvent.status == OutboxStatus.PROCESSING, OutboxEvent.claimed_at < lease_expired),
+            ))
+            .where(~user_leased_elsewhere)
+            .order_by(OutboxEvent.event_id)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.event_id.in_(candidates))
+            .values(status=OutboxStatus.PROCESSING, claimed_by=worker_id, claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return db.query(OutboxEvent).filter(
+            OutboxEvent.claimed_by == worker_id,
+            OutboxEvent.status == OutboxStatus.PROCESSING,
+        ).order_by(OutboxEvent.event_id).all()
+
+    def _run_handler(self, db: Session, name: str, handler: Handler, events: List[OutboxEvent], failed: Dict[int, str]):
+        """
+        Apply `handler` to `events` in one transaction with their OutboxHandled
+        markers. If the batch fails, retry the events one by one so only the
+        events that fail on their own are scheduled for a retry.
+        """
+        try:
+            handler(db, events)
+            db.add_all([OutboxHandled(event_id=e.event_id, handler=name, handled_at=datetime.utcnow()) for e in events])
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            if len(events) > 1:
+                for e in events:
+                    self._run_handler(db, name, handler, [e], failed)
+                return
+            logger.exception("outbox handler failed", extra={"handler": name, "event_id": events[0].event_id})
+            failed[events[0].event_id] = f"{name}: {exc}"[:500]
+
+    def dispatch(self, db: Session, events: List[OutboxEvent]) -> Dict[str, int]:
+        """Run every handler over its events; mark DONE, or schedule a retry with backoff for the events that failed."""
+        stats = {"done": 0, "retried": 0, "failed": 0}
+        by_type: Dict[str, List[OutboxEvent]] = defaultdict(list)
+        for e in events:
+            by_type[e.event_type].append(e)
+
+        failed: Dict[int, str] = {}
+        for event_type, typed_events in by_type.items():
+            ids = [e.event_id for e in typed_events]
+            for name, handler in self.handlers.get(event_type, {}).items():
+                handled = {
+                    row[0] for row in db.query(OutboxHandled.event_id).filter(
+                        OutboxHandled.handler == name, OutboxHandled.event_id.in_(ids)
+                    )
+                }
+                pending = [e for e in typed_events if e.event_id not in handled and e.event_id not in failed]
+                if pending:
+                    self._run_handler(db, name, handler, pending, failed)
+
+        now = datetime.utcnow()
+        for e in events:
+            if e.event_id in failed:
+                e.attempts = (e.attempts or 0) + 1
+                e.last_error = failed[e.event_id]
+                e.claimed_by = None
+                if e.attempts >= OUTBOX_MAX_ATTEMPTS:
+                    e.status = OutboxStatus.FAILED
+                    stats["failed"] += 1
+                else:
+                    e.status = OutboxStatus.PENDING
+                    e.available_at = now + timedelta(seconds=2 ** e.attempts)
+                    stats["retried"] += 1
+            else:
+                e.status = OutboxStatus.DONE
+                e.processed_at = now
+                stats["done"] += 1
+        db.commit()
+        return stats
+
+    def purge(self, db: Session, retention_hours: float = OUTBOX_RETENTION_HOURS) -> dict:
+        """Delete DONE events (and their handler markers) processed more than `retention_hours` ago."""
+        cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+        done = select(OutboxEvent.event_id).where(
+            OutboxEvent.status == OutboxStatus.DONE, OutboxEvent.processed_at < cutoff
+        ).scalar_subquery()
+        markers = db.execute(delete(OutboxHandled).where(OutboxHandled.event_id.in_(done))).rowcount
+        events = db.execute(delete(OutboxEvent).where(
+            OutboxEvent.status == OutboxStatus.DONE, OutboxEvent.processed_at < cutoff
+        )).rowcount
+        db.commit()
+        return {"events": events, "markers": markers}
+
+    def drain_once(self, session_factory, worker_id: str, limit: int = OUTBOX_BATCH_SIZE) -> int:
+        """Claim and process one batch; returns the number of events claimed."""
+        db = session_factory()
+        try:
+            events = self.claim(db, worker_id, limit)
+            if events:
+                self.dispatch(db, events)
+            return len(events)
+        finally:
+            db.close()
+
+
+class OutboxConsumer:
+    """asyncio worker pool draining the outbox; DB work runs in threads so the event loop stays free."""
+
+    def __init__(self, bus: EventBus, workers: int = OUTBOX_WORKERS, batch_size: int = OUTBOX_BATCH_SIZE,
+                 poll_seconds: float = OUTBOX_POLL_SECONDS):
+        self.bus = bus
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.processed = 0
+        self.last_batch_ms = 0.0
+
+    def notify(self):
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _worker(self, session_factory, index: int):
+        worker_id = f"{os.getpid()}-{index}-{uuid.uuid4().hex[:8]}"
+        while True:
+            try:
+                started = time.perf_counter()
+                claimed = await asyncio.to_thread(self.bus.drain_once, session_factory, worker_id, self.batch_size)
+                if claimed:
+                    self.processed += claimed
+                    self.last_batch_ms = (time.perf_counter() - started) * 1000
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("outbox worker error", extra={"worker_id": worker_id})
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, session_factory):
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.bus._wakeup = self.notify
+        self._tasks = [asyncio.create_task(self._worker(session_factory, i)) for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.bus._wakeup = None
+
+
+# 전역 인스턴스
+event_bus = EventBus()
+outbox_consumer = OutboxConsumer(event_bus)
@@ -1,11 +1,115 @@
 # services/group_challenge_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, text
+from sqlalchemy import and_, bindparam, event, func, text
 from decimal import Decimal
 from models import GroupChallenge, GroupChallengeMember, GroupMember, GroupRole, ChallengeStatus
 from schemas import GroupChallengeCreate
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, date
+from collections import OrderedDict
+from services.cache_epochs import cache_epochs
+from services.response_cache import response_cache, GROUP_CHALLENGES
+import os
+import threading
+import time
+
+GROUP_CHALLENGE_CACHE_SECONDS = float(os.getenv("GROUP_CHALLENGE_CACHE_SECONDS", 30))
+GROUP_CHALLENGE_CACHE_SIZE = 1024
+
+
+class GroupChallengeListCache:
+    """
+    Per-group cache of the challenge listing (challenge columns + summed
+    contribution). Entries are dropped after an ORM commit touching the group's
+    GroupChallenge / GroupChallengeMember rows, or by explicit invalidate() for
+    Core updates. Those commits also bump the GROUP_CHALLENGES epoch, and a bump
+    seen from another process clears the whole cache here; the TTL only bounds
+    writes that reach the tables some other way.
+    """
+
+    def __init__(self, ttl: float = GROUP_CHALLENGE_CACHE_SECONDS, max_groups: int = GROUP_CHALLENGE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_groups = max_groups
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, List[dict]]]" = OrderedDict()
+        self._group_of: Dict[int, int] = {}   # challenge_id -> group_id (캐시된 그룹만)
+        self._installed = False
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, group_id: int) -> Optional[List[dict]]:
+        with self._lock:
+            entry = self._entries.get(group_id)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(group_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, group_id: int, rows: List[dict]):
+        with self._lock:
+            self._entries[group_id] = (time.monotonic(), rows)
+            self._entries.move_to_end(group_id)
+            for row in rows:
+                self._group_of[row["challenge_id"]] = group_id
+            while len(self._entries) > self.max_groups:
+                _, (_, old_rows) = self._entries.popitem(last=False)
+                for row in old_rows:
+                    self._group_of.pop(row["challenge_id"], None)
+
+    def invalidate(self, group_id: Optional[int] = None, challenge_id: Optional[int] = None):
+        with self._lock:
+            if group_id is None and challenge_id is not None:
+                group_id = self._group_of.get(challenge_id)
+            if group_id is not None:
+                self._entries.pop(group_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._group_of.clear()
+
+    def install(self, session_factory):
+        """Invalidate groups whose challenges or contributions were committed through the ORM."""
+        if self._installed:
+            return
+        self._installed = True
+        cache_epochs.subscribe(self.clear, tags=(GROUP_CHALLENGES,))
+
+        def _track(session, flush_context):
+            touched = session.info.setdefault("group_challenge_cache", set())
+            for obj in (*session.new, *session.dirty, *session.deleted):
+                if isinstance(obj, GroupChallenge):
+                    touched.add((obj.group_id, None))
+                elif isinstance(obj, GroupChallengeMember):
+                    touched.add((None, obj.challenge_id))
+
+        def _invalidate(session):
+            for group_id, challenge_id in session.info.pop("group_challenge_cache", ()):
+                self.invalidate(group_id, challenge_id)
+
+        def _discard(session, previous_transaction=None):
+            session.info.pop("group_challenge_cache", None)
+
+        event.listen(session_factory, "after_flush", _track)
+        event.listen(session_factory, "after_commit", _invalidate)
+        event.listen(session_factory, "after_soft_rollback", _discard)
+
+
+# 전역 인스턴스
+group_challenge_cache = GroupChallengeListCache()
+
+
+def _completion_percentage(progress: float, goal_value) -> float:
+    if goal_value is not None and float(goal_value) > 0:
+        return min((float(progress) / float(goal_value)) * 100, 100.0)
+    return 0.0
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
 
 class GroupChallengeService:
     @staticmethod
@@ -82,6 +186,63 @@ class GroupChallengeService:
             GroupChallenge.group_id == group_id
         ).order_by(GroupChallenge.created_at.desc()).all()
     
+    @staticmethod
+    def list_group_challenges(
+        db: Session,
+        group_id: int,
+        user_id: int,
+        statuses: Optional[List[ChallengeStatus]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Optional[List[dict]]:
+        """
+        Every challenge of a group with progress and completion percentage,
+        newest first: one membership check plus one grouped SUM (served from
+        the per-group cache when warm). Returns None if the user is not a member.
+        """
+        member = db.query(GroupMember.member_id).filter(
+            GroupMember.group_id == group_id,
+            GroupMember.user_id == user_id,
+            GroupMember.is_active == True
+        ).first()
+        if not member:
+            return None
+
+        rows = group_challenge_cache.get(group_id)
+        if rows is None:
+            total = func.coalesce(func.sum(GroupChallengeMember.contribution), 0)
+            result = db.query(GroupChallenge, total).outerjoin(
+                GroupChallengeMember, GroupChallengeMember.challenge_id == GroupChallenge.challenge_id
+            ).filter(
+                GroupChallenge.group_id == group_id
+            ).group_by(GroupChallenge.challenge_id).order_by(
+                GroupChallenge.created_at.desc(), GroupChallenge.challenge_id.desc()
+            ).all()
+            rows = [
+                {
+                    "challenge_id": c.challenge_id,
+                    "group_id": c.group_id,
+                    "title": c.title,
+                    "description": c.description,
+                    "goal_type": c.goal_type,
+                    "goal_value": float(c.goal_value),
+                    "start_date": c.start_date,
+                    "end_date": c.end_date,
+                    "status": c.status,
+                    "created_by": c.created_by,
+                    "created_at": c.created_at,
+                    "progress": float(progress),
+                    "completion_percentage": _completion_percentage(progress, c.goal_value),
+                }
+                for c, progress in result
+            ]
+            group_challenge_cache.put(group_id, rows)
+
+        if statuses:
+            rows = [r for r in rows if r["status"] in statuses]
+        end = offset + limit if limit is not None else None
+        return rows[offset:end]
+
     @staticmethod
     def get_challenge_details(db: Session, challenge_id: int, user_id: int) -> Optional[dict]:
         """Get challenge details with progress"""
@@ -109,14 +270,10 @@ class GroupChallengeService:
             GroupChallengeMember.challenge_id == challenge_id
         ).scalar() or 0.0
         
-        completion_percentage = 0.0
-        if challenge.goal_value is not None and float(challenge.goal_value) > 0:
-            completion_percentage = min((float(total_progress) / float(challenge.goal_value)) * 100, 100.0)
-        
         return {
             "challenge": challenge,
             "progress": float(total_progress),
-            "completion_percentage": completion_percentage
+            "completion_percentage": _completion_percentage(total_progress, challenge.goal_value)
         }
     
     @staticmethod
@@ -151,6 +308,63 @@ class GroupChallengeService:
         
         db.commit()
     
+    @staticmethod
+    def apply_contributions(db: Session, co2_by_user_day: Dict[int, Dict[date, float]]):
+        """
+        Batched form of update_challenge_progress: one query for every active
+        challenge membership of the given users, then one atomic
+        `contribution = contribution + :delta` UPDATE per membership (executemany),
+        so concurrent batches for the same member add up instead of overwriting
+        each other. Each trip counts toward the challenges running on its own day.
+        Does not commit.
+        """
+        co2_by_user_day = {
+            user_id: {day: co2 for day, co2 in days.items() if co2}
+            for user_id, days in co2_by_user_day.items()
+        }
+        co2_by_user_day = {user_id: days for user_id, days in co2_by_user_day.items() if days}
+        if not co2_by_user_day:
+            return
+
+        memberships = db.query(
+            GroupChallengeMember.participant_id,
+            GroupChallengeMember.user_id,
+            GroupChallengeMember.challenge_id,
+            GroupChallenge.start_date,
+            GroupChallenge.end_date,
+        ).join(
+            GroupChallenge, GroupChallenge.challenge_id == GroupChallengeMember.challenge_id
+        ).filter(
+            GroupChallengeMember.user_id.in_(list(co2_by_user_day)),
+            GroupChallenge.status == ChallengeStatus.ACTIVE,
+        ).all()
+
+        params = []
+        touched = db.info.setdefault("group_challenge_cache", set())
+        for participant_id, user_id, challenge_id, start_date, end_date in memberships:
+            delta = sum(
+                co2 for day, co2 in co2_by_user_day[user_id].items()
+                if _as_date(start_date) <= day <= _as_date(end_date)
+            )
+            if delta:
+                params.append({"b_participant_id": participant_id, "b_delta": Decimal(str(round(delta, 2)))})
+                touched.add((None, challenge_id))
+        if not params:
+            return
+        response_cache.invalidate_on_commit(db, GROUP_CHALLENGES)
+
+        table = GroupChallengeMember.__table__
+        db.connection().execute(
+            table.update()
+            .where(table.c.participant_id == bindparam("b_participant_id"))
+            # SET 의 우변은 갱신 전 값을 보므로 progress 도 새 contribution 과 같아집니다.
+            .values(
+                contribution=func.coalesce(table.c.contribution, 0) + bindparam("b_delta"),
+                progress=func.coalesce(table.c.contribution, 0) + bindparam("b_delta"),
+            ),
+            params,
+        )
+
     @staticmethod
     def join_group_challenge(db: Session, group_id: int, challenge_id: int, user_id: int) -> Optional[GroupChallengeMember]:
         """Allow a user to join a group challenge."""
@@ -200,32 +414,3 @@ class GroupChallengeService:
                 GroupChallenge.group_id == group_id
             )
         ).all()
-
-    @staticmethod
-    def update_challenge_statuses(db: Session):
-        """Update challenge statuses based on dates"""
-        today = datetime.now().date()
-        
-        # Update upcoming to active
-        upcoming_challenges = db.query(GroupChallenge).filter(
-            and_(
-                GroupChallenge.status == ChallengeStatus.UPCOMING,
-                func.date(GroupChallenge.start_date) <= today
-            )
-        ).all()
-        
-        for challenge in upcoming_challenges:
-            challenge.status = ChallengeStatus.ACTIVE
-        
-        # Update active to completed
-        active_challenges = db.query(GroupChallenge).filter(
-            and_(
-                GroupChallenge.status == ChallengeStatus.ACTIVE,
-                func.date(GroupChallenge.end_date) < today
-            )
-        ).all()
-        
-        for challenge in active_challenges:
-            challenge.status = ChallengeStatus.COMPLETED
-        
-        db.commit()
\ No newline at end of file
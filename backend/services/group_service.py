@@ -2,8 +2,9 @@ import secrets
 from typing import Optional, List
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, func
-from models import Group, GroupMember, User, GroupRole, MobilityLog
+from models import Group, GroupMember, User, GroupRole
 from schemas import GroupCreateWithUsernames, GroupUpdate
+from services.pagination import keyset_page
 from fastapi import HTTPException, status
 
 class GroupService:
@@ -88,6 +89,86 @@ class GroupService:
         ).all()
         return groups
 
+    @staticmethod
+    def _summary_query(db: Session, user_id: int):
+        """One row per active group of the user: group columns, the denormalised totals and the user's role."""
+        return db.query(
+            Group.group_id,
+            Group.name,
+            Group.description,
+            Group.max_members,
+            Group.active_member_count.label("member_count"),
+            Group.total_co2_saved_g,
+            GroupMember.role,
+            Group.created_at,
+        ).join(GroupMember, GroupMember.group_id == Group.group_id).filter(
+            and_(
+                GroupMember.user_id == user_id,
+                GroupMember.is_active == True,
+                Group.is_active == True
+            )
+        )
+
+    @staticmethod
+    def _summary_dict(row) -> dict:
+        return {
+            "group_id": row.group_id,
+            "name": row.name,
+            "description": row.description,
+            "max_members": row.max_members,
+            "member_count": row.member_count or 0,
+            "total_co2_saved_g": float(row.total_co2_saved_g or 0),
+            "role": row.role,
+            "created_at": row.created_at,
+        }
+
+    @staticmethod
+    def get_user_group_summaries(db: Session, user_id: int) -> List[dict]:
+        """Summaries of all groups a user is a member of, from a single query (no member rows loaded)."""
+        rows = GroupService._summary_query(db, user_id).order_by(Group.group_id).all()
+        return [GroupService._summary_dict(row) for row in rows]
+
+    @staticmethod
+    def get_group_summary(db: Session, group_id: int, user_id: int) -> Optional[dict]:
+        """Summary of one group, or None if it does not exist or the user is not an active member."""
+        row = GroupService._summary_query(db, user_id).filter(Group.group_id == group_id).first()
+        return GroupService._summary_dict(row) if row else None
+
+    @staticmethod
+    def is_active_member(db: Session, group_id: int, user_id: int) -> bool:
+        return db.query(GroupMember.member_id).filter(
+            GroupMember.group_id == group_id,
+            GroupMember.user_id == user_id,
+            GroupMember.is_active == True
+        ).first() is not None
+
+    @staticmethod
+    def get_group_member_page(db: Session, group_id: int, cursor: Optional[str] = None, limit: int = 50) -> dict:
+        """
+        Keyset page of a group's active members in join order, projecting only
+        the columns the list shows. `cursor` is the previous page's next_cursor.
+        """
+        query = db.query(
+            GroupMember.member_id,
+            GroupMember.user_id,
+            User.username,
+            GroupMember.role,
+            GroupMember.joined_at,
+        ).join(User, User.user_id == GroupMember.user_id).filter(
+            GroupMember.group_id == group_id,
+            GroupMember.is_active == True
+        )
+        rows, next_cursor = keyset_page(
+            query, GroupMember.joined_at, GroupMember.member_id, cursor, limit, descending=False
+        )
+        return {
+            "items": [
+                {"user_id": r.user_id, "username": r.username, "role": r.role, "joined_at": r.joined_at}
+                for r in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+
     @staticmethod
     def update_group(db: Session, group_id: int, group_data: GroupUpdate, user_id: int) -> Optional[Group]:
         """Update a group's details (leader only)."""
@@ -196,26 +277,17 @@ class GroupService:
     @staticmethod
     def get_global_group_ranking(db: Session, limit: int = 100) -> List[dict]:
         """Get a global ranking of groups based on total CO2 saved."""
-        # Subquery to calculate total CO2 saved per user
-        user_co2_subquery = db.query(
-            MobilityLog.user_id,
-            func.sum(MobilityLog.co2_saved_g).label("total_co2_saved")
-        ).group_by(MobilityLog.user_id).subquery()
-
-        # Query to get group ranking
+        # groups.total_co2_saved_g 는 services/group_totals.py 가 유지하는 비정규화 합계이며
+        # (is_active, total_co2_saved_g) 인덱스를 역순으로 읽습니다.
         ranking_data = (
             db.query(
                 Group.group_id,
                 Group.name.label("group_name"),
-                func.count(GroupMember.member_id).label("member_count"),
-                func.sum(user_co2_subquery.c.total_co2_saved).label("total_co2_saved")
+                Group.active_member_count.label("member_count"),
+                Group.total_co2_saved_g.label("total_co2_saved")
             )
-            .join(GroupMember, Group.group_id == GroupMember.group_id)
-            .join(GroupMember.user)
-            .outerjoin(user_co2_subquery, User.user_id == user_co2_subquery.c.user_id)
-            .filter(Group.is_active == True, GroupMember.is_active == True)
-            .group_by(Group.group_id, Group.name)
-            .order_by(func.sum(user_co2_subquery.c.total_co2_saved).desc())
+            .filter(Group.is_active == True, Group.active_member_count > 0)
+            .order_by(Group.total_co2_saved_g.desc())
             .limit(limit)
             .all()
         )
@@ -230,4 +302,4 @@ class GroupService:
                 "member_count": row.member_count,
                 "rank": i + 1
             })
-        return ranked_groups
\ No newline at end of file
+        return ranked_groups
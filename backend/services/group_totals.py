@@ -0,0 +1,187 @@
+# services/group_totals.py
+"""
+groups.active_member_count / groups.total_co2_saved_g 비정규화 집계.
+
+- 멤버 가입/탈퇴(is_active 변경, 삭제): 같은 flush 안에서 인원 수를 바꾸고 그 멤버의
+  누적 CO2 절감량(이동 기록 전체)을 그룹 합계에 더하거나 뺍니다.
+- 이동 기록: TripRecorded 핸들러가 사용자가 속한 활성 그룹 합계에 더합니다.
+- rebuild(): 전체 재계산 (최초 적용, 탄소 계수 재계산 이후, 주기적 보정).
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, event, func, inspect, update
+from sqlalchemy.orm import Session
+
+from models import Group, GroupMember, MobilityLog, OutboxEvent, OutboxHandled, OutboxStatus
+from services.event_bus import TRIP_RECORDED
+from services.response_cache import response_cache, GROUP_RANKING
+
+GROUP_TOTALS_HANDLER = "group_totals"   # TripRecorded 핸들러 이름 (services/trip_handlers.py)
+
+
+def _unapplied_trip_co2(db: Session, user_ids: Optional[Iterable[int]] = None) -> Dict[int, Decimal]:
+    """CO2 per user of trips whose TripRecorded event the group_totals handler has not applied yet."""
+    query = db.query(OutboxEvent.event_id, OutboxEvent.user_id, OutboxEvent.payload).filter(
+        OutboxEvent.event_type == TRIP_RECORDED,
+        OutboxEvent.status != OutboxStatus.DONE,
+    )
+    if user_ids is not None:
+        query = query.filter(OutboxEvent.user_id.in_(list(user_ids)))
+    unprocessed = query.all()
+    if not unprocessed:
+        return {}
+    handled = {
+        row[0] for row in db.query(OutboxHandled.event_id).filter(
+            OutboxHandled.handler == GROUP_TOTALS_HANDLER,
+            OutboxHandled.event_id.in_([e[0] for e in unprocessed]),
+        )
+    }
+    pending: Dict[int, Decimal] = defaultdict(Decimal)
+    for event_id, user_id, payload in unprocessed:
+        if event_id not in handled:
+            pending[user_id] += Decimal(str((payload or {}).get("co2_saved_g") or 0))
+    return pending
+
+
+def _user_totals(db: Session, user_ids: Iterable[int]) -> Dict[int, Decimal]:
+    """
+    Each user's CO2 saved as already reflected in group totals: every log,
+    minus trips whose TripRecorded event the group_totals handler has not
+    applied yet (the handler will add those to the user's groups later).
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    totals = {
+        user_id: Decimal(str(total or 0)) for user_id, total in db.query(
+            MobilityLog.user_id, func.sum(MobilityLog.co2_saved_g)
+        ).filter(MobilityLog.user_id.in_(user_ids)).group_by(MobilityLog.user_id)
+    }
+    for user_id, co2 in _unapplied_trip_co2(db, user_ids).items():
+        totals[user_id] = totals.get(user_id, Decimal(0)) - co2
+    return totals
+
+
+class GroupTotals:
+    def __init__(self):
+        self._installed = False
+
+    @staticmethod
+    def _apply_deltas(db: Session, deltas: Dict[int, List]):
+        """deltas: group_id -> [member count delta, co2 delta]; one executemany UPDATE."""
+        params = [
+            {"gid": group_id, "members": members, "co2": co2}
+            for group_id, (members, co2) in deltas.items() if members or co2
+        ]
+        if not params:
+            return
+        table = Group.__table__
+        db.connection().execute(
+            table.update().where(table.c.group_id == bindparam("gid")).values(
+                active_member_count=table.c.active_member_count + bindparam("members"),
+                total_co2_saved_g=table.c.total_co2_saved_g + bindparam("co2"),
+            ),
+            params,
+        )
+        response_cache.invalidate_on_commit(db, GROUP_RANKING)
+
+    def install(self, session_factory):
+        """Move a member's historical CO2 in or out of the group total whenever membership changes."""
+        if self._installed:
+            return
+        self._installed = True
+
+        def _membership_changes(session, flush_context):
+            changes = []   # (group_id, user_id, +1 / -1)
+            for obj in session.new:
+                if isinstance(obj, GroupMember) and obj.is_active is not False:
+                    changes.append((obj.group_id, obj.user_id, 1))
+            for obj in session.dirty:
+                if isinstance(obj, GroupMember):
+                    history = inspect(obj).attrs.is_active.history
+                    if history.has_changes():
+                        was_active = bool(history.deleted and history.deleted[0])
+                        if was_active != bool(obj.is_active):
+                            changes.append((obj.group_id, obj.user_id, 1 if obj.is_active else -1))
+            for obj in session.deleted:
+                if isinstance(obj, GroupMember) and obj.is_active:
+                    changes.append((obj.group_id, obj.user_id, -1))
+            if not changes:
+                return
+
+            with session.no_autoflush:
+                totals = _user_totals(session, {user_id for _, user_id, _ in changes})
+            deltas: Dict[int, List] = defaultdict(lambda: [0, Decimal(0)])
+            for group_id, user_id, sign in changes:
+                deltas[group_id][0] += sign
+                deltas[group_id][1] += sign * totals.get(user_id, Decimal(0))
+            self._apply_deltas(session, deltas)
+            # 세션에 올라와 있는 Group 객체는 다음 접근 때 새 값을 읽도록 만료시킵니다.
+            for obj in session.identity_map.values():
+                if isinstance(obj, Group) and obj.group_id in deltas:
+                    session.expire(obj, ["active_member_count", "total_co2_saved_g"])
+
+        event.listen(session_factory, "after_flush", _membership_changes)
+
+    def apply_trips(self, db: Session, co2_by_user: Dict[int, float]):
+        """Add new trips' CO2 to every active group of their users. Does not commit."""
+        co2_by_user = {u: v for u, v in co2_by_user.items() if v}
+        if not co2_by_user:
+            return
+        deltas: Dict[int, List] = defaultdict(lambda: [0, Decimal(0)])
+        for group_id, user_id in db.query(GroupMember.group_id, GroupMember.user_id).filter(
+            GroupMember.user_id.in_(list(co2_by_user)), GroupMember.is_active == True
+        ):
+            deltas[group_id][1] += Decimal(str(co2_by_user[user_id]))
+        self._apply_deltas(db, deltas)
+
+    @staticmethod
+    def rebuild(db: Session) -> dict:
+        """
+        Recompute both columns for every group from group_members and
+        mobility_logs. Trips whose TripRecorded event the group_totals handler
+        has not applied yet are left out, exactly as for membership changes,
+        because the handler adds them when it runs. Commits.
+        """
+        # 쓰기로 시작해 SQLite 쓰기 잠금을 먼저 잡습니다. 그래야 아래에서 읽은 합계와 미처리 이벤트
+        # 사이에 핸들러가 커밋하지 못합니다.
+        db.execute(update(Group).values(active_member_count=0, total_co2_saved_g=0))
+        per_user = db.query(
+            MobilityLog.user_id, func.sum(MobilityLog.co2_saved_g).label("co2")
+        ).group_by(MobilityLog.user_id).subquery()
+        rows = db.query(
+            GroupMember.group_id, GroupMember.user_id, func.coalesce(per_user.c.co2, 0)
+        ).outerjoin(per_user, per_user.c.user_id == GroupMember.user_id).filter(
+            GroupMember.is_active == True
+        ).all()
+        pending = _unapplied_trip_co2(db)
+
+        totals: Dict[int, List] = defaultdict(lambda: [0, Decimal(0)])
+        for group_id, user_id, co2 in rows:
+            totals[group_id][0] += 1
+            totals[group_id][1] += Decimal(str(co2)) - pending.get(user_id, Decimal(0))
+        if totals:
+            table = Group.__table__
+            db.connection().execute(
+                table.update().where(table.c.group_id == bindparam("gid")).values(
+                    active_member_count=bindparam("members"), total_co2_saved_g=bindparam("co2"),
+                ),
+                [{"gid": g, "members": m, "co2": c} for g, (m, c) in totals.items()],
+            )
+        response_cache.invalidate_on_commit(db, GROUP_RANKING)
+        db.commit()
+        return {"groups": len(totals)}
+
+    def ensure_built(self, db: Session):
+        """Rebuild once after the columns were introduced (groups with members but a zero count)."""
+        stale = db.query(Group.group_id).join(GroupMember, GroupMember.group_id == Group.group_id).filter(
+            Group.active_member_count == 0, GroupMember.is_active == True
+        ).first()
+        if stale:
+            self.rebuild(db)
+
+
+# 전역 인스턴스
+group_totals = GroupTotals()
@@ -1,26 +1,18 @@
-import os
-import json
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Optional
 from math import radians, sin, cos, sqrt, atan2
 from sqlalchemy import func
 
 import schemas, models, crud
-from services.group_challenge_service import GroupChallengeService
-
-# Constants from mobility.py
-DEFAULT_CARBON_FACTORS = {
-    schemas.TransportMode.WALK.value: 0,
-    schemas.TransportMode.BIKE.value: 0,
-    schemas.TransportMode.TTAREUNGI.value: 0,
-    schemas.TransportMode.BUS.value: 100,
-    schemas.TransportMode.SUBWAY.value: 50,
-    schemas.TransportMode.CAR.value: 170,
-}
-CARBON_EMISSION_FACTORS_G_PER_KM = json.loads(
-    os.getenv("CARBON_EMISSION_FACTORS_JSON", json.dumps(DEFAULT_CARBON_FACTORS))
-)
-CREDIT_PER_G_CO2 = float(os.getenv("CREDIT_PER_G_CO2", 0.1))
+from services.event_bus import event_bus, TRIP_RECORDED
+from services.carbon_factor_registry import carbon_factor_registry, points_for
+from services.transit_graph import transit_graph, NETWORK_DISTANCE_TOLERANCE
+from services.station_search import station_search
+from services.station_index import station_index
+
+DETECTION_RADIUS_KM = 0.2  # 200 meters threshold
+SUBWAY_MIN_SPEED_KMH = 25
 
 class MobilityService:
     @staticmethod
@@ -37,42 +29,25 @@ class MobilityService:
     def detect_transport_mode(db: Session, latitude: float, longitude: float, speed_kmh: float) -> schemas.TransportMode | None:
         """
         Detects the transport mode based on the user's location and speed.
+        Every station within DETECTION_RADIUS_KM is considered, not just the nearest one.
         """
-        # Find the nearest bus stop
-        nearest_bus_stop = db.query(models.BusStop).order_by(
-            func.pow(models.BusStop.latitude - latitude, 2) + func.pow(models.BusStop.longitude - longitude, 2)
-        ).first()
-
-        # Find the nearest subway station
-        nearest_subway_station = db.query(models.SubwayStation).order_by(
-            func.pow(models.SubwayStation.latitude - latitude, 2) + func.pow(models.SubwayStation.longitude - longitude, 2)
-        ).first()
-
-        # Find the nearest Ttareungi station
-        nearest_ttareungi_station = db.query(models.TtareungiStation).order_by(
-            func.pow(models.TtareungiStation.latitude - latitude, 2) + func.pow(models.TtareungiStation.longitude - longitude, 2)
-        ).first()
-
-        bus_stop_distance = float('inf')
-        if nearest_bus_stop:
-            bus_stop_distance = MobilityService.haversine(latitude, longitude, nearest_bus_stop.latitude, nearest_bus_stop.longitude)
-
-        subway_station_distance = float('inf')
-        if nearest_subway_station:
-            subway_station_distance = MobilityService.haversine(latitude, longitude, nearest_subway_station.latitude, nearest_subway_station.longitude)
-
-        ttareungi_station_distance = float('inf')
-        if nearest_ttareungi_station:
-            ttareungi_station_distance = MobilityService.haversine(latitude, longitude, nearest_ttareungi_station.latitude, nearest_ttareungi_station.longitude)
-
-        if bus_stop_distance < 0.2:  # 200 meters threshold
+        station_index.ensure_loaded(db)
+        near = {
+            station_type: len(station_index.within(station_type, latitude, longitude, DETECTION_RADIUS_KM)[0]) > 0
+            for station_type in ("bus", "subway", "ttareungi")
+        }
+
+        if near["bus"] and near["subway"]:
+            # 둘 다 가까우면 속도로 구분합니다 (지하철 표정속도가 버스보다 빠름).
+            return schemas.TransportMode.SUBWAY if speed_kmh >= SUBWAY_MIN_SPEED_KMH else schemas.TransportMode.BUS
+        if near["bus"]:
             return schemas.TransportMode.BUS
-        elif subway_station_distance < 0.2:  # 200 meters threshold
+        elif near["subway"]:
             return schemas.TransportMode.SUBWAY
         elif speed_kmh < 10:
             return schemas.TransportMode.WALK
         elif 10 <= speed_kmh <= 25:
-            if ttareungi_station_distance < 0.2: # 200 meters threshold
+            if near["ttareungi"]:
                 return schemas.TransportMode.TTAREUNGI
             else:
                 return schemas.TransportMode.BIKE
@@ -80,14 +55,42 @@ class MobilityService:
             return None
 
     @staticmethod
-    def log_mobility(db: Session, log_data: schemas.MobilityLogCreate, user: models.User) -> models.MobilityLog:
+    def resolve_point(db: Session, point: Optional[str]) -> Optional[tuple]:
+        """
+        Turns a start_point / end_point into (lat, lon): either a "lat,lon" string
+        or a free-text station name such as "강남역" or "2호선 강남".
+        """
+        if not point:
+            return None
+        try:
+            lat, lon = map(float, point.split(','))
+            return lat, lon
+        except ValueError:
+            pass
+        station_search.ensure_loaded(db)
+        match = station_search.best_match(point)
+        if match:
+            return match["latitude"], match["longitude"]
+        return None
+
+    @staticmethod
+    def log_mobility(
+        db: Session,
+        log_data: schemas.MobilityLogCreate,
+        user: models.User,
+        source_id: Optional[int] = None,
+        raw_ref_id: Optional[str] = None,
+    ) -> models.MobilityLog:
         """
         Logs mobility data, creates a credit ledger entry, and updates challenge progress.
         """
+        start_coords = MobilityService.resolve_point(db, log_data.start_point)
+        end_coords = MobilityService.resolve_point(db, log_data.end_point)
+
         # 1. Detect transport mode if not provided
         if not log_data.mode:
-            if log_data.start_point and log_data.started_at and log_data.ended_at:
-                lat, lon = map(float, log_data.start_point.split(','))
+            if start_coords and log_data.started_at and log_data.ended_at:
+                lat, lon = start_coords
                 duration_hours = (log_data.ended_at - log_data.started_at).total_seconds() / 3600
                 speed_kmh = log_data.distance_km / duration_hours if duration_hours > 0 else 0
                 log_data.mode = MobilityService.detect_transport_mode(db, lat, lon, speed_kmh)
@@ -95,33 +98,35 @@ class MobilityService:
         if not log_data.mode:
             log_data.mode = schemas.TransportMode.WALK # Fallback to WALK if no mode is detected
 
-        # 2. Calculate CO2 saved and points earned
-        if log_data.distance_km == 0:
-            co2_saved_g = 0
-            points_earned = 0
-            mode_emission = 0
-            car_emission_baseline = 0
-        else:
-            mode_emission = CARBON_EMISSION_FACTORS_G_PER_KM.get(log_data.mode.value, 0)
-            car_emission_baseline = CARBON_EMISSION_FACTORS_G_PER_KM.get(schemas.TransportMode.CAR.value, 170)
-
-            co2_saved_g = 0
-            if log_data.mode in [schemas.TransportMode.WALK, schemas.TransportMode.BIKE, schemas.TransportMode.BUS, schemas.TransportMode.SUBWAY, schemas.TransportMode.TTAREUNGI]:
-                co2_saved_g = (car_emission_baseline - mode_emission) * log_data.distance_km
-                if co2_saved_g < 0:
-                    co2_saved_g = 0
-            
-            points_earned = int(co2_saved_g * CREDIT_PER_G_CO2)
-
-        # 3. Create MobilityLog entry
+        # 2. Check subway/bus distance against the station network
+        if log_data.mode in (schemas.TransportMode.SUBWAY, schemas.TransportMode.BUS):
+            transit_graph.ensure_loaded(db)
+            network_km = transit_graph.trip_distance_km(
+                log_data.mode, start_coords or log_data.start_point, end_coords or log_data.end_point
+            )
+            if network_km is not None and (
+                log_data.distance_km <= 0 or log_data.distance_km > network_km * NETWORK_DISTANCE_TOLERANCE
+            ):
+                log_data.distance_km = round(network_km, 3)
+
+        # 3. Calculate CO2 saved and points earned (factor valid at started_at)
+        carbon_factor_registry.ensure_fresh(db)
+        car_emission_baseline, mode_emission, co2_saved_g = carbon_factor_registry.emissions(
+            log_data.mode, log_data.distance_km, log_data.started_at
+        )
+        points_earned = points_for(co2_saved_g)
+
+        # 4. Create MobilityLog entry
         db_mobility_log = models.MobilityLog(
             user_id=user.user_id,
+            source_id=source_id,
+            raw_ref_id=raw_ref_id,
             mode=log_data.mode,
             distance_km=log_data.distance_km,
             started_at=log_data.started_at,
             ended_at=log_data.ended_at,
-            co2_baseline_g=car_emission_baseline * log_data.distance_km,
-            co2_actual_g=mode_emission * log_data.distance_km,
+            co2_baseline_g=car_emission_baseline,
+            co2_actual_g=mode_emission,
             co2_saved_g=co2_saved_g,
             points_earned=points_earned,
             description=log_data.description,
@@ -132,7 +137,7 @@ class MobilityService:
         db.add(db_mobility_log)
         db.flush() # Flush to get the log_id for the credit entry reference
 
-        # 4. Create CreditsLedger entry
+        # 5. Create CreditsLedger entry
         if points_earned > 0:
             db_credit_entry = models.CreditsLedger(
                 user_id=user.user_id,
@@ -144,42 +149,22 @@ class MobilityService:
             )
             db.add(db_credit_entry)
 
-        # 5. Update challenge progress
-        if co2_saved_g > 0 or log_data.distance_km > 0:
-            # Update group challenges
-            GroupChallengeService.update_challenge_progress(db, user_id=user.user_id, co2_saved=float(co2_saved_g))
-            
-            # Update personal challenges
-            user_challenges = db.query(models.ChallengeMember).filter(
-                models.ChallengeMember.user_id == user.user_id,
-                models.ChallengeMember.is_completed == False
-            ).all()
-
-            for member_entry in user_challenges:
-                challenge = db.query(models.Challenge).filter(models.Challenge.challenge_id == member_entry.challenge_id).first()
-                
-                if not challenge or not (challenge.start_at <= datetime.utcnow() <= challenge.end_at):
-                    continue
-
-                # Check if the mobility mode matches the challenge target mode
-                if challenge.target_mode != models.TransportMode.ANY and challenge.target_mode != log_data.mode:
-                    continue
-
-                progress_to_add = 0
-                if challenge.goal_type == models.ChallengeGoalType.CO2_SAVED:
-                    progress_to_add = co2_saved_g
-                elif challenge.goal_type == models.ChallengeGoalType.DISTANCE_KM:
-                    progress_to_add = log_data.distance_km
-                elif challenge.goal_type == models.ChallengeGoalType.TRIP_COUNT:
-                    progress_to_add = 1
-
-                if progress_to_add > 0:
-                    crud.update_personal_challenge_progress(
-                        db,
-                        user_id=user.user_id,
-                        challenge_id=challenge.challenge_id,
-                        progress_increment=progress_to_add
-                    )
+        # 6. Publish TripRecorded; challenge progress and other side effects run from the outbox
+        event_bus.publish(
+            db,
+            TRIP_RECORDED,
+            {
+                "log_id": db_mobility_log.log_id,
+                "mode": log_data.mode.value,
+                "distance_km": float(log_data.distance_km),
+                "co2_saved_g": float(co2_saved_g),
+                "points_earned": points_earned,
+                "started_at": log_data.started_at.isoformat(),
+                "ended_at": log_data.ended_at.isoformat(),
+            },
+            user_id=user.user_id,
+            aggregate_id=db_mobility_log.log_id,
+        )
 
         db.commit()
         db.refresh(db_mobility_log)
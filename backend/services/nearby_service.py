@@ -0,0 +1,97 @@
+# services/nearby_service.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from services.station_index import STATION_TYPES, StationIndex, station_index
+
+# 질의 좌표를 이 간격(약 110 m)의 타일 중심으로 맞춰 같은 타일의 요청이 캐시를 공유하게 합니다.
+TILE_DEG = 0.001
+RADIUS_STEP_M = 50
+MAX_RADIUS_M = 2000
+MAX_RESULTS_PER_TYPE = 50
+TILE_CACHE_SIZE = 4096
+NEARBY_MAX_AGE_SECONDS = 300
+
+
+def quantize(lat: float, lon: float, radius_m: float) -> Tuple[int, int, int]:
+    """(tile_lat, tile_lon, radius_m) with the radius rounded up to RADIUS_STEP_M."""
+    radius_m = min(max(radius_m, RADIUS_STEP_M), MAX_RADIUS_M)
+    steps = -(-int(radius_m) // RADIUS_STEP_M)
+    return round(lat / TILE_DEG), round(lon / TILE_DEG), steps * RADIUS_STEP_M
+
+
+class NearbyStationCache:
+    """
+    Radius queries over StationIndex, cached per quantised tile.
+
+    The cache key is (index version, tile, radius, types), so a reload of the
+    station tables naturally misses; a STATIONS epoch bump from another process
+    invalidates the index and clears this cache (see main.py). The ETag is a
+    hash of the payload, so it is stable across processes and restarts as long
+    as the data is unchanged.
+    """
+
+    def __init__(self, stations: StationIndex, maxsize: int = TILE_CACHE_SIZE):
+        self.stations = stations
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, Tuple[str, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _build(self, tile_lat: int, tile_lon: int, radius_m: int, types: Tuple[str, ...]) -> dict:
+        lat, lon = tile_lat * TILE_DEG, tile_lon * TILE_DEG
+        stations: List[dict] = []
+        for station_type in types:
+            indexes, distances = self.stations.within(station_type, lat, lon, radius_m / 1000)
+            for i, km in zip(indexes[:MAX_RESULTS_PER_TYPE], distances[:MAX_RESULTS_PER_TYPE]):
+                stations.append({
+                    "type": station_type,
+                    "station_id": int(self.stations.ids[station_type][i]),
+                    "name": self.stations.names[station_type][i],
+                    "line": self.stations.lines[station_type][i],
+                    "latitude": float(self.stations.lats[station_type][i]),
+                    "longitude": float(self.stations.lons[station_type][i]),
+                    "distance_m": round(float(km) * 1000, 1),
+                })
+        stations.sort(key=lambda s: s["distance_m"])
+        return {
+            "tile_latitude": round(lat, 6),
+            "tile_longitude": round(lon, 6),
+            "radius_m": radius_m,
+            "stations": stations,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get(self, lat: float, lon: float, radius_m: float, types: Optional[Iterable[str]] = None) -> Tuple[str, dict]:
+        """(etag, payload) for the tile containing (lat, lon)."""
+        types = tuple(sorted(set(types or STATION_TYPES) & set(STATION_TYPES)))
+        tile_lat, tile_lon, radius_m = quantize(lat, lon, radius_m)
+        key = (self.stations.version, tile_lat, tile_lon, radius_m, types)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        payload = self._build(tile_lat, tile_lon, radius_m, types)
+        body = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:20]
+        with self._lock:
+            self._cache[key] = (etag, payload)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return etag, payload
+
+
+# 전역 인스턴스
+nearby_station_cache = NearbyStationCache(station_index)
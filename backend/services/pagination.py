@@ -0,0 +1,79 @@
+# services/pagination.py
+"""
+(시각, id) 키셋 페이지네이션.
+
+OFFSET 은 건너뛴 행을 모두 읽어야 해서 뒤쪽 페이지일수록 느려집니다. 여기서는 이전
+페이지 마지막 행의 (시각, id) 를 불투명 커서로 돌려주고, 다음 페이지는 복합 인덱스
+(필터 컬럼, 시각, id) 를 그 위치부터 읽으므로 깊이와 무관하게 일정한 비용이 듭니다.
+
+시각 컬럼은 NULL 이 없어야 합니다 (대상 컬럼은 모두 NOT NULL 이거나 기본값이 있음).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+Cursor = Tuple[datetime, int]
+
+# 커서로 이어 읽는 페이지의 최대 크기. 범위를 벗어난 limit 은 거절하지 않고 잘라 냅니다.
+MAX_PAGE_SIZE = 200
+
+
+def page_size(limit: int, maximum: int = MAX_PAGE_SIZE) -> int:
+    """Clamp a requested page size to 1..maximum."""
+    return min(max(limit, 1), maximum)
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    raw = json.dumps([ts.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Raises ValueError for anything encode_cursor did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+
+def _after(ts_col, id_col, cursor: Cursor, descending: bool):
+    """Rows strictly after `cursor` in (ts, id) order."""
+    ts, row_id = cursor
+    # 바깥의 ts <= :ts (>=) 가 인덱스 범위 검색 조건이 되고, 괄호 안은 같은 시각의 동점만 가릅니다.
+    if descending:
+        return and_(ts_col <= ts, or_(ts_col < ts, id_col < row_id))
+    return and_(ts_col >= ts, or_(ts_col > ts, id_col > row_id))
+
+
+def keyset_page(
+    query: Query, ts_col, id_col, cursor: Optional[str], limit: int, descending: bool = True
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of `query` ordered by (ts_col, id_col) and the cursor of the next
+    page (None on the last page). Rows must expose both columns by their key,
+    i.e. be ORM entities or rows selecting those columns.
+    """
+    if cursor:
+        query = query.filter(_after(ts_col, id_col, decode_cursor(cursor), descending))
+    order = (ts_col.desc(), id_col.desc()) if descending else (ts_col.asc(), id_col.asc())
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, ts_col.key), getattr(last, id_col.key))
+
+
+def filter_range(query: Query, col, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Query:
+    """Half-open [date_from, date_to) filter on `col`."""
+    if date_from is not None:
+        query = query.filter(col >= date_from)
+    if date_to is not None:
+        query = query.filter(col < date_to)
+    return query
@@ -0,0 +1,256 @@
+# services/recompute_service.py
+"""
+탄소 배출 계수 변경 시 기존 mobility_logs의 CO2/포인트를 일괄 재계산합니다.
+
+    python -m services.recompute_service --dry-run
+    python -m services.recompute_service --since 2025-01-01 --mode BUS --chunk-size 100000
+"""
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+from sqlalchemy import Float, and_, bindparam, select, type_coerce
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import schemas
+from models import MobilityLog, CreditsLedger, CreditType
+from services.carbon_factor_registry import (
+    CarbonFactorRegistry, carbon_factor_registry, CREDIT_PER_G_CO2, ECO_MODES
+)
+from services.cache_epochs import bump_epochs
+from services.data_version import bump_users
+from services.response_cache import GROUP_RANKING, LEADERBOARD, STATISTICS
+
+# 이 값보다 작은 차이는 Numeric 반올림 오차로 보고 무시합니다 (g 단위).
+CO2_TOLERANCE_G = 0.001
+
+_logs = MobilityLog.__table__
+_ledger = CreditsLedger.__table__
+
+
+def _to_datetime64(values: Iterable[datetime]) -> np.ndarray:
+    return np.array(values, dtype="datetime64[us]")
+
+
+class _FactorLookup:
+    """Vectorised 'factor valid at t' lookup built from the registry's interval index."""
+
+    def __init__(self, registry: CarbonFactorRegistry, mode: str):
+        intervals = registry.intervals(mode)
+        self.default = registry.default_factor(mode)
+        self.starts = _to_datetime64([i[0] for i in intervals])
+        self.ends = _to_datetime64([min(i[1], datetime(9999, 12, 31, 23, 59, 59)) for i in intervals])
+        self.factors = np.array([i[2] for i in intervals], dtype=np.float64)
+
+    def resolve(self, at: np.ndarray) -> np.ndarray:
+        if len(self.starts) == 0:
+            return np.full(at.shape, self.default, dtype=np.float64)
+        index = np.searchsorted(self.starts, at, side="right") - 1
+        safe_index = np.clip(index, 0, len(self.starts) - 1)
+        valid = (index >= 0) & (at <= self.ends[safe_index])
+        return np.where(valid, self.factors[safe_index], self.default)
+
+
+class MobilityRecomputeService:
+    @staticmethod
+    def recompute(
+        engine: Engine,
+        registry: CarbonFactorRegistry = carbon_factor_registry,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        modes: Optional[Iterable[str]] = None,
+        chunk_size: int = 50_000,
+        dry_run: bool = False,
+        progress: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict:
+        """
+        Recompute co2_baseline_g / co2_actual_g / co2_saved_g / points_earned for
+        mobility logs using the factor valid at each log's started_at.
+
+        Logs are read in log_id-ordered chunks, recomputed with NumPy, and only the
+        rows that changed are written back with executemany. Every change in
+        points_earned gets a compensating ADJUST ledger entry. With dry_run=True
+        nothing is written and the summary reports what would change.
+        """
+        with Session(engine) as db:
+            registry.ensure_fresh(db)
+
+        mode_keys = [getattr(m, "value", m) for m in modes] if modes else None
+        lookups: Dict[str, _FactorLookup] = {}
+
+        def lookup(mode: str) -> _FactorLookup:
+            if mode not in lookups:
+                lookups[mode] = _FactorLookup(registry, mode)
+            return lookups[mode]
+
+        car_lookup = lookup(schemas.TransportMode.CAR.value)
+
+        filters = []
+        if since:
+            filters.append(_logs.c.started_at >= since)
+        if until:
+            filters.append(_logs.c.started_at < until)
+        if mode_keys:
+            filters.append(_logs.c.mode.in_(mode_keys))
+
+        update_stmt = _logs.update().where(_logs.c.log_id == bindparam("b_log_id")).values(
+            co2_baseline_g=bindparam("b_baseline"),
+            co2_actual_g=bindparam("b_actual"),
+            co2_saved_g=bindparam("b_saved"),
+            points_earned=bindparam("b_points"),
+        )
+
+        summary = {
+            "dry_run": dry_run,
+            "processed": 0,
+            "changed": 0,
+            "ledger_adjustments": 0,
+            "points_delta": 0,
+            "co2_saved_delta_g": 0.0,
+        }
+        started = time.perf_counter()
+        last_log_id = 0
+
+        while True:
+            query = (
+                select(
+                    _logs.c.log_id, _logs.c.user_id, _logs.c.mode, _logs.c.started_at,
+                    type_coerce(_logs.c.distance_km, Float),
+                    type_coerce(_logs.c.co2_baseline_g, Float),
+                    type_coerce(_logs.c.co2_actual_g, Float),
+                    type_coerce(_logs.c.co2_saved_g, Float),
+                    _logs.c.points_earned,
+                )
+                .where(and_(_logs.c.log_id > last_log_id, *filters))
+                .order_by(_logs.c.log_id)
+                .limit(chunk_size)
+            )
+
+            with engine.begin() as conn:
+                rows = conn.execute(query).all()
+                if not rows:
+                    break
+
+                log_ids, user_ids, log_modes, started_at, distance, old_baseline, old_actual, old_saved, old_points = zip(*rows)
+                log_ids = np.array(log_ids, dtype=np.int64)
+                user_ids = np.array(user_ids, dtype=np.int64)
+                log_modes = np.array([getattr(m, "value", m) for m in log_modes])
+                started_at = _to_datetime64(started_at)
+                distance = np.array(distance, dtype=np.float64)
+                old_baseline = np.array(old_baseline, dtype=np.float64)
+                old_actual = np.array(old_actual, dtype=np.float64)
+                old_saved = np.array(old_saved, dtype=np.float64)
+                old_points = np.array(old_points, dtype=np.float64)
+                # NULL은 NaN으로 들어오므로 "변경됨"으로 처리되도록 둡니다.
+                old_points = np.nan_to_num(old_points, nan=0.0).astype(np.int64)
+
+                mode_factor = np.zeros(len(rows), dtype=np.float64)
+                for mode in np.unique(log_modes):
+                    mask = log_modes == mode
+                    mode_factor[mask] = lookup(mode).resolve(started_at[mask])
+
+                baseline = car_lookup.resolve(started_at) * distance
+                actual = mode_factor * distance
+                eco = np.isin(log_modes, list(ECO_MODES))
+                saved = np.where(eco, np.maximum(baseline - actual, 0.0), 0.0)
+                points = np.floor(saved * CREDIT_PER_G_CO2).astype(np.int64)   # points_for() 와 같은 규칙을 벡터로
+
+                changed = (
+                    ~np.isclose(baseline, old_baseline, rtol=0, atol=CO2_TOLERANCE_G)
+                    | ~np.isclose(actual, old_actual, rtol=0, atol=CO2_TOLERANCE_G)
+                    | ~np.isclose(saved, old_saved, rtol=0, atol=CO2_TOLERANCE_G)
+                    | (points != old_points)
+                )
+                points_delta = points - old_points
+                adjusted = changed & (points_delta != 0)
+
+                summary["processed"] += len(rows)
+                summary["changed"] += int(changed.sum())
+                summary["ledger_adjustments"] += int(adjusted.sum())
+                summary["points_delta"] += int(points_delta[changed].sum())
+                summary["co2_saved_delta_g"] += float(np.nansum(saved[changed] - np.nan_to_num(old_saved[changed])))
+
+                if not dry_run and changed.any():
+                    idx = np.flatnonzero(changed)
+                    conn.execute(update_stmt, [
+                        {
+                            "b_log_id": int(log_ids[i]),
+                            "b_baseline": round(float(baseline[i]), 3),
+                            "b_actual": round(float(actual[i]), 3),
+                            "b_saved": round(float(saved[i]), 3),
+                            "b_points": int(points[i]),
+                        }
+                        for i in idx
+                    ])
+
+                    now = datetime.utcnow()
+                    adjustments = [
+                        {
+                            "user_id": int(user_ids[i]),
+                            "ref_log_id": int(log_ids[i]),
+                            "type": CreditType.ADJUST,
+                            "points": int(points_delta[i]),
+                            "reason": "Carbon factor recompute",
+                            "meta_json": {"previous_points": int(old_points[i]), "new_points": int(points[i])},
+                            "created_at": now,
+                        }
+                        for i in np.flatnonzero(adjusted)
+                    ]
+                    if adjustments:
+                        conn.execute(_ledger.insert(), adjustments)
+                    bump_users(conn, user_ids[idx].tolist())   # ORM 을 거치지 않으므로 ETag 버전을 직접 올립니다
+                    # 다른 워커의 응답 캐시와 분포 스케치도 같은 커밋으로 무효화합니다
+                    bump_epochs(conn, [LEADERBOARD, STATISTICS, GROUP_RANKING])
+
+            last_log_id = int(log_ids[-1])
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress({
+                    **summary,
+                    "last_log_id": last_log_id,
+                    "elapsed_s": round(elapsed, 3),
+                    "rows_per_s": round(summary["processed"] / elapsed, 1) if elapsed > 0 else None,
+                })
+
+        summary["elapsed_s"] = round(time.perf_counter() - started, 3)
+        summary["co2_saved_delta_g"] = round(summary["co2_saved_delta_g"], 3)
+        return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import engine, SessionLocal
+    from services.group_totals import group_totals
+
+    parser = argparse.ArgumentParser(description="Recompute CO2 and points of mobility logs from current carbon factors.")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only logs with started_at >= SINCE")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="only logs with started_at < UNTIL")
+    parser.add_argument("--mode", action="append", help="restrict to a transport mode (repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    def print_progress(p):
+        print(f"[recompute] processed={p['processed']} changed={p['changed']} "
+              f"adjustments={p['ledger_adjustments']} rows/s={p['rows_per_s']} last_log_id={p['last_log_id']}")
+
+    result = MobilityRecomputeService.recompute(
+        engine,
+        since=args.since,
+        until=args.until,
+        modes=args.mode,
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run,
+        progress=print_progress,
+    )
+    print(f"[recompute] done: {result}")
+    if not args.dry_run and result["changed"]:
+        # Core UPDATE 는 세션 훅을 거치지 않으므로 그룹 합계를 다시 구성합니다. 서버 워커의 분포
+        # 스케치는 위 트랜잭션들이 올린 STATISTICS / LEADERBOARD epoch 를 보고 스스로 다시 만듭니다.
+        db = SessionLocal()
+        try:
+            group_totals.rebuild(db)   # 커밋
+        finally:
+            db.close()
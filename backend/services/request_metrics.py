@@ -0,0 +1,242 @@
+# services/request_metrics.py
+"""
+요청 단위 성능 계측.
+
+- RequestMetricsMiddleware (ASGI): 라우트(경로 템플릿)별 지연 히스토그램, 응답 크기, 상태
+  코드별 요청 수와 처리 중인 요청 수(메서드별)를 기록하고 응답에 Server-Timing 헤더를 붙입니다.
+- install_sql_hooks(engine): before/after_cursor_execute 로 SQL 문 수와 DB 시간을 현재 요청에
+  더합니다. 요청 상태는 ContextVar 에 있으므로 threadpool / asyncio.to_thread 로 넘어간
+  DB 작업도 같은 요청에 집계되고, 요청 밖(스케줄러, outbox 소비자)의 쿼리는 background 로
+  집계됩니다.
+- render(): Prometheus text exposition (GET /metrics).
+
+prometheus_client 없이 같은 형식을 직접 출력합니다. 라우트 레이블은 경로 템플릿
+("/groups/{group_id}") 이고 매칭되지 않은 경로는 "unmatched" 로 묶어 레이블 수를 제한합니다.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 1000))
+UNMATCHED = "unmatched"
+
+
+class _RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[Optional[_RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense (counts per upper bound, plus sum and count)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)   # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        out, running = [], 0
+        for bound, count in zip((*self.bounds, float("inf")), self.counts):
+            running += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            out.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {running}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._size: Dict[Tuple[str, str], Histogram] = {}
+        self._queries: Dict[Tuple[str, str], Histogram] = {}
+        self._db_seconds: Dict[Tuple[str, str], float] = {}
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        self._in_flight: Dict[str, int] = {}   # method -> 처리 중인 요청 수 (라우팅 전이므로 라우트 없음)
+        self.background_queries = 0
+        self.background_db_seconds = 0.0
+        self._hooked = set()
+
+    # ------------------------------------------------------------------
+    # SQL 훅
+    # ------------------------------------------------------------------
+    def install_sql_hooks(self, engine):
+        if id(engine) in self._hooked:
+            return
+        self._hooked.add(id(engine))
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info["query_started"].pop()
+            stats = _current.get()
+            if stats is not None:
+                stats.queries += 1
+                stats.db_seconds += elapsed
+            else:
+                with self._lock:
+                    self.background_queries += 1
+                    self.background_db_seconds += elapsed
+
+        def _error(context):
+            started = context.connection.info.get("query_started") if context.connection is not None else None
+            if started:
+                started.pop()
+
+        event.listen(engine, "before_cursor_execute", _before)
+        event.listen(engine, "after_cursor_execute", _after)
+        event.listen(engine, "handle_error", _error)
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+    def _enter(self, method: str):
+        with self._lock:
+            self._in_flight[method] = self._in_flight.get(method, 0) + 1
+
+    def _exit(self, route_key: Tuple[str, str], status: int, seconds: float, size: int, stats: _RequestStats):
+        with self._lock:
+            self._in_flight[route_key[0]] -= 1
+            if route_key not in self._latency:
+                self._latency[route_key] = Histogram(LATENCY_BUCKETS_SECONDS)
+                self._size[route_key] = Histogram(SIZE_BUCKETS_BYTES)
+                self._queries[route_key] = Histogram(QUERY_BUCKETS)
+                self._db_seconds[route_key] = 0.0
+            self._latency[route_key].observe(seconds)
+            self._size[route_key].observe(size)
+            self._queries[route_key].observe(stats.queries)
+            self._db_seconds[route_key] += stats.db_seconds
+            request_key = (*route_key, status)
+            self._requests[request_key] = self._requests.get(request_key, 0) + 1
+
+    # ------------------------------------------------------------------
+    # 출력
+    # ------------------------------------------------------------------
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        def labels(method: str, route: str) -> str:
+            return f'method="{method}",route="{_escape(route)}"'
+
+        with self._lock:
+            out = [
+                "# HELP http_requests_total Requests by route and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self._requests.items()):
+                out.append(f'http_requests_total{{{labels(method, route)},status="{status}"}} {count}')
+            out += [
+                "# HELP http_requests_in_flight Requests currently being handled.",
+                "# TYPE http_requests_in_flight gauge",
+            ]
+            for method, count in sorted(self._in_flight.items()):
+                out.append(f'http_requests_in_flight{{method="{method}"}} {count}')
+            for name, help_text, series in (
+                ("http_request_duration_seconds", "Time until the response body was sent.", self._latency),
+                ("http_response_size_bytes", "Response body size.", self._size),
+                ("http_request_db_queries", "SQL statements executed per request.", self._queries),
+            ):
+                out += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (method, route), histogram in sorted(series.items()):
+                    out += histogram.lines(name, labels(method, route))
+            out += [
+                "# HELP http_request_db_seconds_total Time spent in SQL statements by route.",
+                "# TYPE http_request_db_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self._db_seconds.items()):
+                out.append(f"http_request_db_seconds_total{{{labels(method, route)}}} {seconds}")
+            out += [
+                "# HELP db_background_queries_total SQL statements executed outside requests.",
+                "# TYPE db_background_queries_total counter",
+                f"db_background_queries_total {self.background_queries}",
+                "# HELP db_background_seconds_total Time spent in SQL statements outside requests.",
+                "# TYPE db_background_seconds_total counter",
+                f"db_background_seconds_total {self.background_db_seconds}",
+            ]
+        return "\n".join(out) + "\n"
+
+
+# 전역 인스턴스
+request_metrics = RequestMetrics()
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware (does not buffer streaming bodies) feeding `request_metrics`."""
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        stats = _RequestStats()
+        token = _current.set(stats)
+        self.metrics._enter(method)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                app_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"app;dur={app_ms:.1f}"
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            seconds = time.perf_counter() - started
+            route = scope.get("route")
+            route_key = (method, getattr(route, "path", None) or UNMATCHED)
+            self.metrics._exit(route_key, status, seconds, size, stats)
+            fields = {
+                "method": method, "route": route_key[1], "status": status, "duration_ms": round(seconds * 1000, 2),
+                "db_queries": stats.queries, "db_ms": round(stats.db_seconds * 1000, 2), "bytes": size,
+            }
+            if seconds * 1000 >= SLOW_REQUEST_MS:
+                logger.warning("slow request", extra=fields)
+            else:
+                logger.debug("request", extra=fields)
@@ -0,0 +1,346 @@
+# services/response_cache.py
+"""
+라우트 응답 인메모리 캐시.
+
+리더보드, 통계 개요, 그룹 랭킹처럼 여러 사용자가 같은 결과를 보는 조회는 짧은 시간 동안
+프로세스 메모리에서 돌려줄 수 있습니다.
+
+    @router.get("/leaderboard")
+    @response_cache.cached(ttl=30, key=params("limit", "period"), tags=(LEADERBOARD,))
+    async def get_leaderboard(limit: int = 10, period: str = "all", db=Depends(get_db)): ...
+
+- 키: GLOBAL(라우트당 하나) / USER(current_user 별) / params(...)(지정한 인자 값 별)
+- 크기: RESPONSE_CACHE_SIZE 개를 넘으면 가장 오래 쓰지 않은 항목부터 제거 (LRU)
+- 동시 미스: 같은 키를 계산 중이면 뒤에 온 요청은 그 결과를 기다립니다 (single-flight)
+- 무효화: 태그 단위. TAGS_BY_MODEL 의 모델이 ORM 으로 커밋되면 자동으로, ORM 을 거치지
+  않는 쓰기는 invalidate_on_commit(db, tag) / invalidate(tag) 를 직접 호출합니다.
+  계산 도중 태그가 무효화되면 그 결과는 저장하지 않습니다.
+- 다른 워커: 무효화하는 트랜잭션이 cache_epochs 의 태그 epoch 를 함께 올리고, 각 워커가
+  이를 폴링해 자기 캐시를 비웁니다 (services/cache_epochs.py). TTL 은 그 밖의 경로로
+  들어온 쓰기의 상한입니다.
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from models import (
+    Achievement, BusStop, CarbonFactor, CreditsLedger, Group, GroupChallenge, GroupChallengeMember, GroupMember,
+    MobilityLog, SubwayStation, TtareungiStation, User, UserGarden,
+)
+from services.cache_epochs import bump_epochs, cache_epochs
+
+RESPONSE_CACHE_SECONDS = float(os.getenv("RESPONSE_CACHE_SECONDS", 30))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 2048))
+
+# 태그
+LEADERBOARD = "leaderboard"
+STATISTICS = "statistics"
+GROUP_RANKING = "group_ranking"
+POINT_RULES = "point_rules"
+SHOP = "shop"
+# 응답 캐시 밖의 프로세스 내 캐시 (cache_epochs 구독)
+GROUP_CHALLENGES = "group_challenges"
+ACHIEVEMENT_CATALOG = "achievement_catalog"
+STATIONS = "stations"
+CHALLENGE_SCHEDULE = "challenge_schedule"
+
+TAGS_BY_MODEL = {
+    MobilityLog: (LEADERBOARD, STATISTICS),
+    CreditsLedger: (LEADERBOARD, STATISTICS),
+    User: (LEADERBOARD, STATISTICS),
+    UserGarden: (STATISTICS,),
+    Group: (GROUP_RANKING,),
+    GroupMember: (GROUP_RANKING,),
+    CarbonFactor: (POINT_RULES,),
+    GroupChallenge: (GROUP_CHALLENGES,),
+    GroupChallengeMember: (GROUP_CHALLENGES,),
+    Achievement: (ACHIEVEMENT_CATALOG,),
+    BusStop: (STATIONS,),
+    SubwayStation: (STATIONS,),
+    TtareungiStation: (STATIONS,),
+}
+
+KeyFunc = Callable[[Dict[str, Any]], Hashable]
+
+
+def GLOBAL(kwargs: Dict[str, Any]) -> Hashable:
+    return ()
+
+
+def USER(kwargs: Dict[str, Any]) -> Hashable:
+    return kwargs["current_user"].user_id
+
+
+def params(*names: str) -> KeyFunc:
+    """Key on the values of the named route arguments."""
+    return lambda kwargs: tuple(kwargs.get(name) for name in names)
+
+
+class _Flight:
+    """A miss being computed by one thread while others wait for its result."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _RouteStats:
+    __slots__ = ("hits", "misses", "coalesced")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # (route, key) -> (expires_at, value, tags)
+        self._entries: "OrderedDict[tuple, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, set] = defaultdict(set)
+        self._epochs: Dict[str, int] = defaultdict(int)
+        self._flights: Dict[tuple, Any] = {}
+        self._stats: Dict[str, _RouteStats] = defaultdict(_RouteStats)
+        self._installed = False
+        self.evictions = 0
+        self.invalidations: Dict[str, int] = defaultdict(int)
+
+    # ------------------------------------------------------------------
+    # 저장소
+    # ------------------------------------------------------------------
+    def _lookup(self, route: str, cache_key: tuple):
+        """(True, value) on a fresh hit, otherwise (False, None). Caller holds the lock."""
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            self._drop(cache_key)
+            return False, None
+        self._entries.move_to_end(cache_key)
+        self._stats[route].hits += 1
+        return True, entry[1]
+
+    def _drop(self, cache_key: tuple):
+        _, _, tags = self._entries.pop(cache_key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(cache_key)
+
+    def _epoch(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        return tuple(self._epochs[tag] for tag in tags)
+
+    def _store(self, cache_key: tuple, value, ttl: float, tags: Tuple[str, ...], epoch: Tuple[int, ...]):
+        """Store unless one of `tags` was invalidated while the value was computed. Caller holds the lock."""
+        if self._epoch(tags) != epoch:
+            return
+        if cache_key in self._entries:
+            self._drop(cache_key)
+        self._entries[cache_key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._keys_by_tag[tag].add(cache_key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # 데코레이터
+    # ------------------------------------------------------------------
+    def cached(self, ttl: float = RESPONSE_CACHE_SECONDS, key: KeyFunc = GLOBAL, tags: Iterable[str] = ()):
+        """
+        Cache a route's return value for `ttl` seconds under `key(kwargs)`.
+        Works for both async and sync (threadpool) routes; the wrapper keeps
+        the route's signature so FastAPI still resolves its dependencies.
+        Exceptions (HTTPException included) are not cached.
+        """
+        tags = tuple(tags)
+
+        def decorator(func):
+            route = f"{func.__module__}.{func.__name__}"
+
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(**kwargs):
+                    cache_key = (route, key(kwargs))
+                    with self._lock:
+                        hit, value = self._lookup(route, cache_key)
+                        if hit:
+                            return value
+                        flight = self._flights.get(cache_key)
+                        if isinstance(flight, asyncio.Future):
+                            self._stats[route].coalesced += 1
+                        else:
+                            self._stats[route].misses += 1
+                            flight = None
+                            future = self._flights[cache_key] = asyncio.get_running_loop().create_future()
+                            epoch = self._epoch(tags)
+                    if flight is not None:
+                        return await asyncio.shield(flight)
+
+                    try:
+                        value = await func(**kwargs)
+                    except BaseException as e:
+                        with self._lock:
+                            self._flights.pop(cache_key, None)
+                        if isinstance(e, asyncio.CancelledError):
+                            future.cancel()
+                        else:
+                            future.set_exception(e)
+                            future.exception()   # 기다리는 요청이 없어도 경고가 남지 않도록
+                        raise
+                    with self._lock:
+                        self._flights.pop(cache_key, None)
+                        self._store(cache_key, value, ttl, tags, epoch)
+                    future.set_result(value)
+                    return value
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def sync_wrapper(**kwargs):
+                cache_key = (route, key(kwargs))
+                with self._lock:
+                    hit, value = self._lookup(route, cache_key)
+                    if hit:
+                        return value
+                    flight = self._flights.get(cache_key)
+                    if isinstance(flight, _Flight):
+                        self._stats[route].coalesced += 1
+                        leader = False
+                    else:
+                        self._stats[route].misses += 1
+                        flight = self._flights[cache_key] = _Flight()
+                        epoch = self._epoch(tags)
+                        leader = True
+                if not leader:
+                    flight.done.wait()
+                    if flight.error is not None:
+                        raise flight.error
+                    return flight.result
+
+                try:
+                    flight.result = func(**kwargs)
+                except BaseException as e:
+                    flight.error = e
+                    raise
+                else:
+                    with self._lock:
+                        self._store(cache_key, flight.result, ttl, tags, epoch)
+                    return flight.result
+                finally:
+                    with self._lock:
+                        self._flights.pop(cache_key, None)
+                    flight.done.set()
+
+            return sync_wrapper
+
+        return decorator
+
+    # ------------------------------------------------------------------
+    # 무효화
+    # ------------------------------------------------------------------
+    def invalidate(self, *tags: str):
+        """
+        Drop every entry carrying one of `tags` in this process and discard
+        results still being computed for them. Other workers only hear about
+        it through invalidate_on_commit / ORM commits.
+        """
+        with self._lock:
+            for tag in tags:
+                self._epochs[tag] += 1
+                self.invalidations[tag] += 1
+                for cache_key in list(self._keys_by_tag.pop(tag, ())):
+                    if cache_key in self._entries:
+                        self._drop(cache_key)
+
+    @staticmethod
+    def invalidate_on_commit(session, *tags: str):
+        """Invalidate `tags` once `session` commits (for writes that bypass the ORM unit of work)."""
+        session.info.setdefault("response_cache_tags", set()).update(tags)
+
+    def clear(self):
+        with self._lock:
+            for tag in self._keys_by_tag:
+                self._epochs[tag] += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def install(self, session_factory):
+        """
+        Invalidate the tags of TAGS_BY_MODEL rows (and invalidate_on_commit
+        tags) after each commit. The same transaction bumps the tags in
+        cache_epochs, and bumps seen there from other processes invalidate
+        this process's entries.
+        """
+        if self._installed:
+            return
+        self._installed = True
+        cache_epochs.subscribe(self.invalidate)
+
+        def _publish(session):
+            tags = session.info.get("response_cache_tags")
+            if not tags:
+                return
+            published = session.info.setdefault("response_cache_published", set())
+            pending = tags - published
+            if pending:
+                bump_epochs(session.connection(), pending)
+                published.update(pending)
+
+        def _track(session, flush_context):
+            touched = session.info.setdefault("response_cache_tags", set())
+            for obj in (*session.new, *session.deleted, *(o for o in session.dirty if session.is_modified(o))):
+                touched.update(TAGS_BY_MODEL.get(type(obj), ()))
+            _publish(session)
+
+        def _invalidate(session):
+            session.info.pop("response_cache_published", None)
+            tags = session.info.pop("response_cache_tags", None)
+            if tags:
+                self.invalidate(*tags)
+
+        def _discard(session, previous_transaction=None):
+            session.info.pop("response_cache_tags", None)
+            session.info.pop("response_cache_published", None)
+
+        event.listen(session_factory, "after_flush", _track)
+        # invalidate_on_commit 태그 중 flush 없이 커밋되는 것 (Core 쓰기 뒤 바로 commit)
+        event.listen(session_factory, "before_commit", _publish)
+        event.listen(session_factory, "after_commit", _invalidate)
+        event.listen(session_factory, "after_soft_rollback", _discard)
+
+    # ------------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------------
+    def metrics(self) -> dict:
+        with self._lock:
+            routes = {}
+            for route, stats in self._stats.items():
+                lookups = stats.hits + stats.misses + stats.coalesced
+                routes[route] = {
+                    "hits": stats.hits,
+                    "misses": stats.misses,
+                    "coalesced": stats.coalesced,
+                    "hit_rate": round((stats.hits + stats.coalesced) / lookups, 4) if lookups else None,
+                }
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "evictions": self.evictions,
+                "in_flight": len(self._flights),
+                "invalidations": dict(self.invalidations),
+                "routes": routes,
+            }
+
+
+# 전역 인스턴스
+response_cache = ResponseCache()
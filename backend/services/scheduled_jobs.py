@@ -0,0 +1,43 @@
+# services/scheduled_jobs.py
+"""
+스케줄러에 등록되는 주기 작업. 이 모듈을 import 하면 작업이 scheduler 에 등록됩니다.
+
+- leader_only=True : 여러 워커 중 리스를 쥔 프로세스 하나만 실행 (DB 변경 작업)
+- leader_only=False: 모든 워커가 실행 (프로세스별 인메모리 캐시 갱신)
+"""
+from sqlalchemy.orm import Session
+
+from services.achievement_state import achievement_catalog, ACHIEVEMENT_CATALOG_RELOAD_SECONDS
+from services.carbon_factor_registry import carbon_factor_registry, CARBON_FACTOR_RELOAD_SECONDS
+from services.challenge_lifecycle import challenge_lifecycle, CHALLENGE_SCHEDULE_HORIZON_SECONDS, REFILL_JOB
+from services.event_bus import event_bus
+from services.group_totals import group_totals
+from services.scheduler import scheduler
+
+
+@scheduler.every(REFILL_JOB, CHALLENGE_SCHEDULE_HORIZON_SECONDS / 2)
+def schedule_challenge_transitions(db: Session):
+    return challenge_lifecycle.refill(db)
+
+
+@scheduler.every("outbox_compaction", 3600)
+def compact_outbox(db: Session):
+    return event_bus.purge(db)
+
+
+@scheduler.every("group_totals_reconcile", 24 * 3600)
+def reconcile_group_totals(db: Session):
+    # 탄소 계수 재계산 등 이동 기록을 직접 수정한 경우의 누적 오차를 보정합니다.
+    return group_totals.rebuild(db)
+
+
+@scheduler.every("carbon_factor_refresh", CARBON_FACTOR_RELOAD_SECONDS, leader_only=False)
+def refresh_carbon_factors(db: Session):
+    carbon_factor_registry.ensure_fresh(db)
+    return {"version": carbon_factor_registry.version}
+
+
+@scheduler.every("achievement_catalog_refresh", ACHIEVEMENT_CATALOG_RELOAD_SECONDS, leader_only=False)
+def refresh_achievement_catalog(db: Session):
+    achievement_catalog.ensure_fresh(db)
+    return {"version": achievement_catalog.version}
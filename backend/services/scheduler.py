@@ -0,0 +1,286 @@
+# services/scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", 30))
+SCHEDULER_MAX_SLEEP_SECONDS = 5.0   # 리스 갱신 / 리더 재시도 간격의 상한
+
+Job = Callable[[Session], object]
+
+
+class JobStats:
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.last_started_at: Optional[datetime] = None
+        self.last_duration_ms = 0.0
+        self.total_ms = 0.0
+        self.last_error: Optional[str] = None
+        self.last_result = None
+
+    def as_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_ms": round(self.last_duration_ms, 2),
+            "avg_duration_ms": round(self.total_ms / self.runs, 2) if self.runs else None,
+            "last_error": self.last_error,
+            "last_result": self.last_result,
+        }
+
+
+class PeriodicJob:
+    def __init__(self, name: str, interval: float, func: Job, leader_only: bool):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.leader_only = leader_only
+        self.next_run = 0.0   # time.monotonic()
+
+
+class Scheduler:
+    """
+    asyncio scheduler for one-shot timers and periodic jobs.
+
+    One-shot timers live in a heap ordered by their due time (UTC), so the loop
+    sleeps exactly until the next boundary; `at()` is thread-safe and replaces
+    an earlier timer with the same key. Jobs marked leader_only (and all
+    timers) run only in the process holding the `scheduler_leases` row, which
+    is renewed every tick and taken over by another worker once it expires.
+    Per-process jobs (in-memory cache refreshes) run everywhere. DB work runs
+    in threads with a fresh session per run.
+    """
+
+    def __init__(self, name: str = "main", lease_seconds: float = SCHEDULER_LEASE_SECONDS):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.holder = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.jobs: Dict[str, PeriodicJob] = {}
+        self.stats: Dict[str, JobStats] = {}
+        self.is_leader = False
+        self._heap: List[Tuple[datetime, int, Hashable]] = []
+        self._timers: Dict[Hashable, Tuple[datetime, int, str, Job]] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._lease_checked = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_factory = None
+
+    # ------------------------------------------------------------------
+    # 등록
+    # ------------------------------------------------------------------
+    def every(self, name: str, interval: float, leader_only: bool = True):
+        """Decorator registering `func(db)` to run every `interval` seconds."""
+        def decorator(func: Job) -> Job:
+            self.jobs[name] = PeriodicJob(name, interval, func, leader_only)
+            self.stats.setdefault(name, JobStats())
+            return func
+        return decorator
+
+    def at(self, due: datetime, key: Hashable, name: str, func: Job):
+        """Run `func(db)` at `due` (naive UTC); a later call with the same key replaces the timer."""
+        with self._lock:
+            seq = next(self._seq)
+            self._timers[key] = (due, seq, name, func)
+            heapq.heappush(self._heap, (due, seq, key))
+            self.stats.setdefault(name, JobStats())
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def run_soon(self, name: str):
+        """Move periodic job `name` to the next loop tick (thread-safe; leader_only jobs still wait for the lease)."""
+        job = self.jobs.get(name)
+        if job is None:
+            return
+        job.next_run = 0.0
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def cancel(self, key: Hashable):
+        with self._lock:
+            self._timers.pop(key, None)
+
+    def _pop_due(self, now: datetime) -> List[Tuple[str, Job]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, key = heapq.heappop(self._heap)
+                timer = self._timers.get(key)
+                if timer and timer[1] == seq:   # 교체/취소된 항목은 건너뜀
+                    del self._timers[key]
+                    due.append((timer[2], timer[3]))
+        return due
+
+    def _next_due(self) -> Optional[datetime]:
+        with self._lock:
+            while self._heap:
+                _, seq, key = self._heap[0]
+                timer = self._timers.get(key)
+                if timer and timer[1] == seq:
+                    return self._heap[0][0]
+                heapq.heappop(self._heap)
+        return None
+
+    @property
+    def pending_timers(self) -> int:
+        return len(self._timers)
+
+    # ------------------------------------------------------------------
+    # 리더 선출
+    # ------------------------------------------------------------------
+    def try_acquire(self, db: Session) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        renewed = db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == self.name)
+            .where(or_(SchedulerLease.holder == self.holder, SchedulerLease.expires_at < now))
+            .values(holder=self.holder, expires_at=expires_at)
+        ).rowcount
+        if renewed:
+            db.commit()
+            return True
+        try:
+            db.add(SchedulerLease(name=self.name, holder=self.holder, expires_at=expires_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()   # 다른 워커가 리스를 쥐고 있음
+            return False
+
+    def release(self, db: Session):
+        db.query(SchedulerLease).filter(
+            SchedulerLease.name == self.name, SchedulerLease.holder == self.holder
+        ).delete(synchronize_session=False)
+        db.commit()
+        self.is_leader = False
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+    def run_job(self, session_factory, name: str, func: Job):
+        stats = self.stats.setdefault(name, JobStats())
+        stats.last_started_at = datetime.utcnow()
+        started = time.perf_counter()
+        db = session_factory()
+        try:
+            stats.last_result = func(db)
+            stats.last_error = None
+        except Exception as e:
+            db.rollback()
+            stats.failures += 1
+            stats.last_error = str(e)[:500]
+            logger.exception("scheduled job failed", extra={"job": name})
+        finally:
+            db.close()
+            elapsed = (time.perf_counter() - started) * 1000
+            stats.runs += 1
+            stats.last_duration_ms = elapsed
+            stats.total_ms += elapsed
+
+    def _check_lease(self, session_factory):
+        db = session_factory()
+        try:
+            was_leader = self.is_leader
+            self.is_leader = self.try_acquire(db)
+            if self.is_leader and not was_leader:
+                logger.info("scheduler leader acquired", extra={"holder": self.holder})
+                # 새 리더는 리더 전용 작업을 즉시 한 번 실행합니다 (예: 전이 예약 채우기)
+                for job in self.jobs.values():
+                    if job.leader_only:
+                        job.next_run = 0.0
+        finally:
+            db.close()
+        self._lease_checked = time.monotonic()
+
+    async def _run(self, session_factory):
+        while True:
+            try:
+                if time.monotonic() - self._lease_checked >= min(self.lease_seconds / 3, SCHEDULER_MAX_SLEEP_SECONDS):
+                    await asyncio.to_thread(self._check_lease, session_factory)
+
+                now_mono = time.monotonic()
+                for job in self.jobs.values():
+                    if job.next_run <= now_mono and (self.is_leader or not job.leader_only):
+                        job.next_run = now_mono + job.interval
+                        await asyncio.to_thread(self.run_job, session_factory, job.name, job.func)
+
+                if self.is_leader:
+                    for name, func in self._pop_due(datetime.utcnow()):
+                        await asyncio.to_thread(self.run_job, session_factory, name, func)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("scheduler loop error")
+
+            sleep = SCHEDULER_MAX_SLEEP_SECONDS
+            now_mono = time.monotonic()
+            for job in self.jobs.values():
+                if self.is_leader or not job.leader_only:
+                    sleep = min(sleep, job.next_run - now_mono)
+            next_due = self._next_due() if self.is_leader else None
+            if next_due is not None:
+                sleep = min(sleep, (next_due - datetime.utcnow()).total_seconds())
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(sleep, 0.01))
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, session_factory):
+        if self._task:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._session_factory = session_factory
+        self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self.is_leader:
+            await asyncio.to_thread(self._release, self._session_factory)
+
+    def _release(self, session_factory):
+        db = session_factory()
+        try:
+            self.release(db)
+        finally:
+            db.close()
+
+    def metrics(self) -> dict:
+        next_due = self._next_due()
+        return {
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "pending_timers": self.pending_timers,
+            "next_timer_at": next_due.isoformat() if next_due else None,
+            "jobs": {name: stats.as_dict() for name, stats in self.stats.items()},
+        }
+
+
+# 전역 인스턴스
+scheduler = Scheduler()
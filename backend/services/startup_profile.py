@@ -0,0 +1,56 @@
+# services/startup_profile.py
+"""
+서버 시작 단계별 소요 시간 기록.
+
+main.py 의 import 묶음과 init_db / startup 훅의 각 단계를 step() 으로 감싸 두면
+GET /admin/startup 으로 조회할 수 있고, STARTUP_PROFILE=1 이면 시작이 끝날 때 표로
+출력합니다. 모듈 단위 import 시간은 benchmarks/bench_startup.py 가 `-X importtime`
+으로 측정합니다.
+
+이 모듈은 main.py 가 가장 먼저 불러오므로 표준 라이브러리만 사용합니다.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+class StartupProfile:
+    def __init__(self):
+        self.created_at = time.perf_counter()
+        self.steps: List[Tuple[str, float]] = []
+        self.ready_ms: Optional[float] = None
+
+    @contextmanager
+    def step(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, (time.perf_counter() - started) * 1000))
+
+    def ready(self):
+        """Mark the end of startup (time since this module was imported)."""
+        self.ready_ms = (time.perf_counter() - self.created_at) * 1000
+        if STARTUP_PROFILE:
+            print(self.format())
+
+    def report(self) -> dict:
+        return {
+            "steps": [{"name": name, "ms": round(ms, 2)} for name, ms in self.steps],
+            "ready_ms": round(self.ready_ms, 2) if self.ready_ms is not None else None,
+        }
+
+    def format(self) -> str:
+        width = max((len(name) for name, _ in self.steps), default=10)
+        lines = [f"{'startup step':<{width}} {'ms':>9}"]
+        lines += [f"{name:<{width}} {ms:>9.1f}" for name, ms in self.steps]
+        if self.ready_ms is not None:
+            lines.append(f"{'(ready)':<{width}} {self.ready_ms:>9.1f}")
+        return "\n".join(lines)
+
+
+# 전역 인스턴스
+startup_profile = StartupProfile()
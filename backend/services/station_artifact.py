@@ -0,0 +1,221 @@
+# services/station_artifact.py
+"""
+정류장 데이터(bus_stops / subway_stations / ttareungi_stations)를 버전이 붙은
+바이너리 아티팩트로 컴파일하고, 서버 시작 시 memory-map 으로 읽습니다.
+
+    python -m services.station_artifact build
+    python -m services.station_artifact info
+
+디렉터리 구조 (STATION_ARTIFACT_DIR, 기본 backend/database/stations):
+
+    CURRENT                       -> 현재 버전 디렉터리 이름 (원자적으로 교체)
+    v1-<hash>/manifest.json       -> 형식 버전, 데이터 해시, 원본 테이블 fingerprint, 격자 크기
+    v1-<hash>/strings.bin         -> 모든 이름/노선 문자열 (UTF-8, 이어 붙임)
+    v1-<hash>/<type>.<field>.npy  -> ids, lat, lon, name_off, line_off, grid_order, grid_keys
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ARTIFACT_DIR = os.getenv(
+    "STATION_ARTIFACT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "stations"),
+)
+KEEP_VERSIONS = 2
+ARRAY_FIELDS = ("ids", "lat", "lon", "name_off", "line_off", "grid_order", "grid_keys")
+
+
+class StringTable:
+    """Read-only sequence of strings decoded on access from a shared UTF-8 buffer."""
+
+    def __init__(self, buffer, offsets: np.ndarray, empty_as_none: bool = False):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._empty_as_none = empty_as_none
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        if start == end and self._empty_as_none:
+            return None
+        return bytes(self._buffer[start:end]).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _pack_strings(values: Iterable[Optional[str]], chunks: List[bytes], base: int) -> np.ndarray:
+    offsets = [base]
+    for value in values:
+        encoded = (value or "").encode("utf-8")
+        chunks.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+    return np.array(offsets, dtype=np.int64)
+
+
+def _read_current(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, "CURRENT"), encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    path = os.path.join(directory, name)
+    return path if os.path.isdir(path) else None
+
+
+def write_artifact(
+    tables: Dict[str, Dict[str, object]],
+    fingerprint: Dict[str, list],
+    grid_cell_deg: float,
+    directory: str = ARTIFACT_DIR,
+) -> str:
+    """
+    Write one artifact version and point CURRENT at it.
+
+    `tables` maps station type -> {ids, names, lines, lat, lon, grid_order, grid_keys}.
+    The version directory is written under a temporary name and renamed into
+    place, and CURRENT is swapped with os.replace, so readers never see a
+    half-written artifact.
+    """
+    os.makedirs(directory, exist_ok=True)
+    chunks: List[bytes] = []
+    arrays: Dict[str, np.ndarray] = {}
+    size = 0
+    for station_type, table in tables.items():
+        arrays[f"{station_type}.name_off"] = _pack_strings(table["names"], chunks, size)
+        size = int(arrays[f"{station_type}.name_off"][-1])
+        arrays[f"{station_type}.line_off"] = _pack_strings(table["lines"], chunks, size)
+        size = int(arrays[f"{station_type}.line_off"][-1])
+        arrays[f"{station_type}.ids"] = np.ascontiguousarray(table["ids"], dtype=np.int64)
+        arrays[f"{station_type}.lat"] = np.ascontiguousarray(table["lat"], dtype=np.float64)
+        arrays[f"{station_type}.lon"] = np.ascontiguousarray(table["lon"], dtype=np.float64)
+        arrays[f"{station_type}.grid_order"] = np.ascontiguousarray(table["grid_order"], dtype=np.int64)
+        arrays[f"{station_type}.grid_keys"] = np.ascontiguousarray(table["grid_keys"], dtype=np.int64)
+    strings = b"".join(chunks)
+
+    digest = hashlib.sha1(strings)
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(arrays[name].tobytes())
+    data_version = digest.hexdigest()[:12]
+    version_name = f"v{FORMAT_VERSION}-{data_version}"
+    final_path = os.path.join(directory, version_name)
+
+    if not os.path.isdir(final_path):
+        tmp_path = tempfile.mkdtemp(prefix=".build-", dir=directory)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        with open(os.path.join(tmp_path, "strings.bin"), "wb") as f:
+            f.write(strings)
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "data_version": data_version,
+            "built_at": datetime.utcnow().isoformat(),
+            "grid_cell_deg": grid_cell_deg,
+            "fingerprint": fingerprint,
+            "counts": {t: int(len(tables[t]["ids"])) for t in tables},
+        }
+        with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, final_path)
+
+    pointer = os.path.join(directory, ".CURRENT.tmp")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(version_name)
+    os.replace(pointer, os.path.join(directory, "CURRENT"))
+
+    # 오래된 버전 정리 (현재 포함 KEEP_VERSIONS 개 유지)
+    versions = sorted(
+        (d for d in os.listdir(directory) if d.startswith(f"v{FORMAT_VERSION}-") and d != version_name),
+        key=lambda d: os.path.getmtime(os.path.join(directory, d)),
+        reverse=True,
+    )
+    for stale in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(os.path.join(directory, stale), ignore_errors=True)
+    return final_path
+
+
+def read_manifest(directory: str = ARTIFACT_DIR) -> Optional[dict]:
+    path = _read_current(directory)
+    if path is None:
+        return None
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_artifact(directory: str = ARTIFACT_DIR) -> Optional[dict]:
+    """
+    Memory-map the current artifact. Returns {"manifest", "tables"} or None if absent.
+
+    Arrays are opened with mmap_mode="r" and strings stay in one shared mmap,
+    so nothing is copied into the process heap and every worker reading the
+    same version shares the pages through the OS page cache.
+    """
+    path = _read_current(directory)
+    if path is None:
+        return None
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+
+    strings_path = os.path.join(path, "strings.bin")
+    if os.path.getsize(strings_path) > 0:
+        with open(strings_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        buffer = b""
+
+    tables = {}
+    for station_type in manifest["counts"]:
+        fields = {
+            field: np.load(os.path.join(path, f"{station_type}.{field}.npy"), mmap_mode="r")
+            for field in ARRAY_FIELDS
+        }
+        fields["names"] = StringTable(buffer, fields.pop("name_off"))
+        fields["lines"] = StringTable(buffer, fields.pop("line_off"), empty_as_none=True)
+        tables[station_type] = fields
+    return {"manifest": manifest, "tables": tables}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Compile or inspect the binary station artifact.")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--dir", default=ARTIFACT_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from database import SessionLocal
+        from services.station_index import StationIndex
+
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            index = StationIndex()
+            index.load(db)
+            path = index.compile_artifact(db, args.dir)
+            print(f"[stations] compiled {path} in {time.perf_counter() - started:.3f}s")
+        finally:
+            db.close()
+    else:
+        started = time.perf_counter()
+        artifact = read_artifact(args.dir)
+        if artifact is None:
+            print(f"[stations] no artifact in {args.dir}")
+        else:
+            print(f"[stations] mapped in {(time.perf_counter() - started) * 1000:.2f} ms")
+            print(json.dumps(artifact["manifest"], ensure_ascii=False, indent=2))
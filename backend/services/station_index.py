@@ -0,0 +1,236 @@
+# services/station_index.py
+import logging
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, func, null, type_coerce
+from sqlalchemy.orm import Session
+
+from services import station_artifact
+
+from models import BusStop, SubwayStation, TtareungiStation
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+
+# 격자 버킷 크기 (위도 기준 약 220 m). 반경 질의는 주변 격자 칸만 확인합니다.
+GRID_CELL_DEG = 0.002
+# nearest() 가 격자를 넓혀 가며 찾는 최대 칸 수; 넘으면 전체 배열을 봅니다.
+MAX_RING_CELLS = 25
+
+# 정류장 종류 -> (모델, id 컬럼, 이름 컬럼, 노선 컬럼)
+STATION_TYPES = {
+    "bus": (BusStop, BusStop.stop_id, BusStop.stop_name, None),
+    "subway": (SubwayStation, SubwayStation.station_id, SubwayStation.station_name, SubwayStation.line_number),
+    "ttareungi": (TtareungiStation, TtareungiStation.station_id, TtareungiStation.station_name, None),
+}
+
+_PARENTHESIS = re.compile(r"\(.*?\)")
+_LEADING_NUMBER = re.compile(r"^\d+\.\s*")
+
+
+def normalize_station_name(name: Optional[str]) -> str:
+    """'서울역(1호선)' / '서울역 ' / '서울' -> '서울'; '102. 망원역 1번출구 앞' -> '망원역1번출구앞'."""
+    name = _LEADING_NUMBER.sub("", (name or "").strip())
+    name = _PARENTHESIS.sub("", name).strip().replace(" ", "")
+    if len(name) > 1 and name.endswith("역"):
+        name = name[:-1]
+    return name
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorised great-circle distance in km; accepts scalars or NumPy arrays (degrees)."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _cell_keys(cell_lat: np.ndarray, cell_lon: np.ndarray) -> np.ndarray:
+    return (cell_lat.astype(np.int64) << 32) + (cell_lon.astype(np.int64) & 0xFFFFFFFF)
+
+
+class _Grid:
+    """Stations bucketed into GRID_CELL_DEG cells; each cell is a contiguous slice of `order`."""
+
+    def __init__(self, order: np.ndarray, keys: np.ndarray):
+        self.order = order
+        self.keys = keys
+
+    @classmethod
+    def build(cls, lats: np.ndarray, lons: np.ndarray) -> "_Grid":
+        keys = _cell_keys(np.floor(lats / GRID_CELL_DEG), np.floor(lons / GRID_CELL_DEG))
+        order = np.argsort(keys, kind="stable")
+        return cls(order, keys[order])
+
+    def candidates(self, lat: float, lon: float, ring_lat: int, ring_lon: int) -> np.ndarray:
+        """Station indexes in the (2*ring+1)^2 cells around (lat, lon)."""
+        ci, cj = int(np.floor(lat / GRID_CELL_DEG)), int(np.floor(lon / GRID_CELL_DEG))
+        rows = np.arange(ci - ring_lat, ci + ring_lat + 1)
+        # 같은 위도 줄의 칸들은 키가 연속이므로 줄마다 searchsorted 한 번이면 됩니다.
+        lo = np.searchsorted(self.keys, _cell_keys(rows, np.full_like(rows, cj - ring_lon)), side="left")
+        hi = np.searchsorted(self.keys, _cell_keys(rows, np.full_like(rows, cj + ring_lon)), side="right")
+        if not (hi > lo).any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.order[a:b] for a, b in zip(lo, hi) if b > a])
+
+
+class StationIndex:
+    """
+    버스 정류장 / 지하철역 / 따릉이 대여소 좌표를 NumPy 배열로 메모리에 올려 두고
+    격자 버킷으로 최근접 / 반경 내 정류장을 찾습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ids: Dict[str, np.ndarray] = {}
+        self.names: Dict[str, np.ndarray] = {}
+        self.lines: Dict[str, np.ndarray] = {}
+        self.lats: Dict[str, np.ndarray] = {}
+        self.lons: Dict[str, np.ndarray] = {}
+        self.grids: Dict[str, _Grid] = {}
+        self.loaded = False
+        self.version = 0
+
+    @staticmethod
+    def fingerprint(db: Session) -> Dict[str, list]:
+        """Cheap per-table summary (count, max id, coordinate sums) used to detect a stale artifact."""
+        result = {}
+        for station_type, (model, id_column, _, _) in STATION_TYPES.items():
+            count, max_id, lat_sum, lon_sum = db.query(
+                func.count(id_column), func.max(id_column),
+                func.total(model.latitude), func.total(model.longitude),
+            ).one()
+            result[station_type] = [int(count), int(max_id or 0), round(float(lat_sum), 4), round(float(lon_sum), 4)]
+        return result
+
+    def _publish(self, ids, names, lines, lats, lons, grids):
+        with self._lock:
+            self.ids, self.names, self.lines, self.lats, self.lons = ids, names, lines, lats, lons
+            self.grids = grids
+            self.loaded = True
+            self.version += 1
+
+    def load(self, db: Session):
+        """Read all three station tables once, converting Numeric coordinates to float64."""
+        ids, names, lines, lats, lons = {}, {}, {}, {}, {}
+        for station_type, (model, id_column, name_column, line_column) in STATION_TYPES.items():
+            rows = db.query(
+                id_column, name_column,
+                type_coerce(model.latitude, Float), type_coerce(model.longitude, Float),
+                line_column if line_column is not None else null(),
+            ).all()
+            ids[station_type] = np.array([r[0] for r in rows], dtype=np.int64)
+            names[station_type] = np.array([r[1] for r in rows], dtype=object)
+            lats[station_type] = np.array([r[2] for r in rows], dtype=np.float64)
+            lons[station_type] = np.array([r[3] for r in rows], dtype=np.float64)
+            lines[station_type] = np.array([r[4] for r in rows], dtype=object)
+
+        grids = {station_type: _Grid.build(lats[station_type], lons[station_type]) for station_type in STATION_TYPES}
+        self._publish(ids, names, lines, lats, lons, grids)
+
+    def load_artifact(self, directory: str = station_artifact.ARTIFACT_DIR, expected_fingerprint: Optional[dict] = None) -> bool:
+        """Memory-map the compiled artifact; False if it is missing or doesn't match `expected_fingerprint`."""
+        artifact = station_artifact.read_artifact(directory)
+        if artifact is None:
+            return False
+        manifest, tables = artifact["manifest"], artifact["tables"]
+        if expected_fingerprint is not None and manifest.get("fingerprint") != expected_fingerprint:
+            return False
+        if set(tables) != set(STATION_TYPES):
+            return False
+
+        reuse_grid = manifest.get("grid_cell_deg") == GRID_CELL_DEG
+        grids = {
+            station_type: _Grid(t["grid_order"], t["grid_keys"]) if reuse_grid else _Grid.build(t["lat"], t["lon"])
+            for station_type, t in tables.items()
+        }
+        self._publish(
+            {k: t["ids"] for k, t in tables.items()},
+            {k: t["names"] for k, t in tables.items()},
+            {k: t["lines"] for k, t in tables.items()},
+            {k: t["lat"] for k, t in tables.items()},
+            {k: t["lon"] for k, t in tables.items()},
+            grids,
+        )
+        return True
+
+    def compile_artifact(self, db: Session, directory: str = station_artifact.ARTIFACT_DIR) -> str:
+        """Write the currently loaded stations as a new artifact version."""
+        tables = {
+            station_type: {
+                "ids": self.ids[station_type],
+                "names": list(self.names[station_type]),
+                "lines": list(self.lines[station_type]),
+                "lat": self.lats[station_type],
+                "lon": self.lons[station_type],
+                "grid_order": self.grids[station_type].order,
+                "grid_keys": self.grids[station_type].keys,
+            }
+            for station_type in STATION_TYPES
+        }
+        return station_artifact.write_artifact(tables, self.fingerprint(db), GRID_CELL_DEG, directory)
+
+    def invalidate(self):
+        """Reload on the next ensure_loaded (station tables changed, possibly in another process)."""
+        self.loaded = False
+
+    def ensure_loaded(self, db: Session):
+        """Prefer the memory-mapped artifact; fall back to the tables and refresh the artifact."""
+        if self.loaded:
+            return
+        fingerprint = self.fingerprint(db)
+        if self.load_artifact(expected_fingerprint=fingerprint):
+            return
+        self.load(db)
+        try:
+            self.compile_artifact(db)
+        except OSError:
+            logger.warning("could not write station artifact", exc_info=True)
+
+    @staticmethod
+    def _rings_for(lat: float, radius_km: float) -> Tuple[int, int]:
+        cell_km_lat = GRID_CELL_DEG * KM_PER_DEG_LAT
+        cell_km_lon = cell_km_lat * max(np.cos(np.radians(lat)), 0.01)
+        return int(np.ceil(radius_km / cell_km_lat)), int(np.ceil(radius_km / cell_km_lon))
+
+    def within(self, station_type: str, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(station indexes, distances_km) within `radius_km`, nearest first."""
+        grid = self.grids.get(station_type)
+        if grid is None or len(grid.keys) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        candidates = grid.candidates(lat, lon, *self._rings_for(lat, radius_km))
+        distances = haversine_km(lat, lon, self.lats[station_type][candidates], self.lons[station_type][candidates])
+        keep = distances <= radius_km
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def nearest(self, station_type: str, lat: float, lon: float) -> Tuple[float, Optional[int]]:
+        """(distance_km, station index) of the closest station of `station_type`."""
+        lats = self.lats.get(station_type)
+        if lats is None or len(lats) == 0:
+            return float("inf"), None
+        grid = self.grids[station_type]
+        cell_km = GRID_CELL_DEG * KM_PER_DEG_LAT * max(np.cos(np.radians(lat)), 0.01)
+        for ring in range(MAX_RING_CELLS + 1):
+            candidates = grid.candidates(lat, lon, ring, ring)
+            if len(candidates):
+                distances = haversine_km(lat, lon, lats[candidates], self.lons[station_type][candidates])
+                i = int(np.argmin(distances))
+                # ring 칸 밖의 정류장은 적어도 ring * cell_km 만큼 떨어져 있습니다.
+                if distances[i] <= ring * cell_km:
+                    return float(distances[i]), int(candidates[i])
+        distances = haversine_km(lat, lon, lats, self.lons[station_type])
+        i = int(np.argmin(distances))
+        return float(distances[i]), i
+
+    def nearest_distance_km(self, station_type: str, lat: float, lon: float) -> float:
+        return self.nearest(station_type, lat, lon)[0]
+
+
+# 전역 인스턴스
+station_index = StationIndex()
@@ -0,0 +1,210 @@
+# services/station_search.py
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from services.station_index import StationIndex, normalize_station_name, station_index
+
+# 한글 음절 -> 호환 자모 (초성 / 중성 / 종성)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+              "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+_LINE_HINT = re.compile(r"(\d+)\s*호선")
+_DIGITS = re.compile(r"\d+")
+
+NGRAM = 2
+DEFAULT_LIMIT = 10
+# 점수 가산치: 완전 일치 > 접두 일치 > n-gram 유사도 (0~1)
+EXACT_BONUS = 2.0
+PREFIX_BONUS = 1.0
+LINE_BONUS = 0.5
+# 같은 점수라면 지하철 > 버스 > 따릉이 순서로 보여 줍니다.
+TYPE_PRIORITY = {"subway": 0.03, "bus": 0.02, "ttareungi": 0.01}
+# 이 점수 미만이면 ingest 에서 역 이름으로 인정하지 않습니다.
+MIN_MATCH_SCORE = 0.6
+
+
+def decompose_jamo(text: str) -> str:
+    """'강남' -> 'ㄱㅏㅇㄴㅏㅁ'; non-Hangul characters are lower-cased and kept."""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHOSEONG[code // 588])
+            out.append(_JUNGSEONG[(code % 588) // 28])
+            out.append(_JONGSEONG[code % 28])
+        else:
+            out.append(ch.lower())
+    return "".join(out)
+
+
+def _ngrams(key: str) -> List[str]:
+    padded = f"^{key}$"
+    return [padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)]
+
+
+def _line_key(line: Optional[str]) -> Optional[str]:
+    if not line:
+        return None
+    digits = _DIGITS.search(line)
+    return str(int(digits.group())) if digits else normalize_station_name(line)
+
+
+def parse_query(query: str) -> Tuple[str, Optional[str]]:
+    """'2호선 강남역' -> ('ㄱㅏㅇㄴㅏㅁ', '2'); '신분당선 강남' -> ('ㄱㅏㅇㄴㅏㅁ', '신분당선')."""
+    line = None
+    hint = _LINE_HINT.search(query)
+    if hint:
+        line = str(int(hint.group(1)))
+        query = _LINE_HINT.sub(" ", query)
+    else:
+        tokens = query.split()
+        line_tokens = [t for t in tokens if len(t) > 1 and t.endswith("선")]
+        if line_tokens and len(line_tokens) < len(tokens):
+            line = _line_key(line_tokens[0])
+            query = " ".join(t for t in tokens if t != line_tokens[0])
+    return decompose_jamo(normalize_station_name(query)), line
+
+
+class StationSearchIndex:
+    """
+    Korean fuzzy search over bus stops, subway stations and ttareungi stations.
+
+    Names are normalised ('강남역(2호선)' -> '강남') and decomposed to jamo so that
+    partial syllables ('강ㄴ') and single-jamo typos still match. Each distinct
+    (type, name, line) is one entry. A query is scored by jamo-bigram Dice
+    similarity through an inverted index (NumPy bincount over posting lists),
+    with bonuses for exact and prefix matches; prefixes are found by bisecting
+    the sorted jamo keys, which is the flattened form of a prefix trie.
+    """
+
+    def __init__(self, stations: StationIndex):
+        self.stations = stations
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._types = np.array([], dtype=object)
+        self._rows = np.array([], dtype=np.int64)
+        self._keys: List[str] = []
+        self._lines = np.array([], dtype=object)
+        self._gram_counts = np.array([], dtype=np.float64)
+        self._postings: Dict[str, np.ndarray] = {}
+        self._sorted_keys: List[str] = []
+        self._sorted_entries = np.array([], dtype=np.int64)
+        self._exact: Dict[str, np.ndarray] = {}
+        self._stations_version = None
+
+    def build(self, db: Session):
+        self.stations.ensure_loaded(db)
+        stations_version = self.stations.version
+
+        types, rows, keys, lines = [], [], [], []
+        seen = set()
+        for station_type, names in self.stations.names.items():
+            station_lines = self.stations.lines.get(station_type)
+            for row, name in enumerate(names):
+                line = _line_key(station_lines[row]) if station_lines is not None else None
+                key = decompose_jamo(normalize_station_name(name))
+                if not key or (station_type, key, line) in seen:
+                    continue
+                seen.add((station_type, key, line))
+                types.append(station_type)
+                rows.append(row)
+                keys.append(key)
+                lines.append(line)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        gram_counts = np.zeros(len(keys), dtype=np.float64)
+        exact: Dict[str, List[int]] = defaultdict(list)
+        for entry, key in enumerate(keys):
+            grams = set(_ngrams(key))
+            gram_counts[entry] = len(grams)
+            for gram in grams:
+                postings[gram].append(entry)
+            exact[key].append(entry)
+
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+
+        with self._lock:
+            self._types = np.array(types, dtype=object)
+            self._rows = np.array(rows, dtype=np.int64)
+            self._keys = keys
+            self._lines = np.array(lines, dtype=object)
+            self._gram_counts = gram_counts
+            self._postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+            self._sorted_keys = [keys[i] for i in order]
+            self._sorted_entries = np.array(order, dtype=np.int64)
+            self._exact = {key: np.array(ids, dtype=np.int64) for key, ids in exact.items()}
+            self._stations_version = stations_version
+            self.loaded = True
+
+    def ensure_loaded(self, db: Session):
+        """Build once, and again whenever StationIndex was reloaded."""
+        self.stations.ensure_loaded(db)
+        if not self.loaded or self._stations_version != self.stations.version:
+            self.build(db)
+
+    def _prefix_range(self, key: str) -> Tuple[int, int]:
+        lo = bisect_left(self._sorted_keys, key)
+        hi = bisect_left(self._sorted_keys, key + "\U0010ffff", lo)
+        return lo, hi
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT, types: Optional[Iterable[str]] = None) -> List[dict]:
+        """Top `limit` stations for `query`, best first, with coordinates."""
+        key, line = parse_query(query or "")
+        if not key or not self._keys:
+            return []
+
+        query_grams = set(_ngrams(key))
+        hits = [self._postings[g] for g in query_grams if g in self._postings]
+        total = len(self._keys)
+        overlap = np.bincount(np.concatenate(hits), minlength=total) if hits else np.zeros(total)
+        score = 2.0 * overlap / (self._gram_counts + len(query_grams))
+
+        lo, hi = self._prefix_range(key)
+        score[self._sorted_entries[lo:hi]] += PREFIX_BONUS
+        if key in self._exact:
+            score[self._exact[key]] += EXACT_BONUS
+        if line is not None:
+            score[self._lines == line] += LINE_BONUS
+        if types:
+            score[~np.isin(self._types, list(types))] = 0.0
+
+        candidates = np.flatnonzero(score > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-score[candidates], limit)[:limit]]
+        ranked = sorted(
+            candidates,
+            key=lambda e: (-(score[e] + TYPE_PRIORITY[self._types[e]]), len(self._keys[e])),
+        )
+
+        results = []
+        for entry in ranked:
+            station_type, row = self._types[entry], int(self._rows[entry])
+            results.append({
+                "type": station_type,
+                "station_id": int(self.stations.ids[station_type][row]),
+                "name": self.stations.names[station_type][row],
+                "line": self.stations.lines[station_type][row],
+                "latitude": float(self.stations.lats[station_type][row]),
+                "longitude": float(self.stations.lons[station_type][row]),
+                "score": round(float(score[entry]), 4),
+            })
+        return results
+
+    def best_match(self, query: str, types: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """The top result if it is a confident match (exact/prefix or high n-gram similarity)."""
+        results = self.search(query, limit=1, types=types)
+        if results and results[0]["score"] >= MIN_MATCH_SCORE:
+            return results[0]
+        return None
+
+
+# 전역 인스턴스
+station_search = StationSearchIndex(station_index)
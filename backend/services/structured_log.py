@@ -0,0 +1,64 @@
+# services/structured_log.py
+"""
+구조화 로깅 설정.
+
+    logger = logging.getLogger(__name__)
+    logger.debug("credit balance computed", extra={"user_id": user_id, "total_points": total_points})
+
+extra 로 넘긴 필드는 메시지와 분리된 키로 출력됩니다.
+- LOG_FORMAT=json : 한 줄에 JSON 객체 하나 ({"ts", "level", "logger", "msg", ...필드})
+- LOG_FORMAT=text : `시각 레벨 로거: 메시지 key=value ...` (기본값)
+LOG_LEVEL 로 레벨을 정합니다 (기본 INFO, DEBUG 로 두면 기존 디버그 출력이 보입니다).
+"""
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+# LogRecord 기본 속성 (이 밖의 속성은 extra 로 넘어온 필드)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _RESERVED and not k.startswith("_")}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **_fields(record),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _fields(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """Install one stderr handler on the root logger (idempotent)."""
+    root = logging.getLogger()
+    handler = next((h for h in root.handlers if getattr(h, "_structured", False)), None)
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler._structured = True
+        root.addHandler(handler)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else KeyValueFormatter())
+    root.setLevel(level)
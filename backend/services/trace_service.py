@@ -0,0 +1,235 @@
+# services/trace_service.py
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import schemas, models
+from services.mobility_service import MobilityService
+from services.station_index import StationIndex, haversine_km
+
+TRACE_SOURCE_NAME = "gps_trace"
+CHUNK_SIZE = 4096
+
+# 정지/이동 판정
+STOP_SPEED_KMH = 2.0        # 이 속도 미만의 구간은 정지로 봅니다
+STOP_MIN_SECONDS = 180      # 이 시간 이상 정지하면 구간(트립)을 나눕니다
+MAX_SPEED_KMH = 200.0       # 이 속도를 넘는 점프는 GPS 튐으로 보고 거리에서 제외합니다
+SPEED_WINDOW_POINTS = 10    # 정지 판정은 최근 N개 점의 변위 속도로 합니다 (GPS 떨림 완화)
+MIN_SEGMENT_KM = 0.1
+MIN_SEGMENT_SECONDS = 60
+
+# 속도 분포 (2 km/h 간격, 시간 가중 히스토그램)
+SPEED_BIN_KMH = 2.0
+SPEED_BIN_COUNT = int(MAX_SPEED_KMH / SPEED_BIN_KMH)
+
+# 정류장 근접 판정 반경 (km)
+STATION_RADIUS_KM = {"subway": 0.3, "bus": 0.2, "ttareungi": 0.2}
+
+
+class TripSegment:
+    """Running statistics of one move segment; memory use is independent of its length."""
+
+    __slots__ = (
+        "started_at", "start_lat", "start_lon", "ended_at", "end_lat", "end_lon",
+        "distance_km", "moving_seconds", "dwell_seconds", "max_speed_kmh", "speed_histogram",
+    )
+
+    def __init__(self, t: float, lat: float, lon: float):
+        self.started_at, self.start_lat, self.start_lon = t, lat, lon
+        self.ended_at, self.end_lat, self.end_lon = t, lat, lon
+        self.distance_km = 0.0
+        self.moving_seconds = 0.0
+        self.dwell_seconds = 0.0
+        self.max_speed_kmh = 0.0
+        self.speed_histogram = np.zeros(SPEED_BIN_COUNT, dtype=np.float64)
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.ended_at - self.started_at
+
+    @property
+    def average_speed_kmh(self) -> float:
+        return self.distance_km / (self.duration_seconds / 3600) if self.duration_seconds > 0 else 0.0
+
+    def speed_quantile(self, q: float) -> float:
+        total = self.speed_histogram.sum()
+        if total <= 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.speed_histogram), q * total))
+        return (min(index, SPEED_BIN_COUNT - 1) + 0.5) * SPEED_BIN_KMH
+
+
+def _parse_timestamp(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def iter_point_chunks(points: Iterable[Any], chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Convert an iterable of {lat, lon, ts} points (dicts or GpsPoint) into (t, lat, lon) array chunks."""
+    iterator = iter(points)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        if isinstance(chunk[0], dict):
+            rows = [(_parse_timestamp(p["ts"]), p["lat"], p["lon"]) for p in chunk]
+        else:
+            rows = [(_parse_timestamp(p.ts), p.lat, p.lon) for p in chunk]
+        array = np.array(rows, dtype=np.float64)
+        yield array[:, 0], array[:, 1], array[:, 2]
+
+
+def segment_trace(chunks: Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> Iterator[TripSegment]:
+    """
+    Split a time-ordered GPS trace into move segments separated by stops.
+
+    Each chunk is processed with vectorised haversine/speed math; only the last
+    SPEED_WINDOW_POINTS points, the open segment and the pending stop are
+    carried between chunks, so memory stays bounded for arbitrarily long traces.
+    Moving vs. stopped is decided on the displacement speed over that window so
+    that GPS jitter while standing still does not look like movement.
+    Segments are yielded as soon as they close.
+    """
+    carry = None                 # (t, lat, lon) arrays of the last points seen
+    segment: Optional[TripSegment] = None
+    stop_seconds = 0.0           # duration of the current stationary run
+
+    def finish(seg: TripSegment) -> Optional[TripSegment]:
+        if seg.distance_km >= MIN_SEGMENT_KM and seg.duration_seconds >= MIN_SEGMENT_SECONDS:
+            return seg
+        return None
+
+    for t, lat, lon in chunks:
+        if carry is not None:
+            t = np.concatenate((carry[0], t))
+            lat = np.concatenate((carry[1], lat))
+            lon = np.concatenate((carry[2], lon))
+        first = max(len(carry[0]) if carry is not None else 0, 1)
+        carry = (t[-SPEED_WINDOW_POINTS:], lat[-SPEED_WINDOW_POINTS:], lon[-SPEED_WINDOW_POINTS:])
+        if len(t) <= first:
+            continue
+
+        # 구간 i는 점 end[i]-1 -> end[i] 입니다.
+        end = np.arange(first, len(t))
+        dt = t[end] - t[end - 1]
+        distance = haversine_km(lat[end - 1], lon[end - 1], lat[end], lon[end])
+        back = np.maximum(end - SPEED_WINDOW_POINTS, 0)
+        window_dt = t[end] - t[back]
+        window_km = haversine_km(lat[back], lon[back], lat[end], lon[end])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speed = np.where(dt > 0, distance / dt * 3600, 0.0)
+            window_speed = np.where(window_dt > 0, window_km / window_dt * 3600, 0.0)
+        glitch = speed > MAX_SPEED_KMH
+        distance[glitch] = 0.0
+        speed[glitch] = 0.0
+        moving = (window_speed >= STOP_SPEED_KMH) & ~glitch
+
+        # 이동/정지 상태가 바뀌는 지점으로 구간(run)을 나눕니다; run 수는 점 수보다 훨씬 적습니다.
+        boundaries = np.flatnonzero(np.diff(moving.astype(np.int8))) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(moving)]))
+
+        for s, e in zip(starts, ends):
+            run_seconds = float(dt[s:e].sum())
+            if moving[s]:
+                p0, p1 = end[s] - 1, end[e - 1]
+                if segment is None:
+                    segment = TripSegment(t[p0], lat[p0], lon[p0])
+                else:
+                    segment.dwell_seconds += stop_seconds
+                stop_seconds = 0.0
+
+                run_speed = speed[s:e]
+                segment.distance_km += float(distance[s:e].sum())
+                segment.moving_seconds += run_seconds
+                segment.max_speed_kmh = max(segment.max_speed_kmh, float(run_speed.max()))
+                bins = np.minimum((run_speed / SPEED_BIN_KMH).astype(np.int64), SPEED_BIN_COUNT - 1)
+                segment.speed_histogram += np.bincount(bins, weights=dt[s:e], minlength=SPEED_BIN_COUNT)
+                segment.ended_at, segment.end_lat, segment.end_lon = t[p1], lat[p1], lon[p1]
+            else:
+                stop_seconds += run_seconds
+                if segment is not None and stop_seconds >= STOP_MIN_SECONDS:
+                    closed, segment = finish(segment), None
+                    if closed:
+                        yield closed
+
+    if segment is not None:
+        closed = finish(segment)
+        if closed:
+            yield closed
+
+
+def classify_segment(segment: TripSegment, stations: Optional[StationIndex] = None) -> schemas.TransportMode:
+    """Pick a transport mode from the segment's speed profile and nearby stations at both ends."""
+    p85 = segment.speed_quantile(0.85)
+
+    def near(station_type: str) -> bool:
+        if stations is None or not stations.loaded:
+            return False
+        radius = STATION_RADIUS_KM[station_type]
+        return (stations.nearest_distance_km(station_type, segment.start_lat, segment.start_lon) <= radius
+                and stations.nearest_distance_km(station_type, segment.end_lat, segment.end_lon) <= radius)
+
+    if p85 < 8:
+        return schemas.TransportMode.WALK
+    if p85 < 28 and segment.max_speed_kmh < 40:
+        return schemas.TransportMode.TTAREUNGI if near("ttareungi") else schemas.TransportMode.BIKE
+    if near("subway"):
+        return schemas.TransportMode.SUBWAY
+    if near("bus"):
+        return schemas.TransportMode.BUS
+    return schemas.TransportMode.CAR
+
+
+class TraceIngestService:
+    @staticmethod
+    def get_trace_source(db: Session) -> models.IngestSource:
+        source = db.query(models.IngestSource).filter(models.IngestSource.source_name == TRACE_SOURCE_NAME).first()
+        if not source:
+            source = models.IngestSource(source_name=TRACE_SOURCE_NAME, description="Raw GPS traces uploaded by clients")
+            db.add(source)
+            db.flush()
+        return source
+
+    @staticmethod
+    def store_trace(db: Session, user: models.User, points: List[Dict[str, Any]]) -> models.IngestRaw:
+        """Persist the raw upload in ingest_raw before segmentation."""
+        source = TraceIngestService.get_trace_source(db)
+        raw = models.IngestRaw(
+            source_id=source.source_id,
+            user_id=user.user_id,
+            captured_at=datetime.utcnow(),
+            payload={"points": points},
+        )
+        db.add(raw)
+        db.commit()
+        db.refresh(raw)
+        return raw
+
+    @staticmethod
+    def process_trace(db: Session, raw: models.IngestRaw, user: models.User, stations: Optional[StationIndex] = None) -> List[models.MobilityLog]:
+        """Segment a stored trace and log one MobilityLog per move segment."""
+        logs = []
+        points = (raw.payload or {}).get("points", [])
+        for n, segment in enumerate(segment_trace(iter_point_chunks(points)), 1):
+            mode = classify_segment(segment, stations)
+            log_data = schemas.MobilityLogCreate(
+                user_id=user.user_id,
+                mode=mode,
+                distance_km=round(segment.distance_km, 3),
+                started_at=datetime.utcfromtimestamp(segment.started_at),
+                ended_at=datetime.utcfromtimestamp(segment.ended_at),
+                description=f"GPS trace #{raw.raw_id} segment {n}",
+                start_point=f"{segment.start_lat:.6f},{segment.start_lon:.6f}",
+                end_point=f"{segment.end_lat:.6f},{segment.end_lon:.6f}",
+            )
+            logs.append(MobilityService.log_mobility(
+                db, log_data, user, source_id=raw.source_id, raw_ref_id=str(raw.raw_id)
+            ))
+        return logs
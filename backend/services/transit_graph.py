@@ -0,0 +1,187 @@
+# services/transit_graph.py
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from sqlalchemy import Float, type_coerce
+from sqlalchemy.orm import Session
+
+import schemas
+from models import BusDistance, SubwayDistance
+from services.station_index import StationIndex, normalize_station_name, station_index
+
+# 출발/도착 좌표를 역/정류장에 붙이는 최대 거리 (km)
+SNAP_RADIUS_KM = {"subway": 0.5, "bus": 0.3}
+PAIR_CACHE_SIZE = 65536
+# 신고된 거리가 네트워크 거리의 이 배수를 넘으면 네트워크 거리로 보정합니다.
+NETWORK_DISTANCE_TOLERANCE = 1.3
+
+Endpoint = Union[Tuple[float, float], str]
+
+
+def _shortest_paths(adjacency: np.ndarray) -> np.ndarray:
+    """Floyd-Warshall, vectorised over rows: O(n) NumPy passes of an n x n matrix."""
+    dist = adjacency.copy()
+    np.fill_diagonal(dist, 0.0)
+    for k in range(len(dist)):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+    return dist
+
+
+class _Network:
+    """Station names -> node index plus the all-pairs distance matrix between them."""
+
+    def __init__(self, edges: List[Tuple[str, str, float]]):
+        names = sorted({n for a, b, _ in edges for n in (a, b)})
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        adjacency = np.full((len(names), len(names)), np.inf, dtype=np.float64)
+        for a, b, km in edges:
+            i, j = self.index[a], self.index[b]
+            # 같은 구간이 여러 번 들어 있으면 가장 짧은 값을 씁니다; 노선은 양방향으로 봅니다.
+            adjacency[i, j] = adjacency[j, i] = min(adjacency[i, j], km)
+        self.dist = _shortest_paths(adjacency) if names else adjacency
+
+    def distance(self, a: str, b: str) -> Optional[float]:
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None:
+            return None
+        km = float(self.dist[i, j])
+        return km if np.isfinite(km) else None
+
+
+class TransitGraph:
+    """
+    In-memory subway / bus networks built from `subway_distances` and `bus_distances`.
+
+    Subway distances are precomputed all-pairs over the whole network. Bus
+    distances are precomputed per route (riding one route between two of its
+    stops); a stop pair resolves to the shortest route that serves both, and
+    that min-over-routes lookup is kept in an LRU keyed by the stop pair.
+    Trip endpoints are snapped to the nearest station through StationIndex.
+    """
+
+    def __init__(self, stations: StationIndex, cache_size: int = PAIR_CACHE_SIZE):
+        self.stations = stations
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self.subway = _Network([])
+        self.bus_routes: Dict[str, _Network] = {}
+        self.routes_by_stop: Dict[str, List[str]] = {}
+        self._node_names: Dict[str, np.ndarray] = {}
+        self._bus_pair = lru_cache(maxsize=cache_size)(self._bus_pair_uncached)
+        self.loaded = False
+        self._stations_version = None
+
+    def load(self, db: Session):
+        """Read both distance tables and precompute shortest paths."""
+        self.stations.ensure_loaded(db)
+        stations_version = self.stations.version
+
+        subway_edges = [
+            (normalize_station_name(a), normalize_station_name(b), km)
+            for a, b, km in db.query(
+                SubwayDistance.station_start, SubwayDistance.station_end,
+                type_coerce(SubwayDistance.distance_km, Float),
+            )
+            if a and b and km is not None
+        ]
+
+        route_edges: Dict[str, List[Tuple[str, str, float]]] = defaultdict(list)
+        for route_id, a, b, km in db.query(
+            BusDistance.route_id, BusDistance.stop_start, BusDistance.stop_end,
+            type_coerce(BusDistance.distance_km, Float),
+        ).order_by(BusDistance.route_id, BusDistance.id):
+            if route_id and a and b and km is not None:
+                route_edges[route_id].append((normalize_station_name(a), normalize_station_name(b), km))
+
+        subway = _Network(subway_edges)
+        bus_routes = {route_id: _Network(edges) for route_id, edges in route_edges.items()}
+        routes_by_stop: Dict[str, List[str]] = defaultdict(list)
+        for route_id, network in bus_routes.items():
+            for name in network.index:
+                routes_by_stop[name].append(route_id)
+
+        # StationIndex 의 역/정류장 이름을 정규화해 두면 스냅 결과를 바로 노드로 쓸 수 있습니다.
+        node_names = {
+            station_type: np.array([normalize_station_name(n) for n in self.stations.names.get(station_type, [])], dtype=object)
+            for station_type in SNAP_RADIUS_KM
+        }
+
+        with self._lock:
+            self.subway = subway
+            self.bus_routes = bus_routes
+            self.routes_by_stop = dict(routes_by_stop)
+            self._node_names = node_names
+            self._bus_pair = lru_cache(maxsize=self.cache_size)(self._bus_pair_uncached)
+            self._stations_version = stations_version
+            self.loaded = True
+
+    def ensure_loaded(self, db: Session):
+        """Load once, and again whenever StationIndex was reloaded (snapping uses its names)."""
+        self.stations.ensure_loaded(db)
+        if not self.loaded or self._stations_version != self.stations.version:
+            self.load(db)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _bus_pair_uncached(self, a: str, b: str) -> Optional[float]:
+        best = None
+        for route_id in self.routes_by_stop.get(a, ()):
+            km = self.bus_routes[route_id].distance(a, b)
+            if km is not None and (best is None or km < best):
+                best = km
+        return best
+
+    def subway_distance_km(self, a: str, b: str) -> Optional[float]:
+        return self.subway.distance(normalize_station_name(a), normalize_station_name(b))
+
+    def bus_distance_km(self, a: str, b: str) -> Optional[float]:
+        a, b = normalize_station_name(a), normalize_station_name(b)
+        if a > b:
+            a, b = b, a
+        return self._bus_pair(a, b)
+
+    def snap(self, station_type: str, lat: float, lon: float) -> Optional[str]:
+        """Normalised name of the nearest station within SNAP_RADIUS_KM, if any."""
+        km, i = self.stations.nearest(station_type, lat, lon)
+        if i is None or km > SNAP_RADIUS_KM[station_type]:
+            return None
+        return self._node_names[station_type][i]
+
+    def resolve_endpoint(self, station_type: str, endpoint: Optional[Endpoint]) -> Optional[str]:
+        """Accept (lat, lon), a 'lat,lon' string, or a station name."""
+        if not endpoint:
+            return None
+        if isinstance(endpoint, str):
+            try:
+                lat, lon = map(float, endpoint.split(","))
+            except ValueError:
+                return normalize_station_name(endpoint)
+        else:
+            lat, lon = endpoint
+        return self.snap(station_type, lat, lon)
+
+    def trip_distance_km(self, mode, start: Optional[Endpoint], end: Optional[Endpoint]) -> Optional[float]:
+        """Network distance for a SUBWAY/BUS trip, or None if either end can't be matched."""
+        mode = getattr(mode, "value", mode)
+        if mode == schemas.TransportMode.SUBWAY.value:
+            station_type, lookup = "subway", self.subway_distance_km
+        elif mode == schemas.TransportMode.BUS.value:
+            station_type, lookup = "bus", self.bus_distance_km
+        else:
+            return None
+        a = self.resolve_endpoint(station_type, start)
+        b = self.resolve_endpoint(station_type, end)
+        if not a or not b or a == b:
+            return None
+        return lookup(a, b)
+
+    def cache_info(self):
+        return self._bus_pair.cache_info()
+
+
+# 전역 인스턴스
+transit_graph = TransitGraph(station_index)
@@ -0,0 +1,88 @@
+# services/trip_handlers.py
+"""
+TripRecorded / CreditsEarned 이벤트 핸들러. log_mobility 요청 경로 밖에서 outbox 소비자가 배치로 실행합니다.
+이 모듈을 import 하면 핸들러가 event_bus 에 등록됩니다.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from models import OutboxEvent
+from services.activity_calendar import activity_calendar
+from services.achievement_engine import (
+    achievement_engine, BIKE_MODES, BIKE_KM, CO2_SAVED_G, CREDITS_EARNED_POINTS, TRIP_COUNT
+)
+from services.carbon_factor_registry import ECO_MODES
+from services.event_bus import event_bus, TRIP_RECORDED, CREDITS_EARNED
+from services.group_challenge_service import GroupChallengeService
+from services.group_totals import group_totals, GROUP_TOTALS_HANDLER
+
+
+def _trip_day(e: OutboxEvent) -> date:
+    """Day the trip started (falls back to when the event was published)."""
+    started_at = (e.payload or {}).get("started_at")
+    return datetime.fromisoformat(started_at).date() if started_at else e.created_at.date()
+
+
+@event_bus.subscribe(TRIP_RECORDED, "group_challenge_progress")
+def apply_group_challenge_progress(db: Session, events: List[OutboxEvent]):
+    """Add each trip's CO2 saving to the group challenges running on the trip's day, one grouped update per batch."""
+    co2_by_user_day: Dict[int, Dict[date, float]] = defaultdict(lambda: defaultdict(float))
+    for e in events:
+        co2_by_user_day[e.user_id][_trip_day(e)] += float((e.payload or {}).get("co2_saved_g") or 0)
+    GroupChallengeService.apply_contributions(db, co2_by_user_day)
+
+
+@event_bus.subscribe(TRIP_RECORDED, "achievements")
+def apply_trip_achievements(db: Session, events: List[OutboxEvent]):
+    """Fold eco trips into the per-user achievement counters (streaks come from the activity calendar)."""
+    deltas: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for e in events:
+        payload = e.payload or {}
+        if payload.get("mode") not in ECO_MODES:
+            continue
+        counters = deltas[e.user_id]
+        counters[TRIP_COUNT] += 1
+        counters[CO2_SAVED_G] += float(payload.get("co2_saved_g") or 0)
+        counters[CREDITS_EARNED_POINTS] += float(payload.get("points_earned") or 0)
+        if payload.get("mode") in BIKE_MODES:
+            counters[BIKE_KM] += float(payload.get("distance_km") or 0)
+    achievement_engine.apply(db, deltas)
+
+
+@event_bus.subscribe(CREDITS_EARNED, "achievements")
+def apply_credit_achievements(db: Session, events: List[OutboxEvent]):
+    """Add non-trip earnings (challenge rewards, admin grants) to the credits counter."""
+    deltas: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for e in events:
+        deltas[e.user_id][CREDITS_EARNED_POINTS] += float((e.payload or {}).get("points") or 0)
+    achievement_engine.apply(db, deltas)
+
+
+@event_bus.subscribe(TRIP_RECORDED, "activity_calendar")
+def apply_activity_calendar(db: Session, events: List[OutboxEvent]):
+    """
+    Set the day bit and add the day's CO2 saved in each user's yearly activity
+    bitmap, then raise streak_best from the updated bitmaps (a late trip can
+    join two runs, so the streak is recomputed rather than advanced).
+    """
+    days_by_user: Dict[int, Dict[date, float]] = defaultdict(lambda: defaultdict(float))
+    for e in events:
+        payload = e.payload or {}
+        if payload.get("mode") not in ECO_MODES or not payload.get("started_at"):
+            continue
+        day = datetime.fromisoformat(payload["started_at"]).date()
+        days_by_user[e.user_id][day] += float(payload.get("co2_saved_g") or 0)
+    activity_calendar.record(db, days_by_user)
+    achievement_engine.apply_streaks(db, activity_calendar.longest_streaks(db, days_by_user))
+
+
+@event_bus.subscribe(TRIP_RECORDED, GROUP_TOTALS_HANDLER)
+def apply_group_totals(db: Session, events: List[OutboxEvent]):
+    """Add each trip's CO2 saving to the denormalised total of the user's active groups."""
+    co2_by_user: Dict[int, float] = defaultdict(float)
+    for e in events:
+        co2_by_user[e.user_id] += float((e.payload or {}).get("co2_saved_g") or 0)
+    group_totals.apply_trips(db, co2_by_user)
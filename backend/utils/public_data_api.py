@@ -2,7 +2,6 @@
 """
 공공데이터 포털 API 호출 유틸리티
 """
-import requests
 import json
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
@@ -39,6 +38,7 @@ class PublicDataAPI:
                 "ver": "1.0"
             }
             
+            import requests  # 첫 호출 때 로드 (서버 시작 시간 단축)
             response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             